@@ -0,0 +1,5 @@
+"""
+Benchmark suite of pycolog, run by `python -m benchmarks`.
+Synthetic logs are generated reproducibly (see :mod:`benchmarks.generator`) and loaded with the layouts of
+:mod:`benchmarks.layouts`, the results are written as JSON to compare them between commits.
+"""
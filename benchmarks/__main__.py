@@ -0,0 +1,84 @@
+"""
+Runs the benchmarks and writes the results as JSON, e.g.:
+
+    python -m benchmarks --entries 200000 --output results.json
+"""
+import argparse
+import json
+import pathlib
+import platform
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.generator import Settings, generate
+from benchmarks.layouts import LAYOUTS
+from benchmarks.suite import BENCHMARKS
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                              check=True, cwd=str(pathlib.Path(__file__).parent),
+                              universal_newlines=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(settings, layouts, benchmarks, repeat, directory):
+    """
+    Generates the logs and runs the benchmarks for all layouts.
+
+    :returns: The results, as written to the JSON output
+    :rtype: dict
+    """
+    files = generate(directory, settings)
+    results = {}
+    for layout_name in layouts:
+        for name in benchmarks:
+            print(f'{layout_name}: {name}', file=sys.stderr)
+            results.setdefault(layout_name, {})[name] = BENCHMARKS[name](files, layout_name, repeat)
+    return {
+        'commit': _commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'settings': settings.to_dict(),
+        'repeat': repeat,
+        'results': results,
+    }
+
+
+def main(args=None):
+    """Entry point of `python -m benchmarks`."""
+    defaults = Settings()
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Runs the benchmarks of pycolog')
+    parser.add_argument('--entries', type=int, default=defaults.entries, help='Total number of generated entries')
+    parser.add_argument('--files', type=int, default=defaults.files, help='Number of generated files')
+    parser.add_argument('--multiline-ratio', type=float, default=defaults.multiline_ratio,
+                        help='Fraction of entries with a stack trace')
+    parser.add_argument('--tag-density', type=float, default=defaults.tag_density,
+                        help='Fraction of entries containing a tag')
+    parser.add_argument('--field-density', type=int, default=defaults.field_density,
+                        help='Number of key=value fields per entry')
+    parser.add_argument('--seed', type=int, default=defaults.seed, help='Seed of the generator')
+    parser.add_argument('--layouts', nargs='+', choices=LAYOUTS, default=LAYOUTS, help='Layouts to benchmark')
+    parser.add_argument('--benchmarks', nargs='+', choices=list(BENCHMARKS), default=list(BENCHMARKS),
+                        help='Benchmarks to run')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of runs, the best time is reported')
+    parser.add_argument('--output', type=pathlib.Path, help='Path of the JSON results, printed if not given')
+    config = parser.parse_args(args)
+
+    settings = Settings(config.entries, config.files, config.multiline_ratio, config.tag_density,
+                        config.field_density, config.seed)
+    with tempfile.TemporaryDirectory(prefix='pycolog-benchmark-') as directory:
+        results = run(settings, config.layouts, config.benchmarks, config.repeat, pathlib.Path(directory))
+
+    output = json.dumps(results, indent=2)
+    if config.output:
+        config.output.write_text(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Module for a headless curses screen, to render the log screen without a terminal.
+"""
+import contextlib
+import curses
+from unittest import mock
+
+
+class FakeWindow:
+    """Window that keeps the written text in memory and counts the written characters."""
+    def __init__(self, lines, cols):
+        self.lines = lines
+        self.cols = cols
+        self.written = 0
+        self._keys = []
+
+    def addstr(self, *args):
+        text = args[2] if len(args) > 2 and isinstance(args[0], int) else args[0]
+        self.written += len(text)
+
+    def addnstr(self, y_pos, x_pos, text, length, *args):  # pylint: disable=unused-argument
+        self.written += min(len(text), length)
+
+    def getyx(self):
+        return 0, 0
+
+    def getkey(self):
+        return self._keys.pop(0) if self._keys else 'q'
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+@contextlib.contextmanager
+def fake_curses(lines=50, cols=200):
+    """
+    Replaces the terminal functions of :mod:`curses` by a :class:`FakeWindow` of the given size.
+
+    :returns: The window returned by :func:`curses.initscr`
+    :rtype: FakeWindow
+    """
+    window = FakeWindow(lines, cols)
+    patches = {
+        'initscr': lambda: window,
+        'color_pair': lambda color: color,
+        'doupdate': lambda: None,
+        'update_lines_cols': lambda: None,
+        'LINES': lines,
+        'COLS': cols,
+    }
+    with mock.patch.multiple(curses, create=True, **patches):
+        yield window
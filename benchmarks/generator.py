@@ -0,0 +1,90 @@
+"""
+Module for the synthetic log generator.
+The generated logs are reproducible: the same settings and seed always produce the same files.
+"""
+from datetime import datetime, timedelta
+import random
+
+LEVELS = ['DEBUG', 'INFO', 'INFO', 'INFO', 'WARN', 'ERROR']
+"""Levels of the generated entries, weighted by repetition."""
+
+TAGS = ['timeout', 'sql', 'retry', 'cache', 'auth', 'disk', 'socket', 'oom']
+"""Keywords of the generated entries that are matched by the tags of the layouts."""
+
+WORDS = ['request', 'handled', 'user', 'session', 'started', 'finished', 'queue', 'processing', 'item', 'value',
+         'connection', 'closed', 'opened', 'payload', 'received', 'sent', 'worker', 'job', 'scheduled', 'update']
+
+START = datetime(2020, 7, 2, 12, 0, 0)
+"""Time of the first generated entry."""
+
+
+class Settings:
+    """
+    Settings of a generated log.
+
+    :param entries: Total number of entries of all files
+    :type entries: int
+    :param files: Number of files, all files cover the same time range
+    :type files: int
+    :param multiline_ratio: Fraction of entries that are followed by a stack trace
+    :type multiline_ratio: float
+    :param tag_density: Fraction of entries that contain a tag keyword
+    :type tag_density: float
+    :param field_density: Number of `key=value` fields in every message
+    :type field_density: int
+    :param seed: Seed of the random generator
+    :type seed: int
+    """
+    def __init__(self, entries=100000, files=1, multiline_ratio=0.05, tag_density=0.1, field_density=2, seed=1):
+        self.entries = entries
+        self.files = files
+        self.multiline_ratio = multiline_ratio
+        self.tag_density = tag_density
+        self.field_density = field_density
+        self.seed = seed
+
+    def to_dict(self):
+        """Gets the settings as dictionary, e.g. for the benchmark results."""
+        return dict(self.__dict__)
+
+
+def _entry(rng, moment, settings):
+    words = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(3, 10)))
+    fields = ' '.join(f'{rng.choice(WORDS)}={rng.randint(0, 9999)}' for _ in range(settings.field_density))
+    tag = f' {rng.choice(TAGS)}' if rng.random() < settings.tag_density else ''
+    line = (f'{moment:%Y-%m-%d %H:%M:%S}.{moment.microsecond // 1000:03d} {rng.choice(LEVELS):5} '
+            f'[worker-{rng.randint(1, 16)}] {words}{tag} {fields}\n')
+    if rng.random() < settings.multiline_ratio:
+        line += 'Traceback (most recent call last):\n'
+        for depth in range(rng.randint(2, 12)):
+            line += f'  File "/srv/app/{rng.choice(WORDS)}.py", line {rng.randint(1, 999)}, in {rng.choice(WORDS)}\n'
+            line += f'    {rng.choice(WORDS)}({rng.choice(WORDS)}, depth={depth})\n'
+        line += f'RuntimeError: {rng.choice(WORDS)} failed\n'
+    return line
+
+
+def generate(directory, settings):
+    """
+    Writes the log files of the given settings.
+
+    :param directory: Directory to write the files to
+    :type directory: pathlib.Path
+    :param settings: Settings of the log
+    :type settings: Settings
+    :returns: Paths of the written files
+    :rtype: list[pathlib.Path]
+    """
+    rng = random.Random(settings.seed)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    per_file = settings.entries // settings.files
+    for idx in range(settings.files):
+        path = directory / f'service_{idx}.log'
+        count = per_file + (1 if idx < settings.entries % settings.files else 0)
+        moment = START
+        with open(path, 'w') as file_handle:
+            for _ in range(count):
+                moment += timedelta(milliseconds=rng.randint(0, 50 * settings.files))
+                file_handle.write(_entry(rng, moment, settings))
+        paths.append(path)
+    return paths
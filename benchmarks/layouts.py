@@ -0,0 +1,58 @@
+"""
+Module for the layouts of the benchmarks, equal to the layouts loaded from YAML files.
+Every layout adds features on top of the previous one.
+"""
+import re
+
+from pycolog.plugins import load as load_plugins, mount as mount_plugins
+from pycolog.timestamp import timestamp
+from pycolog.yaml_loader import strptime
+
+from benchmarks.generator import TAGS
+
+_LINE_START = re.compile(r'\d{4}-\d\d-\d\d ')
+_LINE_FORMAT = re.compile(r'^(?P<timestamp>\S+ \S+) (?P<level>\w+) +\[(?P<thread>[^\]]+)\] (?P<message>.*)$')
+
+
+def _timestamp_field(callback):
+    kwargs = {'format': '%Y-%m-%d %H:%M:%S.%f'}
+    return {'timestamp': {'callback': callback, 'argument': 'date_string', 'kwargs': kwargs}}
+
+
+def _tags():
+    return {tag: {'pattern': re.compile(rf'\b{tag}\b')} for tag in TAGS}
+
+
+def _layouts():
+    plain = {'line_start': _LINE_START}
+    fields = dict(plain, line_format=_LINE_FORMAT, fields=_timestamp_field(strptime))
+    timestamps = dict(fields, fields=_timestamp_field(timestamp))
+    tags = dict(timestamps, tags=_tags(), filter={'tags': {'contain': ['timeout', 'sql']}})
+    columns = dict(tags, columns={'timestamp': 'time', 'level': 'category'})
+    plugins = dict(columns, plugins=['benchmarks.plugin'])
+    return {
+        'plain': plain,
+        'strptime': fields,
+        'timestamp': timestamps,
+        'tags': tags,
+        'columns': columns,
+        'plugins': plugins,
+    }
+
+
+LAYOUTS = list(_layouts())
+"""Names of the available layouts."""
+
+
+def layout(name):
+    """
+    Creates the options of a layout, with loaded and mounted plugins.
+
+    :param name: Name of the layout, see :data:`LAYOUTS`
+    :type name: str
+    :rtype: dict
+    """
+    options = dict(_layouts()[name])
+    options['plugins'] = list(load_plugins(options.get('plugins', [])))
+    mount_plugins(options)
+    return options
@@ -0,0 +1,6 @@
+"""Plugin of the `plugins` benchmark layout, interpreting entries as level and message."""
+
+
+def post_construct_batch(entries, options):  # pylint: disable=unused-argument
+    for entry in entries:
+        entry.interpreted = f'{entry["level"]}: {entry["message"]}'
@@ -0,0 +1,142 @@
+"""
+Module for the benchmarks, every benchmark returns the measured values of one layout.
+"""
+import gc
+import re
+import time
+import tracemalloc
+
+from pycolog.log import Log
+from pycolog.query import Query
+from pycolog.screens.log_screen import LogScreen
+from pycolog.search import Search
+
+from benchmarks.fake_curses import fake_curses
+from benchmarks.layouts import layout
+
+PAGES = 100
+"""Number of pages rendered by the render benchmark."""
+
+ENTRIES = 100000
+"""Maximum number of entries kept by the entries benchmark."""
+
+
+def _timed(function, repeat):
+    """Calls the function `repeat` times, returns the best time and the last result."""
+    best = None
+    result = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def _log(files, layout_name, **kwargs):
+    return Log(files=files, **layout(layout_name), **kwargs)
+
+
+def load(files, layout_name, repeat=1):
+    """Measures the time to load the files and the peak of the memory allocated while loading."""
+    seconds, log = _timed(lambda: _log(files, layout_name), repeat)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        _log(files, layout_name)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'seconds': seconds, 'peak_bytes': peak, 'entries': log.count, 'shown': log.total}
+
+
+def filter(files, layout_name, repeat=1):  # pylint: disable=redefined-builtin
+    """Measures the time to evaluate a query on a loaded log."""
+    log = _log(files, layout_name)
+    query = 'level in (ERROR, WARN) and thread ~ /worker-1\\d/'
+
+    def run():
+        log.add_filter(Query(query, log.options))
+        total = log.total
+        log.remove_filter(log.filters[-1])
+        log._filters.invalidate(0)  # pylint: disable=protected-access
+        return total
+    seconds, shown = _timed(run, repeat)
+    return {'seconds': seconds, 'shown': shown}
+
+
+def render(files, layout_name, repeat=1):
+    """Measures the time to render pages of the log screen on a headless screen."""
+    log = _log(files, layout_name)
+    options = layout(layout_name)
+
+    def run():
+        with fake_curses() as window:
+            screen = LogScreen(log, **options)
+            screen._first_page()  # pylint: disable=protected-access
+            screen._draw()  # pylint: disable=protected-access
+            for _ in range(PAGES):
+                screen._next_page()  # pylint: disable=protected-access
+                screen._draw()  # pylint: disable=protected-access
+            return window.written
+    seconds, written = _timed(run, repeat)
+    return {'seconds': seconds, 'pages': PAGES + 1, 'written_chars': written}
+
+
+def search(files, layout_name, repeat=1):
+    """Measures the time to search a regular expression in all shown entries."""
+    log = _log(files, layout_name)
+    pattern = re.compile(r'payload \w+ received')
+
+    def run():
+        found = Search(log, pattern)
+        while found.running:
+            time.sleep(0.001)
+        return found.count
+    seconds, matches = _timed(run, repeat)
+    return {'seconds': seconds, 'matches': matches}
+
+
+def _show(log, count):
+    shown = log.get_entries(slice(0, count))
+    for entry in shown:
+        entry.attributes  # pylint: disable=pointless-statement
+        entry.tags  # pylint: disable=pointless-statement
+    return shown
+
+
+def entries(files, layout_name, repeat=1):
+    """
+    Measures the time to create the entries of the log with parsed fields, tags and interpretation,
+    as if every entry had been shown, and the memory they take.
+    """
+    log = _log(files, layout_name)
+    count = min(log.total, ENTRIES)
+
+    def run():
+        log._cached_entry.cache_clear()  # pylint: disable=protected-access
+        return len(_show(log, count))
+    seconds, _ = _timed(run, repeat)
+
+    log._cached_entry.cache_clear()  # pylint: disable=protected-access
+    gc.collect()
+    tracemalloc.start()
+    try:
+        shown = _show(log, count)
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'seconds': seconds, 'entries': len(shown), 'bytes_per_entry': current / max(len(shown), 1)}
+
+
+BENCHMARKS = {
+    'load': load,
+    'entries': entries,
+    'filter': filter,
+    'render': render,
+    'search': search,
+}
+"""Available benchmarks by name."""
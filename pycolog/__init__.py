@@ -2,14 +2,20 @@
 Small console application that allows quick analyzation of log files
 """
 import argparse
+import cProfile
+import os
 import pathlib
+import sys
 
 import yaml
 
-from pycolog import yaml_loader
-from pycolog.log import Log
+from pycolog import stream, yaml_loader
+from pycolog.database import DatabaseLog
+from pycolog.log import Log, CACHE_SIZE
 from pycolog.screens import LogScreen
 from pycolog.plugins import load as load_plugins, mount as mount_plugins
+from pycolog.stats import Stats
+from pycolog.timestamp import parse_time
 
 try:
     from pycolog.version import version as __version__
@@ -30,17 +36,71 @@ def console_main():
     parser.add_argument('--layout', type=pathlib.Path, required=True, help='Path to the logs layout definition file')
     parser.add_argument('--color-screen', action='store_true',
                         help='Show a color overview screen before starting the default routines')
+    parser.add_argument('--cache-size', type=int, default=CACHE_SIZE,
+                        help='Number of parsed log entries to keep in memory')
+    parser.add_argument('-f', '--follow', action='store_true',
+                        help='Keep watching the log files and show appended entries')
+    parser.add_argument('-m', '--merge', action='store_true',
+                        help='Show the entries of all files ordered by time, each file has to be ordered by time')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Number of processes to scan the log files with')
+    parser.add_argument('--since', type=parse_time,
+                        help='Only show entries at or after this time (e.g. "2020-07-02 12:00")')
+    parser.add_argument('--until', type=parse_time,
+                        help='Only show entries at or before this time (e.g. "2020-07-02 12:10")')
+    parser.add_argument('-w', '--where',
+                        help='Only show entries matching this query (e.g. "level in (ERROR, WARN) and time >= 12:00")')
+    parser.add_argument('--index-dir', type=pathlib.Path,
+                        help='Directory to store the index of the log files in, to speed up reopening them')
+    parser.add_argument('--stats', action='store_true',
+                        help='Measure the phases of loading and rendering, shown by "s" and printed after exit')
+    parser.add_argument('--profile', type=pathlib.Path,
+                        help='Path to write the cProfile statistics of loading the log files to')
+    parser.add_argument('--db', type=pathlib.Path,
+                        help='SQLite database to ingest the log files into, reopening it only ingests appended data')
+    parser.add_argument('--print', '--no-ui', action='store_true', dest='print',
+                        help='Write the shown entries to stdout instead of starting the log screen')
+    parser.add_argument('--format', choices=sorted(stream.FORMATS), default='text',
+                        help='Output format of --print, one entry or one JSON object per line')
 
     config = parser.parse_args().__dict__
     with open(config.get('layout')) as layout:
         config.update(yaml.safe_load(layout))
 
+    config['stats'] = Stats() if config.get('stats') else None
     config['plugins'] = list(load_plugins(config.get('plugins', [])))
     mount_plugins(config)
 
-    analyzer = Log(**config)
-    with LogScreen(analyzer, **config) as screen:
-        screen.run()
+    if config.get('print'):
+        _print(config)
+        return
+
+    log_class = DatabaseLog if config.get('db') else Log
+    if config.get('profile'):
+        profile = cProfile.Profile()
+        analyzer = profile.runcall(log_class, **config)
+        profile.dump_stats(str(config['profile']))
+    else:
+        analyzer = log_class(background=True, **config)
+
+    try:
+        with LogScreen(analyzer, **config) as screen:
+            screen.run()
+    finally:
+        if config['stats']:
+            print(config['stats'].report())
+
+
+def _print(config):
+    try:
+        stream.write(sys.stdout, config)
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # the reader has stopped (e.g. `| head`), silence the flush at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    finally:
+        if config['stats']:
+            print(config['stats'].report(), file=sys.stderr)
 
 
 if __name__ == '__main__':
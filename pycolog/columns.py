@@ -0,0 +1,193 @@
+"""
+Module for the columnar storage of entry values.
+A column keeps one value of every entry of a file in a typed array, so that filtering
+and sorting can run over whole columns instead of looking up the values entry by entry.
+"""
+from array import array
+from datetime import datetime, timedelta, timezone
+
+EPOCH = datetime(1970, 1, 1)
+"""Reference of the stored timestamps."""
+
+MISSING = -2 ** 63
+"""Value stored for entries without timestamp."""
+
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def to_epoch(value):
+    """
+    Converts a timestamp to microseconds since the epoch, naive timestamps are taken as UTC.
+
+    :param value: The timestamp or `None`
+    :type value: datetime
+    :rtype: int
+    """
+    if value is None:
+        return MISSING
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - EPOCH) // _MICROSECOND
+
+
+def epoch_of(value):
+    """
+    Converts a field value to microseconds since the epoch, values that are already converted are kept.
+
+    :param value: The timestamp, microseconds since the epoch or `None`
+    :type value: datetime or int
+    :rtype: int
+    """
+    return value if isinstance(value, int) else to_epoch(value)
+
+
+def time_of(value, field):
+    """
+    Converts the value of the time field to microseconds since the epoch.
+
+    :param value: The value of the field, a timestamp, microseconds since the epoch or `None`
+    :param field: Name of the time field
+    :type field: str
+    :rtype: int
+    :raises ValueError: If the value is not a timestamp, i.e. the field has no timestamp callback
+    """
+    if value is not None and not isinstance(value, (datetime, int)):
+        raise ValueError(f'The time field {field} is not a timestamp but {value!r}, '
+                         'it needs a timestamp callback, see pycolog.timestamp.timestamp')
+    return epoch_of(value)
+
+
+def from_epoch(value, tzinfo=None):
+    """
+    Converts microseconds since the epoch to a timestamp.
+
+    :param value: Microseconds since the epoch
+    :type value: int
+    :param tzinfo: Time zone of the timestamp, if the value has been converted from an aware timestamp
+    :type tzinfo: datetime.tzinfo
+    :rtype: datetime
+    """
+    if value == MISSING:
+        return None
+    result = EPOCH + value * _MICROSECOND
+    return result.replace(tzinfo=timezone.utc).astimezone(tzinfo) if tzinfo else result
+
+
+class Column:
+    """
+    Base class of a column, storing the values of one field for all entries of a file.
+
+    :param name: Name of the field
+    :type name: str
+    """
+    type_code = 'q'
+    """Array type code of the stored values, a column without type code is stored as list."""
+
+    def __init__(self, name):
+        self.name = name
+        self.data = array(self.type_code) if self.type_code else []
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, idx):
+        return self.decode(self.data[idx])
+
+    def append(self, entry):
+        """Appends the value of the given entry."""
+        self.data.append(self.encode(entry[self.name]))
+
+    def truncate(self, length):
+        """Removes all values after the given length."""
+        del self.data[length:]
+
+    def merge(self, other):
+        """Appends all values of another column of the same type."""
+        self.data.extend(other.data)
+
+    def encode(self, value):
+        """Converts a value of the field to its stored value."""
+        return value
+
+    def decode(self, value):
+        """Converts a stored value to the value of the field."""
+        return value
+
+
+class TagColumn(Column):
+    """
+    Column of the tag bitmasks as computed by :class:`pycolog.tags.TagMatcher`.
+
+    :param count: Number of tags in the layout
+    :type count: int
+    """
+    def __init__(self, count):
+        self.type_code = 'Q' if count <= 64 else None
+        super().__init__('tags')
+
+    def append(self, entry):
+        self.data.append(entry.tag_mask)
+
+
+class TimeColumn(Column):
+    """
+    Column of timestamps, stored as microseconds since the epoch.
+    The field may already be parsed to microseconds, see :func:`pycolog.timestamp.timestamp`.
+    """
+    def __init__(self, name):
+        super().__init__(name)
+        self.tzinfo = None
+
+    def encode(self, value):
+        if isinstance(value, datetime) and value.tzinfo is not None:
+            self.tzinfo = value.tzinfo
+        return time_of(value, self.name)
+
+    def decode(self, value):
+        return from_epoch(value, self.tzinfo)
+
+    def merge(self, other):
+        self.tzinfo = self.tzinfo or other.tzinfo
+        super().merge(other)
+
+
+class CategoryColumn(Column):
+    """Column of low cardinality values (e.g. the level), stored as codes of a dictionary."""
+    type_code = 'I'
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.values = [None]
+        self._codes = {None: 0}
+
+    def __getstate__(self):
+        return {'name': self.name, 'data': self.data, 'values': self.values}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._codes = {value: code for code, value in enumerate(self.values)}
+
+    def code(self, value):
+        """Gets the code of the value or `None` if no entry has this value."""
+        return self._codes.get(value)
+
+    def encode(self, value):
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def decode(self, value):
+        return self.values[value]
+
+    def merge(self, other):
+        codes = [self.encode(value) for value in other.values]
+        self.data.extend(codes[code] for code in other.data)
+
+
+KINDS = {
+    'time': TimeColumn,
+    'category': CategoryColumn,
+}
+"""Column types that can be used in the `columns` section of the layout."""
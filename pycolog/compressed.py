@@ -0,0 +1,187 @@
+"""
+Module for compressed log files (gzip, bzip2 and xz), detected by their magic bytes.
+The compressed data is decompressed in chunks into an anonymous temporary file, which is memory mapped
+like a plain log file, so the memory does not grow with the size of the file.
+
+A compressed file consists of one or more members (gzip) or streams (bzip2, xz), every member can be
+decompressed on its own. The starts of the members are the seek points of the file. They are stored with
+the persistent index (see :meth:`pycolog.index.Index.store_seek_points`) together with the decompressed size,
+so a file that is opened again is mapped lazily: only the members up to the requested data are decompressed.
+Within a member the data has to be decompressed from its start, because a seek point inside a deflate stream
+would need the bit position and the window of the decompressor, which the `zlib` module cannot restore.
+Files compressed as multiple members (e.g. by `bgzip` or `pigz --independent`) can be entered at every member.
+The streams of an xz file may be separated by null padding (in multiples of 4 bytes), which is skipped.
+
+A file that ends within a member (e.g. while it is still being written) or contains corrupt data is
+decompressed up to there, the error is kept in :attr:`Decompressed.error` instead of being raised.
+"""
+import bz2
+import lzma
+import mmap
+import tempfile
+import threading
+import zlib
+
+GZIP = 'gzip'
+BZIP2 = 'bzip2'
+XZ = 'xz'
+
+MAGIC = {
+    GZIP: b'\x1f\x8b',
+    BZIP2: b'BZh',
+    XZ: b'\xfd7zXZ\x00',
+}
+"""Magic bytes at the start of every member, by compression."""
+
+_DECOMPRESSORS = {
+    GZIP: lambda: zlib.decompressobj(16 + zlib.MAX_WBITS),
+    BZIP2: bz2.BZ2Decompressor,
+    XZ: lzma.LZMADecompressor,
+}
+
+READ_SIZE = 256 * 1024
+"""Number of compressed bytes that are decompressed at once."""
+
+_ERRORS = (EOFError, OSError, zlib.error, lzma.LZMAError)
+
+
+def compression_of(path):
+    """
+    Detects the compression of a file by its magic bytes.
+
+    :param path: Path of the file
+    :type path: str
+    :returns: One of :data:`GZIP`, :data:`BZIP2` or :data:`XZ`, `None` if the file is not compressed
+    :rtype: str
+    """
+    with open(path, 'rb') as file_handle:
+        head = file_handle.read(max(len(magic) for magic in MAGIC.values()))
+    for compression, magic in MAGIC.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+class SeekPoints:
+    """
+    The members of a compressed file, as stored with the persistent index.
+
+    :param points: Tuples of the compressed and the decompressed offset of every member
+    :type points: list[tuple]
+    :param size: Number of decompressed bytes
+    :type size: int
+    """
+    __slots__ = ('points', 'size')
+
+    def __init__(self, points, size):
+        self.points = points
+        self.size = size
+
+
+class Decompressed:
+    """
+    The decompressed content of a compressed file, mapped as `map`.
+    Without seek points the file is decompressed completely, otherwise the members are decompressed
+    on request by :meth:`fill` and `complete` tells whether all members have been decompressed.
+
+    :param path: Path of the compressed file
+    :type path: str
+    :param compression: Compression of the file, see :func:`compression_of`
+    :type compression: str
+    :param seek_points: Seek points of the file, from an earlier decompression of the same file
+    :type seek_points: SeekPoints
+    """
+    def __init__(self, path, compression, seek_points=None):
+        self.compression = compression
+        self.error = None
+        """Error that ended the decompression of a file without seek points early, see :mod:`pycolog.compressed`."""
+        self._compressed = open(path, 'rb')  # pylint: disable=consider-using-with
+        self._file = tempfile.TemporaryFile(buffering=0)  # pylint: disable=consider-using-with
+        self._lock = threading.Lock()
+        self._states = {}
+
+        if seek_points is None:
+            self.seek_points = self._decompress_all()
+            self._filled = [True] * len(self.seek_points.points)
+        else:
+            self.seek_points = seek_points
+            self._file.truncate(seek_points.size)
+            self._filled = [False] * len(seek_points.points)
+        self.complete = all(self._filled)
+        self.map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.seek_points.size else b''
+
+    def fill(self, begin=0, end=None):
+        """
+        Decompresses the members containing the given range of decompressed data, if not yet done.
+
+        :param begin: Offset of the first requested byte
+        :type begin: int
+        :param end: Offset after the last requested byte, defaults to the end of the file
+        :type end: int
+        """
+        end = self.seek_points.size if end is None else min(end, self.seek_points.size)
+        with self._lock:
+            starts = [point[1] for point in self.seek_points.points] + [self.seek_points.size]
+            for member, (start, stop) in enumerate(zip(starts, starts[1:])):
+                if stop <= begin or start >= end or self._filled[member]:
+                    continue
+                self._inflate(member, min(end, stop))
+
+    def close(self):
+        """Releases the temporary file and the compressed file."""
+        if isinstance(self.map, mmap.mmap):
+            self.map.close()
+        self.map = b''
+        self._file.close()
+        self._compressed.close()
+
+    def _decompress_all(self):
+        points = []
+        offset, position = 0, 0
+        try:
+            while self._is_member(offset):
+                points.append((offset, position))
+                decompressor = _DECOMPRESSORS[self.compression]()
+                self._compressed.seek(offset)
+                while not decompressor.eof:
+                    data = self._compressed.read(READ_SIZE)
+                    if not data:
+                        raise EOFError(f'Compressed file {self._compressed.name} ended before the end of the data')
+                    offset += len(data)
+                    position += self._file.write(decompressor.decompress(data))
+                offset -= len(decompressor.unused_data)
+                offset = self._skip_padding(offset)
+        except _ERRORS as error:
+            self.error = error
+        return SeekPoints(points, position)
+
+    def _is_member(self, offset):
+        self._compressed.seek(offset)
+        magic = MAGIC[self.compression]
+        return self._compressed.read(len(magic)) == magic
+
+    def _skip_padding(self, offset):
+        if self.compression != XZ:
+            return offset
+        self._compressed.seek(offset)
+        while self._compressed.read(4) == bytes(4):
+            offset += 4
+        return offset
+
+    def _inflate(self, member, until):
+        decompressor, offset, position = self._states.pop(member, None) or (
+            _DECOMPRESSORS[self.compression](), *self.seek_points.points[member])
+        self._file.seek(position)
+        while position < until and not decompressor.eof:
+            self._compressed.seek(offset)
+            data = self._compressed.read(READ_SIZE)
+            if not data:
+                raise EOFError(f'Compressed file {self._compressed.name} ended before the end of the data')
+            offset += len(data)
+            position += self._file.write(decompressor.decompress(data))
+
+        if decompressor.eof:
+            self._filled[member] = True
+            self.complete = all(self._filled)
+        else:
+            self._states[member] = decompressor, offset, position
@@ -0,0 +1,617 @@
+"""
+Module for the SQLite store of very large archives (`--db`).
+The entries of the input files are ingested once into a database file: the raw text, the fields of the
+`line_format` as indexed columns, the tags in a join table and, if SQLite supports it, the raw text in a
+trigram FTS5 table. Opening the database again only ingests the data appended to the files since.
+
+:class:`DatabaseLog` shows the entries with the interface of :class:`pycolog.log.Log`, without keeping
+anything per entry in memory: filters are translated into SQL conditions. If all entries are shown in the
+order of the files, the id of the entry at a position is computed from the counts of the files. Otherwise
+the entries at a position are queried relative to the nearest position that has already been queried
+(keyset pagination), the entries in between are skipped by `OFFSET`, so a jump far from all queried
+positions has to count the entries up to there.
+"""
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from functools import lru_cache
+from itertools import accumulate
+import json
+import os
+import re
+import sqlite3
+import threading
+
+from pycolog import plugins, stream
+from pycolog.columns import MISSING, epoch_of
+from pycolog.encoding import codec_of
+from pycolog.filters import All, Any, Not, Pattern, Tag
+from pycolog.index import layout_hash
+from pycolog.log import CACHE_SIZE, input_files, layout_filters
+from pycolog.log_entry import EntryLayout, LogEntry
+from pycolog.log_file import TIME_FIELD, LogFile
+from pycolog.merge import SHIFT
+from pycolog.query import Query
+from pycolog.scanner import compile_entry_start
+from pycolog.stats import LOAD, timer
+from pycolog.tags import TagMatcher, required_literal
+
+FORMAT = 1
+"""Version of the database schema, databases with another version are ingested again."""
+
+ANCHORS = 4096
+"""Maximum number of queried positions kept to query the following or preceding entries from."""
+
+_TABLES = ['meta', 'files', 'tags', 'entry_tags', 'raw_fts', 'entries']
+
+_OPERATORS = {'==': '=', '=': '=', '<': '<', '<=': '<=', '>': '>', '>=': '>='}
+
+TEXT = 'text'
+"""Kind of a field whose stored values are all texts (or NULL), see :class:`_Translator`."""
+
+INTEGER = 'integer'
+"""Kind of a field whose stored values are all integers (or NULL), e.g. timestamps."""
+
+
+def _column(field):
+    return '"f_' + field.replace('"', '""') + '"'
+
+
+def _value(value):
+    if isinstance(value, datetime):
+        return epoch_of(value)
+    if value is None or isinstance(value, (int, float, str)):
+        return value
+    return str(value)
+
+
+def _bits(mask):
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
+
+def _fts_phrase(literal):
+    return '"' + literal.replace('"', '""') + '"'
+
+
+class _Translator:
+    """
+    Translates the parts of a filter into SQL conditions on the `entries` table, see :meth:`pycolog.query.Query.sql`.
+    The conditions never evaluate to NULL, so they can be negated. Conditions on fields are expressed on the
+    `f_` columns if the stored values compare like the values of the field, i.e. all values are texts or, for the
+    time field compared with absolute times, all values are timestamps.
+
+    :param key: Key of the filter, the functions called by the conditions are registered by it
+    :type key: str
+    :param functions: Functions called by `pycolog_filter`, by key
+    :type functions: dict
+    :param tag_ids: Ids of the tags in the `tags` table, by name
+    :type tag_ids: dict
+    :param fts: Whether the full-text index exists
+    :type fts: bool
+    :param kind: Function getting the kind of the stored values of a field, :data:`TEXT`, :data:`INTEGER`,
+        `None` if the values are mixed or an exception of :class:`KeyError` if the field is not stored
+    :type kind: callable
+    """
+    def __init__(self, key, functions, tag_ids, fts, kind):
+        self._key = key
+        self._functions = functions
+        self._tag_ids = tag_ids
+        self._fts = fts
+        self._kind = kind
+        self._count = 0
+
+    def condition(self, condition, is_time):
+        """Translates a condition on a field, see :class:`pycolog.query._Condition`."""
+        try:
+            kind = self._kind(condition.field)
+        except KeyError:
+            return ('1' if condition.negate else '0'), []
+        column = _column(condition.field)
+        if kind == TEXT and condition.symbol == '~':
+            test = condition.test
+            sql = f'CASE WHEN {column} IS NULL THEN 0 ELSE pycolog_filter(?, {column}) END'
+            params = [self._function(lambda value: test(value, []))]
+        elif kind == TEXT or (kind == INTEGER and is_time and condition.literals):
+            if kind == TEXT:
+                params = [literal.text for literal in condition.literals]
+            else:
+                times = [literal.as_time() for literal in condition.literals]
+                if None in times:
+                    return ('1' if condition.negate else '0'), []
+                if any(of_day for _, of_day in times):
+                    return None
+                params = [moment for moment, _ in times]
+            if condition.symbol == 'in':
+                sql = f'{column} IS NOT NULL AND {column} IN ({", ".join("?" * len(params))})'
+            else:
+                sql = f'{column} IS NOT NULL AND {column} {_OPERATORS[condition.symbol]} ?'
+        else:
+            return None
+        return (f'NOT ({sql})' if condition.negate else sql), params
+
+    def tag(self, name):
+        """Translates the condition of an entry having the given tag."""
+        if name not in self._tag_ids:
+            return '0', []
+        return 'id IN (SELECT entry FROM entry_tags WHERE tag = ?)', [self._tag_ids[name]]
+
+    def search(self, pattern):
+        """Translates the search of a regular expression in the raw message, prefiltered by the full-text index."""
+        key = self._function(pattern.search)
+        literal = required_literal(pattern)
+        if self._fts and literal and len(literal) >= 3:
+            return ('id IN (SELECT rowid FROM raw_fts WHERE raw_fts MATCH ?) AND pycolog_filter(?, raw)',
+                    [_fts_phrase(literal), key])
+        return 'pycolog_filter(?, raw)', [key]
+
+    def row(self, function):
+        """Translates a function of the raw message."""
+        return 'pycolog_filter(?, raw)', [self._function(function)]
+
+    def _function(self, function):
+        self._count += 1
+        key = f'{self._key}#{self._count}'
+        self._functions[key] = function
+        return key
+
+
+class DatabaseLog:
+    """
+    Log stored in a SQLite database, it provides the interface of :class:`pycolog.log.Log` used by the screens.
+    The database is bound to the layout and the input files, it is ingested again if they change.
+
+    The options are the ones of :class:`pycolog.log.Log`, `since` and `until` are conditions on the time
+    of the entries and `index_dir`, `jobs` and `background` are ignored.
+
+    :param db: Path of the database file
+    :type db: pathlib.Path
+    """
+    def __init__(self, **kwargs):
+        with timer(kwargs, LOAD, 'total'):
+            self._open(kwargs)
+
+    def _open(self, kwargs):
+        self._options = kwargs
+        kwargs.setdefault('tag_matcher', TagMatcher(kwargs.get('tags', {}), kwargs.get('stats'), codec_of(kwargs)))
+        self._entry_layout = EntryLayout(kwargs)
+        self._entry_start = compile_entry_start(kwargs.get('line_start', re.compile(r'^')), codec_of(kwargs))
+        self._paths = input_files(kwargs.get('files'))
+        line_format = kwargs.get('line_format')
+        self._fields = list(line_format.groupindex) if line_format is not None else []
+        self._time_field = kwargs.get('time_field', TIME_FIELD)
+        self._order = ('time', 'id') if kwargs.get('merge') else ('id',)
+        self._cached_entry = lru_cache(maxsize=kwargs.get('cache_size') or CACHE_SIZE)(self._create_entry)
+
+        self._lock = threading.RLock()
+        self._functions = {}
+        self._kinds = {}
+        self._db = sqlite3.connect(str(kwargs['db']), check_same_thread=False)
+        self._db.create_function('pycolog_filter', 2, self._match)
+        meta = self._prepare()
+        self._tag_ids = self._load_tags()
+        self._fts = bool(self._db.execute("SELECT 1 FROM sqlite_master WHERE name = 'raw_fts'").fetchone())
+        with timer(kwargs, LOAD, 'ingest'):
+            self._ingest_files()
+        if meta is not None:
+            with timer(kwargs, LOAD, 'indexes'), self._db:
+                self._create_indexes()
+                self._db.executemany('INSERT INTO meta VALUES (?, ?)', meta.items())
+
+        self._active = layout_filters(kwargs)
+        self._generation = -1
+        self._update_visible()
+
+    @property
+    def total(self):
+        """Gets the count of the shown entries."""
+        return self._total
+
+    @property
+    def filtered(self):
+        return self._filtered
+
+    @property
+    def generation(self):
+        """Gets a number that changes whenever the shown entries change, by filters or appended data."""
+        return self._generation
+
+    @property
+    def count(self):
+        """Gets the count of the entries, including the filtered ones."""
+        return self._count
+
+    @property
+    def options(self):
+        """Gets the options of the log, including the compiled :class:`pycolog.tags.TagMatcher`."""
+        return self._options
+
+    @property
+    def tag_matcher(self):
+        """Gets the :class:`pycolog.tags.TagMatcher` of the layout."""
+        return self._options['tag_matcher']
+
+    @property
+    def loading(self):
+        """The database is ingested before the log is shown, see :attr:`pycolog.log.Log.loading`."""
+        return False
+
+    @property
+    def progress(self):
+        return None
+
+    def stop(self):
+        """Nothing is loaded in the background, see :meth:`pycolog.log.Log.stop`."""
+
+    @property
+    def filters(self):
+        """Gets the active filters, see :mod:`pycolog.filters`."""
+        return list(self._active)
+
+    def add_filter(self, predicate):
+        """
+        Shows only the entries matching the given predicate (and all other active filters).
+
+        :param predicate: The filter to add
+        :type predicate: pycolog.filters.Predicate
+        :raises TypeError: If the predicate cannot be translated into SQL
+        """
+        self._sql(predicate)
+        self._active.append(predicate)
+        self._update_visible()
+
+    def remove_filter(self, predicate):
+        """
+        Removes an active filter.
+
+        :param predicate: The filter to remove
+        :type predicate: pycolog.filters.Predicate
+        """
+        self._active.remove(predicate)
+        self._update_visible()
+
+    @property
+    def sources(self):
+        """Gets the paths of the input files, in the order they are read."""
+        return list(self._paths)
+
+    def source(self, idx):
+        """Gets the path of the file containing the given entry."""
+        entry_id, _, _ = self._rows(range(self._total)[idx], 1)[0]
+        return self._paths[entry_id >> SHIFT]
+
+    def find_time(self, moment):
+        """
+        Finds the first entry at or after the given time, expecting the entries ordered by time.
+
+        :param moment: The time to find
+        :type moment: datetime
+        :returns: The index of the entry or :attr:`total` if all entries are before the given time
+        :rtype: int
+        """
+        where, params = self._where
+        return self._query(f'SELECT count(*) FROM entries WHERE {where} AND time < ?',
+                           params + [epoch_of(moment)])[0][0]
+
+    def refresh(self):
+        """
+        Ingests the data appended to the input files since they were ingested.
+
+        :returns: `True` if any entry changed
+        :rtype: bool
+        """
+        with timer(self._options, LOAD, 'refresh'):
+            if not self._ingest_files():
+                return False
+            self._kinds = {}
+            self._cached_entry.cache_clear()
+            self._update_visible()
+            return True
+
+    def get_entries(self, slice_):
+        """Get multiple entries given by a slice, the plugins process the entries together."""
+        positions = range(self._total)[slice_]
+        if positions.step == 1:
+            rows = self._rows(positions.start, len(positions)) if positions else []
+        else:
+            rows = [self._rows(position, 1)[0] for position in positions]
+        entries = [self._cached_entry(entry_id, raw) for entry_id, raw, _ in rows]
+        plugins.post_construct_batch(entries, self._options)
+        return entries
+
+    def get_entry(self, idx):
+        """Get one specific entry."""
+        entry_id, raw, _ = self._rows(range(self._total)[idx], 1)[0]
+        return self._cached_entry(entry_id, raw)
+
+    def text(self, idx, interpreted=False):
+        """Gets the text of one specific entry, see :meth:`pycolog.log.Log.text`."""
+        return next(iter(self.texts(idx, idx + 1, interpreted)))
+
+    def texts(self, begin, end, interpreted=False):
+        """Gets the texts of a range of entries, see :meth:`pycolog.log.Log.texts`."""
+        for first in range(begin, end, stream.BATCH_SIZE):
+            for _, raw, _ in self._rows(first, min(stream.BATCH_SIZE, end - first)):
+                if interpreted:
+                    entry = LogEntry(raw, entry_layout=self._entry_layout)
+                    yield entry.interpreted or raw
+                else:
+                    yield raw
+
+    def search(self, pattern, begin, end, interpreted=False):
+        """
+        Gets the indices of the entries in a range whose text contains the pattern, see :meth:`pycolog.log.Log.search`.
+        The raw text is only read for the entries found by the full-text index, if the pattern requires a literal.
+        """
+        literal = required_literal(pattern)
+        if interpreted or not self._fts or not literal or len(literal) < 3:
+            return [idx for idx, text in enumerate(self.texts(begin, end, interpreted), begin) if pattern.search(text)]
+        candidates = 'CASE WHEN id IN (SELECT rowid FROM raw_fts WHERE raw_fts MATCH ?) THEN raw END'
+        rows = self._rows(begin, end - begin, (candidates, [_fts_phrase(literal)]))
+        return [idx for idx, (_, raw, _) in enumerate(rows, begin) if raw is not None and pattern.search(raw)]
+
+    def _create_entry(self, entry_id, raw):  # pylint: disable=unused-argument
+        return LogEntry(raw, entry_layout=self._entry_layout)
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def _match(self, key, raw):
+        return 1 if self._functions[key](raw) else 0
+
+    def _prepare(self):
+        """
+        Recreates the tables if the database was created for another layout or other files.
+        The meta data is only written once the first ingest is complete, so an interrupted ingest starts over.
+
+        :returns: The meta data to write after the first ingest, None if the tables are kept
+        :rtype: dict
+        """
+        expected = {
+            'format': str(FORMAT),
+            'layout': layout_hash(self._options),
+            'time_field': self._time_field,
+            'files': json.dumps([os.path.abspath(path) for path in self._paths]),
+        }
+        meta = {}
+        if self._db.execute("SELECT 1 FROM sqlite_master WHERE name = 'meta'").fetchone():
+            meta = dict(self._db.execute('SELECT key, value FROM meta'))
+        if meta == expected:
+            return None
+
+        with self._db:
+            for table in _TABLES:
+                self._db.execute(f'DROP TABLE IF EXISTS {table}')
+            self._create()
+            self._db.executemany('INSERT INTO files VALUES (?, ?, 0, 0, 0, 0, 0)', enumerate(self._paths))
+            self._db.executemany('INSERT INTO tags VALUES (?, ?)', enumerate(self.tag_matcher.names))
+        return expected
+
+    def _load_tags(self):
+        """
+        Gets the ids of the tags in the `tags` table by the bits of the tag matcher, the ids are stored
+        by name, so they do not depend on the order of the tags in the layout.
+
+        :rtype: list[int]
+        """
+        with self._db:
+            ids = dict(self._db.execute('SELECT name, id FROM tags'))
+            for name in self.tag_matcher.names:
+                if name not in ids:
+                    ids[name] = self._db.execute('INSERT INTO tags (name) VALUES (?)', (name,)).lastrowid
+        return [ids[name] for name in self.tag_matcher.names]
+
+    def _create(self):
+        fields = ''.join(f', {_column(field)}' for field in self._fields)
+        self._db.execute('CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)')
+        self._db.execute('CREATE TABLE files (id INTEGER PRIMARY KEY, path TEXT, size INTEGER, mtime INTEGER, '
+                         'inode INTEGER, count INTEGER, last_start INTEGER)')
+        self._db.execute(f'CREATE TABLE entries (id INTEGER PRIMARY KEY, time INTEGER, raw TEXT{fields})')
+        self._db.execute('CREATE TABLE tags (id INTEGER PRIMARY KEY, name TEXT)')
+        self._db.execute('CREATE TABLE entry_tags (tag INTEGER, entry INTEGER, PRIMARY KEY (tag, entry)) WITHOUT ROWID')
+        try:
+            self._db.execute("CREATE VIRTUAL TABLE raw_fts USING fts5(raw, content='entries', content_rowid='id', "
+                             "tokenize='trigram')")
+        except sqlite3.OperationalError:
+            pass
+
+    def _create_indexes(self):
+        """
+        Creates the indexes after the first ingest, which is much faster than updating them for every
+        inserted entry. The full-text index is kept up to date by triggers from then on.
+        """
+        self._db.execute('CREATE INDEX entries_time ON entries (time, id)')
+        for field in self._fields:
+            self._db.execute(f'CREATE INDEX {_column("index_" + field)} ON entries ({_column(field)})')
+        if not self._fts:
+            return
+        self._db.execute("INSERT INTO raw_fts (raw_fts) VALUES ('rebuild')")
+        self._db.execute('CREATE TRIGGER entries_insert AFTER INSERT ON entries BEGIN '
+                         'INSERT INTO raw_fts (rowid, raw) VALUES (new.id, new.raw); END')
+        self._db.execute('CREATE TRIGGER entries_delete AFTER DELETE ON entries BEGIN '
+                         "INSERT INTO raw_fts (raw_fts, rowid, raw) VALUES ('delete', old.id, old.raw); END")
+
+    def _ingest_files(self):
+        changed = False
+        files = self._db.execute('SELECT id, size, mtime, inode, count, last_start FROM files ORDER BY id').fetchall()
+        for (file_id, size, mtime, inode, count, last_start), path in zip(files, self._paths):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if (stat.st_size, stat.st_mtime_ns, stat.st_ino) == (size, mtime, inode):
+                continue
+
+            base = file_id << SHIFT
+            if stat.st_size < size or stat.st_ino != inode:
+                begin, local = 0, 0
+            else:
+                begin, local = last_start, max(count - 1, 0)
+            with self._lock, self._db:
+                self._delete(base + local, base + (1 << SHIFT))
+                self._ingest(file_id, path, begin, local, stat)
+            changed = True
+        return changed
+
+    def _delete(self, first, end):
+        self._db.execute('DELETE FROM entries WHERE id >= ? AND id < ?', (first, end))
+        self._db.executemany('DELETE FROM entry_tags WHERE tag = ? AND entry >= ? AND entry < ?',
+                             ((tag, first, end) for tag in self._tag_ids))
+
+    def _ingest(self, file_id, path, begin, local, stat):
+        base = file_id << SHIFT
+        previous = self._db.execute('SELECT time FROM entries WHERE id >= ? AND id < ? ORDER BY id DESC LIMIT 1',
+                                    (base, base + local)).fetchone()
+        last_time = previous[0] if previous else MISSING
+        placeholders = ', '.join('?' * (3 + len(self._fields)))
+
+        log_file = LogFile(path, self._entry_start, dict(self._options, since=None, until=None), scan=False)
+        try:
+            last_start = begin
+            for window in stream.windows(log_file, self._entry_start, begin):
+                rows, tags = [], []
+                for idx in range(len(window)):
+                    raw = window.raw(idx)
+                    entry = LogEntry(raw, entry_layout=self._entry_layout)
+                    moment = entry[self._time_field]
+                    if isinstance(moment, (datetime, int)):
+                        last_time = epoch_of(moment)
+                    rows.append((base + local, last_time, raw) + tuple(_value(entry[field]) for field in self._fields))
+                    tags.extend((self._tag_ids[bit], base + local) for bit in _bits(entry.tag_mask))
+                    local += 1
+                self._db.executemany(f'INSERT INTO entries VALUES ({placeholders})', rows)
+                self._db.executemany('INSERT INTO entry_tags VALUES (?, ?)', tags)
+                last_start = window.starts[-1] if len(window) else last_start
+        finally:
+            log_file.close()
+        self._db.execute('UPDATE files SET size = ?, mtime = ?, inode = ?, count = ?, last_start = ? WHERE id = ?',
+                         (stat.st_size, stat.st_mtime_ns, stat.st_ino, local, last_start, file_id))
+
+    def _kind(self, field):
+        """
+        Gets the kind of the stored values of a field, see :class:`_Translator`. Only the smallest and the
+        largest value are queried by the index of the field, as SQLite orders the numbers before the texts.
+        """
+        if field not in self._fields:
+            raise KeyError(field)
+        if field not in self._kinds:
+            column = _column(field)
+            first = self._query(f'SELECT min({column}) FROM entries')[0][0]
+            last = self._query(f'SELECT max({column}) FROM entries')[0][0]
+            if first is None or isinstance(first, str):
+                self._kinds[field] = TEXT
+            elif isinstance(first, int) and isinstance(last, int):
+                self._kinds[field] = INTEGER
+            else:
+                self._kinds[field] = None
+        return self._kinds[field]
+
+    def _sql(self, predicate):
+        """Translates a predicate into an SQL condition on the `entries` table and its parameters."""
+        translator = _Translator(predicate.key, self._functions, dict(zip(self.tag_matcher.names, self._tag_ids)),
+                                 self._fts, self._kind)
+        if isinstance(predicate, Tag):
+            return translator.tag(predicate.name)
+        if isinstance(predicate, Not):
+            condition, params = self._sql(predicate.predicate)
+            return f'NOT ({condition})', params
+        if isinstance(predicate, (All, Any)):
+            if not predicate.predicates:
+                return ('1' if isinstance(predicate, All) else '0'), []
+            parts = [self._sql(part) for part in predicate.predicates]
+            operator = ' AND ' if isinstance(predicate, All) else ' OR '
+            return operator.join(f'({condition})' for condition, _ in parts), [p for _, params in parts for p in params]
+        if isinstance(predicate, Pattern):
+            return translator.search(predicate.pattern)
+        if isinstance(predicate, Query):
+            return predicate.sql(translator)
+        raise TypeError(f'Filter {predicate} is not supported by the database')
+
+    def _update_visible(self):
+        self._generation += 1
+        self._anchors = []
+        self._anchor_keys = {}
+
+        conditions, params = ['1'], []
+        if self._options.get('since'):
+            conditions.append('time >= ?')
+            params.append(epoch_of(self._options['since']))
+        if self._options.get('until'):
+            conditions.append('time <= ?')
+            params.append(epoch_of(self._options['until']))
+        bounds = ' AND '.join(conditions), list(params)
+        for predicate in self._active:
+            condition, predicate_params = self._sql(predicate)
+            conditions.append(f'({condition})')
+            params.extend(predicate_params)
+        self._where = ' AND '.join(conditions), params
+
+        self._seeks = None
+        if not bounds[1]:
+            counts = self._query('SELECT id, count FROM files ORDER BY id')
+            self._count = sum(count for _, count in counts)
+            if not self._active and self._order == ('id',):
+                self._seeks = list(accumulate(count for _, count in counts)), [file_id for file_id, _ in counts]
+        else:
+            self._count = self._query(f'SELECT count(*) FROM entries WHERE {bounds[0]}', bounds[1])[0][0]
+        self._total = self._count
+        if self._active:
+            self._total = self._query(f'SELECT count(*) FROM entries WHERE {self._where[0]}', params)[0][0]
+        self._filtered = self._count - self._total
+
+    def _rows(self, first, count, text=('raw', [])):
+        """
+        Queries the shown entries at the given positions, starting at the id of the first position if all entries
+        are shown in the order of the files, otherwise at the nearest queried position.
+
+        :param text: SQL expression of the queried text and its parameters, defaults to the raw text
+        :type text: tuple
+        :returns: Tuples of the id, the text and the time of the entries
+        :rtype: list[tuple]
+        """
+        if count <= 0:
+            return []
+        with self._lock:
+            if self._seeks is not None:
+                ends, file_ids = self._seeks
+                idx = bisect_right(ends, first)
+                start = (file_ids[idx] << SHIFT) + first - (ends[idx - 1] if idx else 0)
+                return self._db.execute(f'SELECT id, {text[0]}, time FROM entries WHERE id >= ? ORDER BY id LIMIT ?',
+                                        text[1] + [start, count]).fetchall()
+
+            last = first + count - 1
+            idx = bisect_left(self._anchors, first)
+            below = self._anchors[idx - 1] if idx else -1
+            idx = bisect_right(self._anchors, last)
+            above = self._anchors[idx] if idx < len(self._anchors) else self._total
+
+            where, params = self._where
+            order = ', '.join(self._order)
+            keys = '(' + ', '.join(self._order) + ')'
+            if first - below - 1 <= above - 1 - last:
+                anchor = self._anchor_keys.get(below)
+                keyset = f' AND {keys} > ({", ".join("?" * len(anchor))})' if anchor else ''
+                rows = self._db.execute(
+                    f'SELECT id, {text[0]}, time FROM entries WHERE {where}{keyset} ORDER BY {order} LIMIT ? OFFSET ?',
+                    text[1] + params + list(anchor or ()) + [count, first - below - 1]).fetchall()
+            else:
+                anchor = self._anchor_keys.get(above)
+                keyset = f' AND {keys} < ({", ".join("?" * len(anchor))})' if anchor else ''
+                descending = ', '.join(f'{key} DESC' for key in self._order)
+                rows = self._db.execute(
+                    f'SELECT id, {text[0]}, time FROM entries WHERE {where}{keyset} ORDER BY {descending} '
+                    'LIMIT ? OFFSET ?',
+                    text[1] + params + list(anchor or ()) + [count, above - 1 - last]).fetchall()[::-1]
+            self._remember(first, rows)
+            return rows
+
+    def _remember(self, first, rows):
+        if len(self._anchors) + len(rows) > ANCHORS:
+            self._anchors = []
+            self._anchor_keys = {}
+        for position, (entry_id, _, moment) in enumerate(rows, first):
+            if position not in self._anchor_keys:
+                insort(self._anchors, position)
+            self._anchor_keys[position] = (moment, entry_id) if len(self._order) == 2 else (entry_id,)
@@ -0,0 +1,142 @@
+"""
+Module for the encoding of the log files.
+The files are scanned as bytes: the entry boundaries, the `line_format` and the tag patterns are matched
+against the undecoded data and only the entries that are shown, filtered by text or passed to field callbacks
+are decoded. The encoding and the handling of invalid bytes are set by the layout::
+
+    encoding: latin-1   # defaults to utf-8
+    errors: replace     # defaults to replace, any error handler of `bytes.decode`, e.g. strict or ignore
+
+A pattern is matched as bytes if every character of it is encoded as one byte (e.g. an ASCII pattern
+in UTF-8 or any pattern in Latin-1) and it matches the same text as bytes. Patterns containing classes
+(e.g. `\\w`, `\\s`, `\\d`), word boundaries, `.`, negated sets or case-insensitive parts are matched against
+the decoded text, as they would only cover ASCII characters or single bytes of multibyte characters.
+So are patterns with escaped non-ASCII characters (e.g. `caf\\xe9` or `[\\x80-\\xff]`), unless the encoding
+encodes these characters as the byte of the same value (e.g. Latin-1).
+"""
+import codecs
+import re
+
+try:
+    from re import _constants as sre_constants, _parser as sre_parse  # pylint: disable=no-name-in-module
+except ImportError:  # Python < 3.11
+    import sre_constants  # pylint: disable=deprecated-module
+    import sre_parse  # pylint: disable=deprecated-module
+
+DEFAULT_ENCODING = 'utf-8'
+"""Encoding of the log files if the layout does not set one."""
+
+DEFAULT_ERRORS = 'replace'
+"""Handling of invalid bytes if the layout does not set one, invalid bytes are shown as replacement character."""
+
+_ASCII = ' \n\t-:.0123456789AZaz'
+
+
+class Codec:
+    """
+    Decodes the data of the log files and converts patterns to match the undecoded data.
+
+    :param encoding: Name of an ASCII compatible encoding
+    :type encoding: str
+    :param errors: Error handler for invalid bytes, see :meth:`bytes.decode`
+    :type errors: str
+    :raises ValueError: If the encoding is not ASCII compatible, e.g. UTF-16
+    """
+    __slots__ = ('encoding', 'errors')
+
+    def __init__(self, encoding=DEFAULT_ENCODING, errors=DEFAULT_ERRORS):
+        self.encoding = codecs.lookup(encoding).name
+        self.errors = errors
+        codecs.lookup_error(errors)
+        if _ASCII.encode(self.encoding) != _ASCII.encode('ascii'):
+            raise ValueError(f'The encoding {encoding} is not ASCII compatible')
+
+    def decode(self, data):
+        """
+        Decodes data of the log files, e.g. an entry or the value of a field.
+
+        :param data: The undecoded data
+        :type data: bytes
+        :rtype: str
+        """
+        return str(data, self.encoding, self.errors)
+
+    def to_bytes(self, pattern):
+        """
+        Converts a pattern to match the undecoded data, if it matches the same text.
+
+        :param pattern: Compiled regular expression
+        :type pattern: re.Pattern
+        :returns: The pattern compiled as bytes or `None` if it has to be matched against the decoded text
+        :rtype: re.Pattern
+        """
+        if pattern is None or isinstance(pattern.pattern, bytes):
+            return pattern
+        try:
+            data = pattern.pattern.encode(self.encoding)
+        except UnicodeEncodeError:
+            return None
+        if len(data) != len(pattern.pattern) or pattern.flags & re.IGNORECASE:
+            return None
+        try:
+            if _unicode_sensitive(sre_parse.parse(pattern.pattern, pattern.flags), self.encoding):
+                return None
+            return re.compile(data, pattern.flags & ~re.UNICODE)
+        except re.error:
+            return None
+
+
+_SENSITIVE = {sre_constants.ANY, sre_constants.CATEGORY, sre_constants.NOT_LITERAL}
+_BOUNDARIES = {sre_constants.AT_BOUNDARY, sre_constants.AT_NON_BOUNDARY}
+
+
+def _same_byte(value, encoding):
+    """Checks whether the character of the given code point is encoded as the byte of the same value."""
+    if value < 0x80:
+        return True
+    if value > 0xff:
+        return False
+    try:
+        return chr(value).encode(encoding) == bytes([value])
+    except UnicodeEncodeError:
+        return False
+
+
+def _unicode_sensitive(parsed, encoding):
+    """Checks whether a parsed pattern contains a part that matches other text if matched as bytes."""
+    for operator, argument in parsed:
+        if operator in _SENSITIVE:
+            return True
+        if operator is sre_constants.AT and argument in _BOUNDARIES:
+            return True
+        if operator is sre_constants.LITERAL and not _same_byte(argument, encoding):
+            return True
+        if operator is sre_constants.IN:
+            for item, value in argument:
+                if item in (sre_constants.NEGATE, sre_constants.CATEGORY):
+                    return True
+                if item is sre_constants.LITERAL and not _same_byte(value, encoding):
+                    return True
+                if item is sre_constants.RANGE and not all(_same_byte(code, encoding)
+                                                          for code in range(value[0], min(value[1], 0x100) + 1)):
+                    return True
+            continue
+        if operator is sre_constants.SUBPATTERN and argument[1] & re.IGNORECASE:
+            return True
+        for item in argument if isinstance(argument, (tuple, list)) else ():
+            children = item if isinstance(item, list) else [item]
+            if any(isinstance(child, sre_parse.SubPattern) and _unicode_sensitive(child, encoding)
+                   for child in children):
+                return True
+    return False
+
+
+def codec_of(options):
+    """
+    Gets the codec set by the layout.
+
+    :param options: Options of the log
+    :type options: dict
+    :rtype: Codec
+    """
+    return Codec(options.get('encoding') or DEFAULT_ENCODING, options.get('errors') or DEFAULT_ERRORS)
@@ -0,0 +1,215 @@
+"""
+Module for the filter engine.
+Every predicate is evaluated once into a bitmap over all entries of a log (bit `n` is set if
+the `n`-th entry matches), which is cached. Combining predicates is then a bitwise operation.
+"""
+from array import array
+from itertools import compress
+import re
+
+_TO_DIGITS = bytes.maketrans(b'\x00\x01', b'01')
+_FROM_DIGITS = bytes.maketrans(b'01', b'\x00\x01')
+
+
+def to_bitmap(flags):
+    """
+    Converts a flag per entry into a bitmap.
+
+    :param flags: One truth value per entry
+    :type flags: iterable
+    :rtype: int
+    """
+    digits = bytes(map(bool, flags)).translate(_TO_DIGITS)[::-1]
+    return int(digits, 2) if digits else 0
+
+
+def to_indices(bitmap, count):
+    """
+    Converts a bitmap into the array of the indices of the set bits.
+
+    :param bitmap: The bitmap
+    :type bitmap: int
+    :param count: Number of entries in the bitmap
+    :type count: int
+    :rtype: array.array
+    """
+    if not count:
+        return array('q')
+    flags = format(bitmap & ((1 << count) - 1), f'0{count}b')[::-1].encode().translate(_FROM_DIGITS)
+    return array('q', compress(range(count), flags))
+
+
+class Predicate:
+    """
+    Base class of a predicate, the key identifies equal predicates for the bitmap cache.
+
+    :param key: Textual representation of the predicate
+    :type key: str
+    """
+    def __init__(self, key):
+        self.key = key
+
+    def __str__(self):
+        return self.key
+
+    def evaluate(self, filters, first):
+        """
+        Calculates the bitmap of the entries starting at the given index.
+
+        :param filters: The filter engine to get the bitmaps of other predicates from
+        :type filters: Filters
+        :param first: Index of the first entry to evaluate, all lower bits are ignored
+        :type first: int
+        :rtype: int
+        """
+        raise NotImplementedError()
+
+
+class EntryPredicate(Predicate):
+    """Base class of a predicate that is evaluated entry by entry of every file."""
+    def evaluate(self, filters, first):
+        bitmap = 0
+        for offset, log_file, local in filters.log.files_from(first):
+            bitmap |= to_bitmap(self.flags(filters.log, log_file, local)) << (offset + local)
+        return bitmap
+
+    def flags(self, log, log_file, first):
+        """Gets the truth values of the entries of a file, starting at the given index."""
+        raise NotImplementedError()
+
+
+class Tag(EntryPredicate):
+    """Matches entries having the given tag."""
+    def __init__(self, name):
+        super().__init__(f'#{name}')
+        self.name = name
+
+    def flags(self, log, log_file, first):
+        bit = log.tag_matcher.mask_of([self.name])
+        return (mask & bit for mask in log_file.column('tags').data[first:])
+
+
+class Pattern(EntryPredicate):
+    """Matches entries whose raw text contains the given regular expression."""
+    def __init__(self, pattern):
+        super().__init__(f'/{pattern.pattern}/')
+        self.pattern = pattern
+
+    def flags(self, log, log_file, first):
+        search = self.pattern.search
+        return (search(log_file.raw(idx)) for idx in range(first, len(log_file)))
+
+
+class Not(Predicate):
+    """Matches entries not matching the given predicate."""
+    def __init__(self, predicate):
+        super().__init__(f'!{predicate.key}')
+        self.predicate = predicate
+
+    def evaluate(self, filters, first):
+        return ~filters.bitmap(self.predicate) & filters.all
+
+
+class All(Predicate):
+    """Matches entries matching all given predicates."""
+    def __init__(self, predicates):
+        super().__init__('(' + ' & '.join(p.key for p in predicates) + ')')
+        self.predicates = predicates
+
+    def evaluate(self, filters, first):
+        bitmap = filters.all
+        for predicate in self.predicates:
+            bitmap &= filters.bitmap(predicate)
+        return bitmap
+
+
+class Any(Predicate):
+    """Matches entries matching any of the given predicates."""
+    def __init__(self, predicates):
+        super().__init__('(' + ' | '.join(p.key for p in predicates) + ')')
+        self.predicates = predicates
+
+    def evaluate(self, filters, first):
+        bitmap = 0
+        for predicate in self.predicates:
+            bitmap |= filters.bitmap(predicate)
+        return bitmap
+
+
+def from_layout(section):
+    """
+    Converts the `filter` section of the layout into a predicate of the entries to keep.
+    Entries containing any tag of `contain` or missing any tag of `not_contain` are filtered.
+
+    :param section: The `filter` section of the layout
+    :type section: dict
+    :returns: The predicate or `None` if nothing is filtered
+    :rtype: Predicate
+    """
+    tags = (section or {}).get('tags', {})
+    keep = [Not(Tag(tag)) for tag in tags.get('contain', [])] + [Tag(tag) for tag in tags.get('not_contain', [])]
+    return All(keep) if keep else None
+
+
+def parse(text):
+    """
+    Parses a filter entered by the user: `#tag` matches a tag, `/regex/` a regular expression,
+    any other text is searched literally. A leading `!` inverts the filter.
+
+    :param text: The entered filter
+    :type text: str
+    :rtype: Predicate
+    """
+    text = text.strip()
+    if text.startswith('!'):
+        return Not(parse(text[1:]))
+    if text.startswith('#'):
+        return Tag(text[1:])
+    if len(text) > 1 and text.startswith('/') and text.endswith('/'):
+        return Pattern(re.compile(text[1:-1]))
+    return Pattern(re.compile(re.escape(text)))
+
+
+class Filters:
+    """
+    Active filters of a log with the cached bitmaps of all evaluated predicates.
+
+    :param log: The log to filter
+    :type log: pycolog.log.Log
+    """
+    def __init__(self, log):
+        self.log = log
+        self.active = []
+        self._bitmaps = {}
+
+    @property
+    def all(self):
+        """Gets the bitmap containing all entries."""
+        return (1 << self.log.count) - 1
+
+    def bitmap(self, predicate):
+        """Gets the bitmap of a predicate, evaluating only the entries added since it was cached."""
+        bitmap, count = self._bitmaps.get(predicate.key, (0, 0))
+        if count != self.log.count:
+            bitmap |= predicate.evaluate(self, count) & ~((1 << count) - 1)
+            self._bitmaps[predicate.key] = bitmap, self.log.count
+        return bitmap
+
+    def invalidate(self, first):
+        """Drops the cached results of all entries at and after the given index."""
+        mask = (1 << first) - 1
+        self._bitmaps = {key: (bitmap & mask, min(count, first)) for key, (bitmap, count) in self._bitmaps.items()}
+
+    def visible(self):
+        """
+        Gets the indices of the entries matching all active filters.
+
+        :returns: The indices or `None` if there is no active filter
+        :rtype: array.array
+        """
+        if not self.active:
+            return None
+        bitmap = self.all
+        for predicate in self.active:
+            bitmap &= self.bitmap(predicate)
+        return to_indices(bitmap, self.log.count)
@@ -0,0 +1,113 @@
+"""
+Module for the highlight rules of the log screen.
+All rules of the layout are compiled into one :class:`Highlighter`: field rules into a lookup per field,
+pattern rules into one combined regular expression and tag rules into a table of the tag bitmasks.
+The first rule (in the order of the layout) that matches an entry decides its color.
+"""
+import re
+
+_BACKREFERENCE = re.compile(r'\\\d|\(\?P=')
+
+
+class Highlighter:
+    """
+    Resolves the color of an entry by the `highlight` section of the layout.
+
+    Rules:
+
+    * `match: field` with `field` and `is` colors entries whose field equals the value
+    * `match: pattern` with `pattern` colors entries whose raw message contains the regular expression
+    * `match: tag` with `tag` colors entries having the tag
+
+    :param rules: The `highlight` section of the layout, the `color` of every rule is the color pair to use
+    :type rules: list[dict]
+    :param tag_matcher: Matcher of the tags of the layout, required for tag rules
+    :type tag_matcher: pycolog.tags.TagMatcher
+    """
+    def __init__(self, rules, tag_matcher=None):
+        self._fields = {}
+        patterns = []
+        tags = []
+        self._colors = []
+        for rank, rule in enumerate(rules):
+            self._colors.append(rule.get('color') or 0)
+            match = rule.get('match')
+            if match == 'field':
+                self._fields.setdefault(rule['field'], {}).setdefault(rule['is'], rank)
+            elif match == 'pattern':
+                patterns.append((rank, rule['pattern']))
+            elif match == 'tag' and tag_matcher is not None:
+                tags.append((tag_matcher.mask_of([rule['tag']]), rank))
+
+        self._patterns = patterns
+        self._ranks = {f'_{idx}': rank for idx, (rank, _) in enumerate(patterns)}
+        self._combined = _combine(pattern for _, pattern in patterns)
+        self._tags = tags
+        self._tag_ranks = {}
+
+    def __bool__(self):
+        return bool(self._fields or self._patterns or self._tags)
+
+    def color(self, entry):
+        """
+        Gets the color of the entry.
+
+        :param entry: The entry to highlight
+        :type entry: pycolog.log_entry.LogEntry
+        :returns: The color pair of the first matching rule or 0 if no rule matches
+        :rtype: int
+        """
+        rank = len(self._colors)
+        for field, values in self._fields.items():
+            try:
+                rank = min(rank, values.get(entry[field], rank))
+            except TypeError:
+                continue
+        if self._tags:
+            rank = min(rank, self._tag_rank(entry.tag_mask))
+        if self._patterns:
+            rank = self._pattern_rank(entry.raw, rank)
+        return self._colors[rank] if rank < len(self._colors) else 0
+
+    def _tag_rank(self, mask):
+        rank = self._tag_ranks.get(mask)
+        if rank is None:
+            ranks = (rank for bit, rank in self._tags if mask & bit)
+            rank = self._tag_ranks[mask] = min(ranks, default=len(self._colors))
+        return rank
+
+    def _pattern_rank(self, raw, rank):
+        if self._combined is not None:
+            match = self._combined.search(raw)
+            if match is None:
+                return rank
+            rank = min(rank, self._ranks[match.lastgroup])
+
+        for pattern_rank, pattern in self._patterns:
+            if pattern_rank >= rank:
+                break
+            if pattern.search(raw):
+                return pattern_rank
+        return rank
+
+
+def _combine(patterns):
+    """
+    Combines the patterns into one alternation, a search of it finds a match if any pattern matches.
+
+    :returns: The combined pattern or `None` if the patterns cannot be combined (e.g. for back references)
+    :rtype: re.Pattern
+    """
+    parts = []
+    for idx, pattern in enumerate(patterns):
+        if not isinstance(pattern.pattern, str) or pattern.flags & ~re.UNICODE:
+            return None
+        if _BACKREFERENCE.search(pattern.pattern):
+            return None
+        parts.append(f'(?P<_{idx}>{pattern.pattern})')
+    if not parts:
+        return None
+    try:
+        return re.compile('|'.join(parts))
+    except re.error:
+        return None
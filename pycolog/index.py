@@ -0,0 +1,173 @@
+"""
+Module for the persistent sidecar index.
+The index stores the entry offsets and computed columns of a log file,
+so that reopening the same (or an appended) file does not need to scan it again.
+"""
+import hashlib
+import os
+import pathlib
+import pickle
+
+from pycolog.compressed import SeekPoints
+
+FORMAT = 2
+"""Version of the stored index, indexes with another version are ignored."""
+
+TAIL_SIZE = 4096
+"""Number of bytes before the indexed end of a file, used to verify that the file was only appended."""
+
+
+def _describe(value):
+    if hasattr(value, 'pattern') and hasattr(value, 'flags'):
+        return [value.pattern, value.flags]
+    if isinstance(value, dict):
+        return sorted((str(k), _describe(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return [_describe(v) for v in value]
+    if callable(value):
+        return f'{value.__module__}.{value.__qualname__}'
+    return value
+
+
+def layout_hash(options):
+    """
+    Calculates the hash of the parts of the layout that influence the indexed data.
+
+    :param options: Options of the log
+    :type options: dict
+    :rtype: str
+    """
+    keys = ('line_start', 'line_format', 'fields', 'columns', 'encoding', 'errors')
+    layout = [_describe(options.get(key)) for key in keys]
+    # the bits of the tags follow their order in the layout
+    layout.append([(name, _describe(tag)) for name, tag in (options.get('tags') or {}).items()])
+    return hashlib.sha1(repr(layout).encode()).hexdigest()
+
+
+def _tail_hash(buffer, size):
+    return hashlib.sha1(buffer[max(0, size - TAIL_SIZE):size]).hexdigest()
+
+
+class Index:
+    """
+    Directory of index files, one per log file and layout.
+
+    :param directory: Directory to store the index files in
+    :type directory: pathlib.Path
+    :param options: Options of the log
+    :type options: dict
+    """
+    def __init__(self, directory, options):
+        self._directory = pathlib.Path(directory)
+        self._layout = layout_hash(options)
+
+    def _path(self, file_path, layout=True, suffix='.idx'):
+        key = f'{os.path.abspath(file_path)}\0{self._layout if layout else ""}'
+        return self._directory / f'{hashlib.sha1(key.encode()).hexdigest()}{suffix}'
+
+    def restore_seek_points(self, file_path, stat):
+        """
+        Restores the seek points of a compressed file, they do not depend on the layout.
+
+        :param file_path: Path of the compressed file
+        :type file_path: str
+        :param stat: Current status of the compressed file, see :func:`os.stat`
+        :type stat: os.stat_result
+        :returns: The seek points or `None` if the file has been changed since they were stored
+        :rtype: pycolog.compressed.SeekPoints
+        """
+        data = self._load(self._path(file_path, layout=False, suffix='.seek'),
+                          ('size', 'mtime', 'inode', 'points', 'decompressed'))
+        if data is None:
+            return None
+        if (data['size'], data['mtime'], data['inode']) != (stat.st_size, stat.st_mtime_ns, stat.st_ino):
+            return None
+        return SeekPoints(data['points'], data['decompressed'])
+
+    def store_seek_points(self, file_path, stat, seek_points):
+        """
+        Writes the seek points of a compressed file.
+
+        :param file_path: Path of the compressed file
+        :type file_path: str
+        :param stat: Status of the compressed file when it was decompressed, see :func:`os.stat`
+        :type stat: os.stat_result
+        :param seek_points: The seek points found while decompressing the file
+        :type seek_points: pycolog.compressed.SeekPoints
+        """
+        self._dump(self._path(file_path, layout=False, suffix='.seek'), {
+            'format': FORMAT,
+            'size': stat.st_size,
+            'mtime': stat.st_mtime_ns,
+            'inode': stat.st_ino,
+            'points': seek_points.points,
+            'decompressed': seek_points.size,
+        })
+
+    def restore(self, log_file):
+        """
+        Restores the offsets and columns of the given log file from its index.
+
+        :param log_file: File to restore, the offsets and columns are replaced
+        :type log_file: pycolog.log_file.LogFile
+        :returns: The byte offset to continue scanning from or `None` if the index cannot be used
+        :rtype: int
+        """
+        data = self._load(self._path(log_file.path), ('layout', 'size', 'mtime', 'tail', 'starts', 'ends', 'columns'))
+        if data is None or data['layout'] != self._layout:
+            return None
+
+        unchanged = data['size'] == log_file.size and data['mtime'] == log_file.mtime
+        if not unchanged and not (data['size'] <= log_file.size
+                                  and data['tail'] == _tail_hash(log_file.buffer, data['size'])):
+            return None
+
+        log_file.starts = data['starts']
+        log_file.ends = data['ends']
+        log_file.columns = data['columns']
+        if unchanged or not data['starts']:
+            return data['size']
+        return data['starts'][-1]
+
+    def store(self, log_file):
+        """
+        Writes the index of the given log file, if it was modified since it was restored.
+
+        :param log_file: File to store the index for
+        :type log_file: pycolog.log_file.LogFile
+        """
+        if not log_file.modified:
+            return
+
+        data = {
+            'format': FORMAT,
+            'layout': self._layout,
+            'size': log_file.size,
+            'mtime': log_file.mtime,
+            'tail': _tail_hash(log_file.buffer, log_file.size),
+            'starts': log_file.starts,
+            'ends': log_file.ends,
+            'columns': log_file.columns,
+        }
+
+        self._dump(self._path(log_file.path), data)
+        log_file.modified = False
+
+    @staticmethod
+    def _load(path, keys):
+        """Loads an index file, a missing, corrupt or foreign file is treated as absent."""
+        try:
+            with open(path, 'rb') as file_handle:
+                data = pickle.load(file_handle)
+            if data.get('format') != FORMAT or any(key not in data for key in keys):
+                return None
+            return data
+        except Exception:  # pylint: disable=broad-except
+            return None
+
+    def _dump(self, path, data):
+        self._directory.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_suffix('.tmp')
+        with open(temporary, 'wb') as file_handle:
+            pickle.dump(data, file_handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, path)
@@ -0,0 +1,103 @@
+"""
+Module for loading log files in the background.
+The loader scans the files part by part on a background thread and publishes the scanned parts,
+the owner of the files applies them (see :meth:`pycolog.log_file.LogFile.apply`), so the files
+are only modified by one thread and the first entries can be shown while the rest is scanned.
+"""
+import threading
+from time import perf_counter
+
+from pycolog.scanner import find_entry_start
+
+PART_SIZE = 1024 * 1024
+"""Number of bytes scanned before the part is published."""
+
+
+class Loader:
+    """
+    Background scan of the pending data of files created without scanning.
+
+    :param log_files: The files to scan, see :attr:`pycolog.log_file.LogFile.pending`
+    :type log_files: list[pycolog.log_file.LogFile]
+    :param entry_start: Line start pattern as returned by :func:`pycolog.scanner.compile_entry_start`.
+    :type entry_start: re.Pattern
+    :param columns: Names of the columns to compute while scanning
+    :type columns: list[str]
+    """
+    def __init__(self, log_files, entry_start, columns=()):
+        self.total_bytes = sum(max(log_file.end - log_file.pending, 0) for log_file in log_files)
+        self.scanned_bytes = 0
+        self.entries = 0
+        self.started = perf_counter()
+        self.finished = None
+        self.error = None
+
+        self._files = log_files
+        self._entry_start = entry_start
+        self._columns = list(columns)
+        self._parts = []
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='pycolog-loader', daemon=True)
+        self._thread.start()
+
+    @property
+    def done(self):
+        """
+        Gets whether the scan has ended, the published parts may not have been taken yet.
+        If the scan failed, the exception is kept in `error`.
+        """
+        return self.finished is not None
+
+    def rates(self):
+        """
+        Gets the speed of the scan.
+
+        :returns: Tuple of the scanned bytes and entries per second
+        :rtype: tuple
+        """
+        seconds = max((self.finished or perf_counter()) - self.started, 1e-6)
+        return self.scanned_bytes / seconds, self.entries / seconds
+
+    def take(self):
+        """
+        Takes the parts published since the last call.
+
+        :returns: Tuples of the index of the file and the part, see :meth:`pycolog.log_file.LogFile.scan_part`
+        :rtype: list[tuple]
+        """
+        with self._lock:
+            parts, self._parts = self._parts, []
+        return parts
+
+    def stop(self):
+        """Stops the scan, e.g. if the application quits while loading."""
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self):
+        try:
+            self._scan()
+        except Exception as error:  # pylint: disable=broad-except
+            self.error = error
+        finally:
+            self.finished = perf_counter()
+
+    def _scan(self):
+        for file_idx, log_file in enumerate(self._files):
+            begin, end = log_file.pending, log_file.end
+            while begin < end:
+                if self._stopped.is_set():
+                    return
+                stop = end
+                if begin + PART_SIZE < end:
+                    stop = find_entry_start(log_file.buffer, self._entry_start, begin + PART_SIZE, end)
+                part = log_file.scan_part(begin, stop, self._columns)
+                with self._lock:
+                    self._parts.append((file_idx, part))
+                    self.scanned_bytes += stop - begin
+                    self.entries += len(part[1])
+                begin = stop
+        errors = [log_file.error for log_file in self._files if log_file.error is not None]
+        if errors:
+            raise errors[0]
@@ -1,8 +1,27 @@
 """Module for `Log`"""
+from array import array
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
 from glob import glob
+from itertools import accumulate
 import re
 
-from pycolog.log_entry import LogEntry
+from pycolog import filters, plugins
+from pycolog.columns import MISSING, epoch_of
+from pycolog.encoding import codec_of
+from pycolog.filters import Filters
+from pycolog.index import Index
+from pycolog.loader import Loader
+from pycolog.log_file import TIME_FIELD, LogFile
+from pycolog.merge import MergeIndex
+from pycolog.parallel import scan as scan_parallel
+from pycolog.query import Query
+from pycolog.scanner import compile_entry_start
+from pycolog.stats import LOAD, timer
+from pycolog.tags import TagMatcher
+
+CACHE_SIZE = 1024
+"""Default number of entries kept in the cache of recently requested entries."""
 
 
 def _expand_file_paths(file_paths):
@@ -10,35 +29,127 @@ def _expand_file_paths(file_paths):
         yield from glob(str(file_path))
 
 
+def _time_before(log_file, idx):
+    """Gets the time of the last entry before the given index that has a time."""
+    for previous in range(idx - 1, -1, -1):
+        time = log_file.time(previous)
+        if time != MISSING:
+            return time
+    return MISSING
+
+
 def _natural_sort(files):
     return sorted(files, key=lambda key: [int(c) if c.isdigit() else c.lower() for c in re.split('([0-9]+)', key)])
 
 
+def input_files(file_paths):
+    """
+    Expands the glob patterns of the input files and sorts the paths naturally (`file_2` before `file_10`).
+
+    :param file_paths: Paths or glob patterns of the input files
+    :type file_paths: list
+    :rtype: list[str]
+    """
+    return _natural_sort(_expand_file_paths(file_paths))
+
+
+def layout_filters(options):
+    """
+    Creates the predicates of the `filter` section of the layout and of the `where` option.
+
+    :param options: Options of the log
+    :type options: dict
+    :rtype: list[pycolog.filters.Predicate]
+    """
+    predicates = []
+    layout_filter = filters.from_layout(options.get('filter'))
+    if layout_filter:
+        predicates.append(layout_filter)
+    for where in ((options.get('filter') or {}).get('where'), options.get('where')):
+        if where:
+            predicates.append(Query(where, options))
+    return predicates
+
+
 class Log:
     """
     The log class splits up the concatenated content of the input files (`files`)
     into multiple messages that can be retrieved by an index or slice later.
 
+    The files are memory mapped and only the byte offsets of the messages are kept,
+    a :class:`LogEntry` is created as soon as a message is requested.
+
     :param files: List of paths to the log files
     :type file: list[str]
     :param line_start: Compiled regular expression containing the line start pattern.
     :type line_start: re.Pattern
+    :param cache_size: Maximum number of created entries to keep for repeated requests.
+    :type cache_size: int
+    :param index_dir: Directory of the persistent index, the files are not indexed persistently if not given.
+    :type index_dir: pathlib.Path
+    :param jobs: Number of processes to scan the files with.
+    :type jobs: int
+    :param columns: Fields to keep in columns for all entries, mapped to the column type (`time` or `category`)
+    :type columns: dict
+    :param time_field: Name of the field containing the time of an entry, defaults to `timestamp`
+    :type time_field: str
+    :param where: Query of the entries to show, see :mod:`pycolog.query`
+    :type where: str
+    :param merge: Whether to order the entries of all files by time, instead of showing the files one after another
+    :type merge: bool
+    :param since: Skip all entries before this time, the files are expected to be ordered by time
+    :type since: datetime
+    :param until: Skip all entries after this time, the files are expected to be ordered by time
+    :type until: datetime
+    :param stats: Stats to measure the phases of loading in, see :mod:`pycolog.stats`
+    :type stats: pycolog.stats.Stats
+    :param background: Whether to scan the files on a background thread, starting with no entries.
+        The scanned entries are added by :meth:`refresh` while :attr:`loading`.
+        Files scanned by multiple `jobs` are always scanned before the log is created.
+    :type background: bool
+    :raises Exception: The error of a compressed file that ended early or is corrupt, see
+        :attr:`pycolog.log_file.LogFile.error`, it is raised by :meth:`refresh` instead if loading in the background
     """
     def __init__(self, **kwargs):
+        with timer(kwargs, LOAD, 'total'):
+            self._load(kwargs)
+
+    def _load(self, kwargs):
         self._options = kwargs
+        kwargs.setdefault('tag_matcher', TagMatcher(kwargs.get('tags', {}), kwargs.get('stats'), codec_of(kwargs)))
+
+        self._entry_start = compile_entry_start(kwargs.get('line_start', re.compile(r'^')), codec_of(kwargs))
 
-        self._entry_start = kwargs.get('line_start', re.compile(r'^'))
+        bounded = kwargs.get('since') or kwargs.get('until')
+        index = Index(kwargs['index_dir'], kwargs) if kwargs.get('index_dir') and not bounded else None
+        jobs = kwargs.get('jobs') or 1
+        if kwargs.get('merge'):
+            kwargs['columns'] = {kwargs.get('time_field', TIME_FIELD): 'time', **kwargs.get('columns', {})}
+        filtered = kwargs.get('filter') or kwargs.get('where')
+        columns = list(kwargs.get('columns', {})) + (['tags'] if filtered else [])
+        background = kwargs.get('background') and jobs == 1
+        files = input_files(kwargs.get('files'))
+        self._files = [LogFile(file_path, self._entry_start, kwargs, index, scan=jobs == 1 and not background,
+                               columns=columns)
+                       for file_path in files]
+        self._index = index
+        self._loader = Loader(self._files, self._entry_start, columns) if background else None
+        if jobs > 1:
+            with timer(kwargs, LOAD, 'parallel scan'):
+                scan_parallel(self._files, self._entry_start, kwargs, jobs)
+        self._offsets = list(accumulate(len(f) for f in self._files))
+        self._cached_entry = lru_cache(maxsize=kwargs.get('cache_size') or CACHE_SIZE)(self._create_entry)
 
-        self._raw_lines = []
-        files = _expand_file_paths(kwargs.get('files'))
-        for file_path in _natural_sort(files):
-            with open(file_path) as file_handle:
-                self._raw_lines.extend(file_handle.readlines())
+        self._merge = None
+        self._filters = Filters(self)
+        self._filters.active.extend(layout_filters(kwargs))
+        self._update_visible()
 
-        self._all = list(self._find_entries())
-        self._entries = list(self._filter_entries())
-        self._total = len(self._entries)
-        self._filtered = len(self._all) - self._total
+        if not self._loader:
+            self._store_index()
+            errors = [log_file.error for log_file in self._files if log_file.error is not None]
+            if errors:
+                raise errors[0]
 
     @property
     def total(self):
@@ -49,41 +160,280 @@ class Log:
     def filtered(self):
         return self._filtered
 
+    @property
+    def generation(self):
+        """Gets a number that changes whenever the shown entries change, by filters or appended data."""
+        return self._generation
+
+    @property
+    def count(self):
+        """Gets the count of messages, including the filtered ones."""
+        return self._offsets[-1] if self._offsets else 0
+
+    @property
+    def options(self):
+        """Gets the options of the log, including the compiled :class:`pycolog.tags.TagMatcher`."""
+        return self._options
+
+    @property
+    def tag_matcher(self):
+        """Gets the :class:`pycolog.tags.TagMatcher` of the layout."""
+        return self._options['tag_matcher']
+
+    @property
+    def loading(self):
+        """Gets whether the files are still being scanned in the background, see :meth:`refresh`."""
+        return self._loader is not None
+
+    @property
+    def progress(self):
+        """Gets the background scan of the files, or `None` if they have been loaded."""
+        return self._loader
+
+    def stop(self):
+        """Stops scanning the files in the background, the entries scanned so far are kept."""
+        if self._loader is not None:
+            self._loader.stop()
+            self._loader = None
+
+    @property
+    def filters(self):
+        """Gets the active filters, see :mod:`pycolog.filters`."""
+        return list(self._filters.active)
+
+    def add_filter(self, predicate):
+        """
+        Shows only the entries matching the given predicate (and all other active filters).
+
+        :param predicate: The filter to add
+        :type predicate: pycolog.filters.Predicate
+        """
+        self._filters.active.append(predicate)
+        self._update_visible()
+
+    def remove_filter(self, predicate):
+        """
+        Removes an active filter, its results are kept to add it again without evaluating it.
+
+        :param predicate: The filter to remove
+        :type predicate: pycolog.filters.Predicate
+        """
+        self._filters.active.remove(predicate)
+        self._update_visible()
+
+    @property
+    def sources(self):
+        """Gets the paths of the input files, in the order they are read."""
+        return [log_file.path for log_file in self._files]
+
+    def source(self, idx):
+        """Gets the path of the file containing the given entry."""
+        log_file, _ = self._locate(self._indices(idx))
+        return log_file.path
+
+    def files_from(self, first):
+        """
+        Yields the files containing the entries at and after the given index.
+
+        :param first: Index of the first entry
+        :type first: int
+        :returns: Tuples of the index of the first entry of the file, the file and the first index within the file
+        """
+        for offset, log_file in zip([0] + self._offsets, self._files):
+            if offset + len(log_file) > first:
+                yield offset, log_file, max(first - offset, 0)
+
+    def find_time(self, moment):
+        """
+        Finds the first entry at or after the given time by a binary search, expecting the entries ordered by time.
+
+        :param moment: The time to find
+        :type moment: datetime
+        :returns: The index of the entry or :attr:`total` if all entries are before the given time
+        :rtype: int
+        """
+        target = epoch_of(moment)
+        if self._merge is not None:
+            return self._merge.find(target)
+
+        low, high = 0, self._total
+        while low < high:
+            middle = (low + high) // 2
+            log_file, local = self._locate(self._indices(middle))
+            if log_file.time(local) < target:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def refresh(self):
+        """
+        Ingests the data appended to the input files since they were read.
+        Only the new entries are evaluated by the filters, truncated or replaced files are read again.
+        While :attr:`loading`, the entries scanned in the background are added instead.
+
+        :returns: `True` if any entry changed
+        :rtype: bool
+        :raises Exception: The error that stopped the background scan, the entries scanned before are kept
+        """
+        with timer(self._options, LOAD, 'refresh'):
+            if self._loader is not None:
+                return self._take_loaded()
+            return self._refresh()
+
+    def _refresh(self):
+        first = None
+        since = None
+        for offset, log_file in zip([0] + self._offsets, self._files):
+            changed = log_file.refresh()
+            if changed is None:
+                continue
+            if first is None:
+                first = offset + changed
+            time = _time_before(log_file, changed)
+            since = time if since is None else min(since, time)
+        return self._changed(first, since)
+
+    def _take_loaded(self):
+        done = self._loader.done
+        first = None
+        since = None
+        previous = None
+        for file_idx, part in self._loader.take():
+            log_file = self._files[file_idx]
+            if file_idx != previous:
+                first = self._id(file_idx, len(log_file)) if first is None else first
+                time = _time_before(log_file, len(log_file))
+                since = time if since is None else min(since, time)
+                previous = file_idx
+            log_file.apply(part)
+
+        if done:
+            loader, self._loader = self._loader, None
+            if loader.error is not None:
+                self._changed(first, since)
+                raise loader.error
+            self._store_index()
+        return self._changed(first, since)
+
+    def _store_index(self):
+        if self._index:
+            with timer(self._options, LOAD, 'index'):
+                for log_file in self._files:
+                    if log_file.error is None:
+                        self._index.store(log_file)
+
+    def _changed(self, first, since):
+        if first is None:
+            return False
+
+        self._offsets = list(accumulate(len(f) for f in self._files))
+        self._cached_entry.cache_clear()
+        self._filters.invalidate(first)
+        self._update_visible(since)
+        return True
+
     def get_entries(self, slice_):
-        """Get multiple entries given by a slice."""
-        return self._entries[slice_]
+        """Get multiple entries given by a slice, the plugins process the entries together."""
+        entries = [self._cached_entry(idx) for idx in self._indices(slice_)]
+        plugins.post_construct_batch(entries, self._options)
+        return entries
 
     def get_entry(self, idx):
         """Get one specific entry."""
-        return self._entries[idx]
+        return self._cached_entry(self._indices(idx))
 
-    def _find_entries(self):
-        first = True
-        current = ''
+    def text(self, idx, interpreted=False):
+        """
+        Gets the text of one specific entry, without keeping the entry in the cache.
 
-        for raw in self._raw_lines:
-            if not self._entry_start.match(raw):
-                current += raw
-                continue
+        :param idx: Index of the entry
+        :type idx: int
+        :param interpreted: Whether to get the text interpreted by the plugins, if there is one
+        :type interpreted: bool
+        :rtype: str
+        """
+        log_file, local = self._locate(self._indices(idx))
+        if not interpreted:
+            return log_file.raw(local)
+        entry = log_file.entry(local)
+        return entry.interpreted or entry.raw
+
+    def texts(self, begin, end, interpreted=False):
+        """
+        Gets the texts of a range of entries, see :meth:`text`.
 
-            if not first:
-                yield LogEntry(current.strip(), **self._options)
-            first = False
-            current = raw
+        :param begin: Index of the first entry
+        :type begin: int
+        :param end: Index after the last entry
+        :type end: int
+        :param interpreted: Whether to get the texts interpreted by the plugins
+        :type interpreted: bool
+        :rtype: Iterable[str]
+        """
+        return (self.text(idx, interpreted) for idx in range(begin, end))
 
-        yield LogEntry(current.strip(), **self._options)
+    def search(self, pattern, begin, end, interpreted=False):
+        """
+        Gets the indices of the entries in a range whose text contains the pattern, see :mod:`pycolog.search`.
 
-    def _filter_entries(self):
-        return (e for e in self._all if not self._is_filtered(e))
+        :param pattern: The regular expression
+        :type pattern: re.Pattern
+        :param begin: Index of the first entry
+        :type begin: int
+        :param end: Index after the last entry
+        :type end: int
+        :param interpreted: Whether to search the texts interpreted by the plugins
+        :type interpreted: bool
+        :rtype: list[int]
+        """
+        search = pattern.search
+        return [idx for idx, text in enumerate(self.texts(begin, end, interpreted), begin) if search(text)]
 
-    def _is_filtered(self, entry: LogEntry):
-        for field, filter_ in self._options.get('filter', {}).items():
-            if field == 'tags':
-                for tag in filter_.get('contain', []):
-                    if tag in entry.tags:
-                        return True
-                for tag in filter_.get('not_contain', []):
-                    if tag not in entry.tags:
-                        return True
+    def _indices(self, key):
+        if self._merge is not None:
+            located = self._merge[key]
+            if isinstance(key, slice):
+                return [self._id(*item) for item in located]
+            return self._id(*located)
+        if self._visible is None:
+            return range(self._total)[key]
+        return self._visible[key]
 
-        return False
+    def _id(self, file_idx, local):
+        return (self._offsets[file_idx - 1] if file_idx else 0) + local
+
+    def _locate(self, idx):
+        file_idx = bisect_right(self._offsets, idx)
+        return self._files[file_idx], idx - (self._offsets[file_idx - 1] if file_idx else 0)
+
+    def _create_entry(self, idx):
+        log_file, local = self._locate(idx)
+        return log_file.entry(local)
+
+    def _update_visible(self, since=None):
+        with timer(self._options, LOAD, 'filter'):
+            self._filter(since)
+
+    def _filter(self, since):
+        self._generation = getattr(self, '_generation', -1) + 1
+        self._visible = self._filters.visible()
+        self._total = self.count if self._visible is None else len(self._visible)
+        self._filtered = self.count - self._total
+
+        if self._options.get('merge'):
+            if since is None or self._merge is None:
+                self._merge = MergeIndex(self._files, self._shown())
+            else:
+                self._merge.update(self._shown(), since)
+
+    def _shown(self):
+        shown = []
+        for offset, log_file in zip([0] + self._offsets, self._files):
+            if self._visible is None:
+                shown.append(range(len(log_file)))
+                continue
+            begin = bisect_left(self._visible, offset)
+            end = bisect_left(self._visible, offset + len(log_file))
+            shown.append(array('q', (idx - offset for idx in self._visible[begin:end])))
+        return shown
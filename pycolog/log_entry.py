@@ -1,89 +1,243 @@
 """Module for the `LogEntry` class"""
 import re
+from time import perf_counter
 
 import pycolog.plugins
+from pycolog.encoding import codec_of
+from pycolog.stats import ENTRY, FIELD
+from pycolog.tags import TagMatcher
 
 NEW_LINE_CHAR = '\xB6'
 """Character to use instead of a new line while truncating."""
 
+INTERN_LIMIT = 256
+"""Number of distinct values of a field that are interned, fields with more values are not interned."""
+
+_ANY_LINE = re.compile('^.*$')
+
+
+def parse_field(setting, value):
+    """
+    Converts the raw value of a field by the callback of its setting.
+
+    :param setting: Setting of the field in the `fields` section of the layout, `None` if the field has no setting
+    :type setting: dict
+    :param value: The raw value of the field
+    :type value: str
+    """
+    if not setting:
+        return value
+
+    callback = setting.get('callback')
+    kwargs = dict(setting.get('kwargs', {}))
+    kwargs[setting['argument']] = value
+    return callback(**kwargs)
+
+
+class EntryLayout:
+    """
+    The settings of the layout shared by all entries of a log, every entry only keeps a reference to it.
+    Values of fields with few distinct values (e.g. the level or the logger) are interned, so equal values
+    of different entries are stored once. Fields with more than :data:`INTERN_LIMIT` values are not interned.
+    The `line_format` is also compiled as bytes if possible, to parse entries that have not been decoded yet.
+
+    :param options: Options of the log, kept by reference
+    :type options: dict
+    """
+    __slots__ = ('options', 'fields', 'line_format', 'byte_line_format', 'codec', 'stats', '_interned')
+
+    def __init__(self, options):
+        self.options = options
+        self.fields = options.get('fields', {})
+        self.line_format = options.get('line_format', _ANY_LINE)
+        self.codec = codec_of(options)
+        self.byte_line_format = self.codec.to_bytes(self.line_format)
+        self.stats = options.get('stats')
+        self._interned = {}
+
+    @property
+    def tag_matcher(self):
+        matcher = self.options.get('tag_matcher')
+        if matcher is None:
+            matcher = TagMatcher(self.options.get('tags', {}), self.stats, self.codec)
+            self.options['tag_matcher'] = matcher
+        return matcher
+
+    def intern(self, field, value):
+        """
+        Gets the shared instance of a string value of a field.
+
+        :param field: Name of the field
+        :type field: str
+        :param value: Parsed value of the field
+        :returns: The equal value seen first, or the value itself
+        """
+        if not isinstance(value, str):
+            return value
+        values = self._interned.get(field, {})
+        if values is None:
+            return value
+        interned = values.get(value)
+        if interned is None:
+            if len(values) >= INTERN_LIMIT:
+                self._interned[field] = None
+                return value
+            interned = values[value] = value
+            self._interned[field] = values
+        return interned
+
 
 class LogEntry:
     """
     Represents a single log entry which may consists out of multiple lines.
+    Fields, tags and the interpretation of the plugins are evaluated on first access.
+    An entry created from bytes is decoded on first access of the raw text, fields and tags are taken
+    from the bytes if their patterns can be matched as bytes, see :mod:`pycolog.encoding`.
+    The state of the entry is kept in slots, plugins may still set their own attributes (e.g. `entry.color`),
+    which are stored in a dictionary created on the first assignment.
 
-    :param raw: The raw multiline string
-    :type raw: str
+    :param raw: The raw multiline string, or its undecoded data without leading and trailing whitespaces
+    :type raw: str | bytes
     :param fields: Additional parsing settings of a field
     :type fields: dict
     :param line_format: Compiled regular expression for splitting the message into multiple fields.
     :type line_format: re.Pattern
+    :param row: The columns of the file and the index of this entry, values stored in a column are taken
+        from there instead of being parsed, see :mod:`pycolog.columns`.
+    :type row: tuple
+    :param entry_layout: Layout shared with the other entries of the log, created from the other arguments if
+        not given
+    :type entry_layout: EntryLayout
     """
-    def __init__(self, raw, **kwargs):
-        self._options = kwargs
+    __slots__ = ('_layout', '_raw', '_row', '_attributes', '_tag_mask', '_interpreted', '_constructed', '__dict__')
+
+    def __init__(self, raw, row=None, entry_layout=None, **kwargs):
+        self._layout = entry_layout if entry_layout is not None else EntryLayout(kwargs)
         self._raw = raw
-        self._fields = kwargs.get('fields', {})
-        self._line_format = kwargs.get('line_format', re.compile('^.*$'))
-
-        match = self._line_format.match(raw)
-        if match:
-            self.attributes = self._parse_fields(match.groupdict())
-        else:
-            self.attributes = {}
-        self.tags = set(self._find_tags())
-        self._lines = self._raw.count('\n')
-        self._interpreted = None
+        self._row = row
 
-        pycolog.plugins.post_construct(self, self._options)
+        self._attributes = None
+        self._tag_mask = None
+        self._interpreted = None
+        self._constructed = False
 
     @property
     def raw(self):
+        if isinstance(self._raw, bytes):
+            self._raw = self._layout.codec.decode(self._raw)
         return self._raw
 
+    @property
+    def attributes(self):
+        """Gets the fields of the entry, they are parsed from the raw message on first access."""
+        if self._attributes is None:
+            layout = self._layout
+            start = perf_counter() if layout.stats is not None else None
+            if isinstance(self._raw, bytes) and layout.byte_line_format is not None:
+                match = layout.byte_line_format.match(self._raw)
+                groups = self._decode_groups(match.groupdict()) if match else None
+            else:
+                match = layout.line_format.match(self.raw)
+                groups = match.groupdict() if match else None
+            if start is not None:
+                layout.stats.add(ENTRY, 'line_format', perf_counter() - start)
+            self._attributes = self._parse_fields(groups) if groups is not None else {}
+        return self._attributes
+
+    @attributes.setter
+    def attributes(self, value):
+        self._attributes = value
+
+    @property
+    def tag_mask(self):
+        """Gets the bitmask of the matching tags, they are searched on first access."""
+        if self._tag_mask is None:
+            if self._row and 'tags' in self._row[0]:
+                self._tag_mask = self._row[0]['tags'].data[self._row[1]]
+            else:
+                self._tag_mask = self._tag_matcher.mask(self._raw)
+        return self._tag_mask
+
+    @property
+    def tags(self):
+        """Gets the names of the matching tags."""
+        return self._tag_matcher.names_of(self.tag_mask)
+
+    @tags.setter
+    def tags(self, value):
+        self._tag_mask = self._tag_matcher.mask_of(value)
+
+    @property
+    def _tag_matcher(self):
+        return self._layout.tag_matcher
+
     @property
     def interpreted(self):
+        self._construct()
         return self._interpreted
 
     @interpreted.setter
     def interpreted(self, value):
         self._interpreted = value
 
+    @property
+    def constructed(self):
+        """Gets whether the plugins have processed the entry, see :mod:`pycolog.plugins`."""
+        return self._constructed
+
+    @constructed.setter
+    def constructed(self, value):
+        self._constructed = value
+
+    def _construct(self):
+        if self._constructed:
+            return
+        self._constructed = True
+        pycolog.plugins.post_construct(self, self._layout.options)
+
+    def _decode_groups(self, groups):
+        decode = self._layout.codec.decode
+        return {k: decode(v) if v is not None else None for k, v in groups.items()}
+
     def _parse_fields(self, attributes):
         return {k: self._parse_field(k, v) for k, v in attributes.items()}
 
     def _parse_field(self, field, value):
-        setting = self._fields.get(field)
-        if not setting:
-            return value
+        column = self._column(field)
+        if column:
+            return column[self._row[1]]
 
-        callback = setting.get('callback')
-        kwargs = setting.get('kwargs', {})
-        kwargs[setting['argument']] = value
-        return callback(**kwargs)
-
-    def _find_tags(self):
-        for tag, config in self._options.get('tags', {}).items():
-            match = config.get('pattern').search(self._raw)
-            if not match:
-                continue
-
-            captures = match.groupdict()
-            for capture, where in config.get('where', {}).items():
-                if captures.get(capture, None) not in where.get('in', []):
-                    break
-            else:
-                yield tag
+        layout = self._layout
+        setting = layout.fields.get(field)
+        if layout.stats is None or not setting:
+            return layout.intern(field, parse_field(setting, value))
+        start = perf_counter()
+        try:
+            return layout.intern(field, parse_field(setting, value))
+        finally:
+            layout.stats.add(FIELD, field, perf_counter() - start)
+
+    def _column(self, field):
+        if not self._row or field == 'tags':
+            return None
+        return self._row[0].get(field)
 
     def __getattr__(self, item):
-        return self.attributes.get(item)
+        if item.startswith('_'):
+            raise AttributeError(item)
+        return self[item]
 
     def __getitem__(self, item):
+        column = self._column(item)
+        if column and self._attributes is None:
+            return column[self._row[1]]
         return self.attributes.get(item)
 
     def __str__(self):
-        return self._raw
+        return self.raw
 
     def interpreted_truncate(self, width):
-        if not self._interpreted:
+        if not self.interpreted:
             return self.truncate(width)
         return self._truncate(self._interpreted, width)
 
@@ -98,7 +252,7 @@ class LogEntry:
         :returns: A truncated string with a length less or equal to `width`
         :rtype: str
         """
-        return self._truncate(self._raw, width)
+        return self._truncate(self.raw, width)
 
     def _truncate(self, message, width):
         msg = message.replace('\n', NEW_LINE_CHAR)
@@ -0,0 +1,319 @@
+"""Module for `LogFile`"""
+from array import array
+from bisect import bisect_left
+import mmap
+import os
+
+from pycolog.columns import KINDS, TagColumn, TimeColumn, epoch_of, time_of
+from pycolog.compressed import Decompressed, compression_of
+from pycolog.log_entry import EntryLayout, LogEntry
+from pycolog.scanner import entry_starts, find_entry_start
+from pycolog.stats import LOAD, timer
+
+TIME_FIELD = 'timestamp'
+"""Default name of the field containing the time of an entry."""
+
+
+class LogFile:
+    """
+    Memory mapped view on a single input file.
+    Instead of holding the content in memory, only the start and end byte offsets
+    of every entry are kept. The raw text of an entry is decoded on request.
+
+    Values that are needed for every entry (e.g. the tags for filtering or the fields listed
+    in the `columns` section of the layout) are stored in `columns`, see :mod:`pycolog.columns`.
+    They are computed on first request and kept in sync with the offsets.
+
+    If the options contain `since` or `until`, only the entries within this time range are scanned.
+    The range is found by a binary search over the bytes of the file, expecting the entries ordered by time.
+
+    :param path: Path to the log file
+    :type path: str
+    :param entry_start: Line start pattern as returned by :func:`pycolog.scanner.compile_entry_start`.
+    :type entry_start: re.Pattern
+    :param options: Options of the log, passed to every created :class:`LogEntry`
+    :type options: dict
+    :param index: Persistent index to restore the offsets and columns from
+    :type index: pycolog.index.Index
+    :param scan: Whether to scan the file immediately, otherwise the caller has to :meth:`apply`
+        the parts starting at :attr:`pending`.
+    :type scan: bool
+    :param columns: Names of the columns to compute while scanning
+    :type columns: list[str]
+    """
+    def __init__(self, path, entry_start, options, index=None, scan=True, columns=()):
+        self.path = path
+        self._entry_start = entry_start
+        self._options = options
+        self._entry_layout = EntryLayout(options)
+
+        self.starts = array('q')
+        self.ends = array('q')
+        self.columns = {}
+        self.modified = False
+
+        self._index = index
+        self._source = None
+        self._disk_size = 0
+        with timer(options, LOAD, 'open'):
+            self._map, self.mtime, self._inode = self._open()
+        self._end = None
+        if options.get('since') or options.get('until'):
+            with timer(options, LOAD, 'seek range'):
+                self._seek_range()
+        else:
+            with timer(options, LOAD, 'index'):
+                self.pending = (index.restore(self) if index else None) or 0
+        for name in columns:
+            with timer(options, LOAD, f'column {name}'):
+                self.column(name)
+        if scan:
+            self._scan(self.pending)
+
+    def __len__(self):
+        return len(self.starts)
+
+    @property
+    def size(self):
+        """Gets the number of bytes mapped for this file."""
+        return len(self._map)
+
+    @property
+    def end(self):
+        """Gets the offset of the end of the last entry to scan."""
+        return self.size if self._end is None else min(self._end, self.size)
+
+    @property
+    def compressed(self):
+        """Gets whether the file is compressed, see :mod:`pycolog.compressed`."""
+        return self._source is not None
+
+    @property
+    def error(self):
+        """Gets the error that ended the decompression of a compressed file early, the data before it is mapped."""
+        return self._source.error if self._source is not None else None
+
+    @property
+    def buffer(self):
+        """Gets the mapped content of the file, a compressed file is decompressed completely first."""
+        if self._source is not None and not self._source.complete:
+            self._source.fill()
+        return self._map
+
+    def raw(self, idx):
+        """Gets the raw text of the entry at the given index, without leading and trailing whitespaces."""
+        data = self._data(self.starts[idx], self.ends[idx])
+        return data if isinstance(data, str) else self._entry_layout.codec.decode(data)
+
+    def entry(self, idx):
+        """Creates the :class:`LogEntry` at the given index."""
+        return LogEntry(self._data(self.starts[idx], self.ends[idx]), (self.columns, idx), self._entry_layout)
+
+    def column(self, name):
+        """
+        Gets the values of a column for all entries, computing it if not yet done.
+
+        :param name: Name of the column, either `tags` or a field of the `columns` section of the layout
+        :type name: str
+        :rtype: pycolog.columns.Column
+        """
+        if name not in self.columns:
+            self.columns[name] = self._new_column(name)
+            self._fill(name, 0)
+            self.modified = True
+        return self.columns[name]
+
+    def time(self, idx):
+        """
+        Gets the time of the entry at the given index.
+
+        :returns: Microseconds since the epoch, see :func:`pycolog.columns.to_epoch`
+        :rtype: int
+        """
+        field = self._options.get('time_field', TIME_FIELD)
+        column = self.columns.get(field)
+        if isinstance(column, TimeColumn):
+            return column.data[idx]
+        return time_of(self.entry(idx)[field], field)
+
+    def seek_time(self, moment, begin=0):
+        """
+        Finds the first entry at or after the given time, by a binary search over the bytes of the file.
+
+        :param moment: Microseconds since the epoch, see :func:`pycolog.columns.to_epoch`
+        :type moment: int
+        :param begin: Offset of an entry to start the search at
+        :type begin: int
+        :returns: The offset of the found entry or the end of the file
+        :rtype: int
+        :raises ValueError: If the time field is not a timestamp, see :func:`pycolog.columns.time_of`
+        """
+        field = self._options.get('time_field', TIME_FIELD)
+        low, high = begin, self.size
+        while low < high:
+            middle = (low + high) // 2
+            start = find_entry_start(self.buffer, self._entry_start, middle) if middle else 0
+            if start >= high:
+                high = middle
+                continue
+
+            end = find_entry_start(self.buffer, self._entry_start, start + 1)
+            entry = LogEntry(self._data(start, end), entry_layout=self._entry_layout)
+            if time_of(entry[field], field) < moment:
+                low = end
+            else:
+                high = start
+        return low
+
+    def scan_part(self, begin, end, columns=()):
+        """
+        Scans the entries starting in the given byte range, without modifying this file.
+
+        :param begin: Offset of the first entry
+        :type begin: int
+        :param end: Offset to stop scanning at, this has to be the start of an entry or the end of the file
+        :type end: int
+        :param columns: Names of the columns to compute for the scanned entries
+        :type columns: list[str]
+        :returns: Tuple of the `begin` offset, the entry starts, the entry ends and the computed columns
+        :rtype: tuple
+        """
+        with timer(self._options, LOAD, 'find entries'):
+            starts = array('q', entry_starts(self.buffer, self._entry_start, begin, end))
+        if begin < end and (not starts or starts[0] != begin):
+            starts.insert(0, begin)
+
+        ends = starts[1:]
+        if begin < end:
+            ends.append(end)
+
+        values = {name: self._new_column(name) for name in columns}
+        with timer(self._options, LOAD, 'columns'):
+            self._compute(values.values(), zip(starts, ends))
+        return begin, starts, ends, values
+
+    def apply(self, part):
+        """
+        Replaces all entries at and after the begin of the part with the entries of the part.
+
+        :param part: Part as returned by :meth:`scan_part`
+        :type part: tuple
+        """
+        begin, starts, ends, values = part
+        first = bisect_left(self.starts, begin)
+        del self.starts[first:]
+        del self.ends[first:]
+        self.starts.extend(starts)
+        self.ends.extend(ends)
+
+        for name, column in self.columns.items():
+            if name in values:
+                column.truncate(first)
+                column.merge(values[name])
+            else:
+                self._fill(name, first)
+        self.modified = True
+
+    def refresh(self):
+        """
+        Maps the current content of the file and scans the data appended since the last scan.
+        The last entry is scanned again, as it may have been incomplete, the appended entries up to `until` are added.
+        If the file was truncated or replaced, it is scanned from the beginning.
+
+        :returns: Index of the first entry that changed or `None` if the file is unchanged
+        :rtype: int
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+
+        if (stat.st_size, stat.st_mtime_ns, stat.st_ino) == (self._disk_size, self.mtime, self._inode):
+            return None
+
+        rotated = self._source is not None or stat.st_size < self._disk_size or stat.st_ino != self._inode
+        self.close()
+        self._map, self.mtime, self._inode = self._open()
+
+        if rotated:
+            self.apply((0, [], [], {}))
+            self.pending = 0
+            if self._options.get('since') or self._options.get('until'):
+                self._seek_range()
+            begin, first = self.pending, 0
+        else:
+            begin = self.starts[-1] if self.starts else self.pending
+            first = bisect_left(self.starts, begin)
+            until = self._options.get('until')
+            if until:
+                # the appended entries may still be before `until`
+                self._end = self.seek_time(epoch_of(until) + 1, begin)
+        self._scan(begin)
+        return first
+
+    def close(self):
+        """Releases the memory map of the file."""
+        if self._source is not None:
+            self._source.close()
+            self._source = None
+        elif isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._map = b''
+
+    def _open(self):
+        compression = compression_of(self.path)
+        if compression:
+            return self._decompress(compression)
+        with open(self.path, 'rb') as file_handle:
+            stat = os.fstat(file_handle.fileno())
+            self._disk_size = stat.st_size
+            if stat.st_size == 0:
+                return b'', stat.st_mtime_ns, stat.st_ino
+            return mmap.mmap(file_handle.fileno(), 0, access=mmap.ACCESS_READ), stat.st_mtime_ns, stat.st_ino
+
+    def _decompress(self, compression):
+        stat = os.stat(self.path)
+        seek_points = self._index.restore_seek_points(self.path, stat) if self._index else None
+        self._source = Decompressed(self.path, compression, seek_points)
+        if seek_points is None and self._index and self._source.error is None:
+            self._index.store_seek_points(self.path, stat, self._source.seek_points)
+        self._disk_size = stat.st_size
+        return self._source.map, stat.st_mtime_ns, stat.st_ino
+
+    def _scan(self, begin):
+        first = bisect_left(self.starts, begin)
+        if first == len(self) and begin >= self.end:
+            return
+        self.apply(self.scan_part(begin, self.end, list(self.columns)))
+
+    def _seek_range(self):
+        since, until = self._options.get('since'), self._options.get('until')
+        self.pending = self.seek_time(epoch_of(since)) if since else 0
+        self._end = self.seek_time(epoch_of(until) + 1, self.pending) if until else None
+
+    def _data(self, start, end):
+        if self._source is not None and not self._source.complete:
+            self._source.fill(start, end)
+        data = self._map[start:end].strip()
+        if data and (data[0] > 0x7f or data[-1] > 0x7f):
+            # Whitespaces outside of ASCII (e.g. U+00A0) are only known after decoding
+            return self._entry_layout.codec.decode(data).strip()
+        return data
+
+    def _fill(self, name, first):
+        column = self.columns[name]
+        column.truncate(first)
+        self._compute([column], zip(self.starts[first:], self.ends[first:]))
+
+    def _compute(self, columns, positions):
+        if not columns:
+            return
+        for start, end in positions:
+            entry = LogEntry(self._data(start, end), entry_layout=self._entry_layout)
+            for column in columns:
+                column.append(entry)
+
+    def _new_column(self, name):
+        if name == 'tags':
+            return TagColumn(len(self._options['tag_matcher']))
+        return KINDS[self._options['columns'][name]](name)
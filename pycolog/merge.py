@@ -0,0 +1,121 @@
+"""
+Module for the merged view of multiple log files.
+The entries of every file are expected to be ordered by time, the files are merged lazily by
+a heap based k-way merge, so only the entries up to the requested position are ever merged.
+The merged order is kept, so paging through already merged entries is a lookup.
+The index is shared by the screen and the background search, so merging and lookups are serialized by a lock.
+"""
+from array import array
+from bisect import bisect_left
+import heapq
+from itertools import islice
+import threading
+
+from pycolog.columns import MISSING
+
+SHIFT = 40
+"""Number of bits of the index within the file in a merged position, the higher bits are the index of the file."""
+
+_LOCAL = (1 << SHIFT) - 1
+
+
+class MergeIndex:
+    """
+    Lazily merged order of the shown entries of multiple files.
+    Entries without time are kept after their predecessor in the same file.
+
+    :param log_files: The merged files
+    :type log_files: list[pycolog.log_file.LogFile]
+    :param shown: Indices of the shown entries within every file, in the order of the file
+    :type shown: list[Sequence[int]]
+    """
+    def __init__(self, log_files, shown):
+        self.order = array('q')
+        """Merged entries, every value contains the index of the file (above :data:`SHIFT`) and the entry."""
+        self.times = array('q')
+        """Times of the merged entries in microseconds since the epoch, see :func:`pycolog.columns.to_epoch`."""
+
+        self._files = log_files
+        self._shown = shown
+        self._merged = iter(())
+        self._lock = threading.Lock()
+        self._restart()
+
+    def __len__(self):
+        return sum(len(shown) for shown in self._shown)
+
+    def __getitem__(self, key):
+        """
+        Gets the file and entry index of a merged position, or a list of them for a slice.
+
+        :rtype: tuple or list[tuple]
+        """
+        with self._lock:
+            if isinstance(key, slice):
+                positions = range(len(self))[key]
+                if positions:
+                    self._extend(max(positions[0], positions[-1]) + 1)
+                return [self._split(self.order[position]) for position in positions]
+
+            position = range(len(self))[key]
+            self._extend(position + 1)
+            return self._split(self.order[position])
+
+    def find(self, moment):
+        """
+        Finds the first merged position at or after the given time, merging only up to this position.
+
+        :param moment: Microseconds since the epoch
+        :type moment: int
+        :rtype: int
+        """
+        with self._lock:
+            while not self.times or self.times[-1] < moment:
+                if not self._extend(len(self.order) + 1):
+                    break
+            return bisect_left(self.times, moment)
+
+    def update(self, shown, moment):
+        """
+        Updates the shown entries after data has been appended to the files, the merged
+        order is kept up to the given time, as all changed entries are expected at or after it.
+
+        :param shown: Indices of the shown entries within every file
+        :type shown: list[Sequence[int]]
+        :param moment: Earliest time of the changed entries
+        :type moment: int
+        """
+        with self._lock:
+            self._shown = shown
+            cut = bisect_left(self.times, moment)
+            del self.order[cut:]
+            del self.times[cut:]
+            self._restart()
+
+    def _restart(self):
+        cursors = [0] * len(self._files)
+        last = [MISSING] * len(self._files)
+        for value, time in zip(self.order, self.times):
+            cursors[value >> SHIFT] += 1
+            last[value >> SHIFT] = time
+        self._merged = heapq.merge(*(self._stream(idx, cursors[idx], last[idx]) for idx in range(len(self._files))))
+
+    def _stream(self, file_idx, cursor, last):
+        time_of = self._files[file_idx].time
+        for local in islice(self._shown[file_idx], cursor, None):
+            time = time_of(local)
+            if time != MISSING:
+                last = time
+            yield last, file_idx, local
+
+    def _extend(self, length):
+        missing = length - len(self.order)
+        for time, file_idx, local in islice(self._merged, max(missing, 0)):
+            self.order.append(file_idx << SHIFT | local)
+            self.times.append(time)
+            missing -= 1
+        return missing <= 0
+
+    @staticmethod
+    def _split(value):
+        return value >> SHIFT, value & _LOCAL
@@ -0,0 +1,78 @@
+"""
+Module for scanning log files on a process pool.
+Large files are split into parts at entry boundaries, every worker returns the compact
+offsets and columns of its part, which are applied to the files in their natural sort order.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+from pycolog.encoding import codec_of
+from pycolog.log_file import LogFile
+from pycolog.plugins import load as load_plugins, mount as mount_plugins
+from pycolog.scanner import find_entry_start
+from pycolog.tags import TagMatcher
+
+PART_SIZE = 32 * 1024 * 1024
+"""Number of bytes of a file to be scanned by one task."""
+
+_WORKER = {}
+
+
+def _portable(options):
+    portable = dict(options, since=None, until=None)
+    portable['plugins'] = [plugin.__name__ for plugin in options.get('plugins', [])]
+    portable.pop('hooks', None)
+    if portable.pop('stats', None) is not None:
+        portable['tag_matcher'] = TagMatcher(options.get('tags', {}), codec=codec_of(options))
+    return portable
+
+
+def _init_worker(options, entry_start):
+    options['plugins'] = list(load_plugins(options['plugins']))
+    mount_plugins(options)
+    _WORKER.update(options=options, entry_start=entry_start, files={})
+
+
+def _scan_part(path, begin, end, limit, columns):
+    files = _WORKER['files']
+    if path not in files:
+        files[path] = LogFile(path, _WORKER['entry_start'], _WORKER['options'], scan=False)
+    log_file = files[path]
+
+    if begin:
+        begin = find_entry_start(log_file.buffer, _WORKER['entry_start'], begin, limit)
+    if end < limit:
+        end = find_entry_start(log_file.buffer, _WORKER['entry_start'], end, limit)
+    return log_file.scan_part(begin, end, columns)
+
+
+def _parts(log_file):
+    bounds = list(range(log_file.pending, log_file.end, PART_SIZE)) + [log_file.end]
+    return zip(bounds, bounds[1:])
+
+
+def scan(log_files, entry_start, options, jobs):
+    """
+    Scans the pending data of the given files in parallel.
+    Compressed files are scanned by the calling process, as every worker would have to decompress them.
+
+    :param log_files: Files created without scanning, see :class:`pycolog.log_file.LogFile`
+    :type log_files: list[pycolog.log_file.LogFile]
+    :param entry_start: Line start pattern as returned by :func:`pycolog.scanner.compile_entry_start`.
+    :type entry_start: re.Pattern
+    :param options: Options of the log, plugins are loaded again by their name in the workers
+    :type options: dict
+    :param jobs: Number of worker processes
+    :type jobs: int
+    """
+    with ProcessPoolExecutor(jobs, initializer=_init_worker, initargs=(_portable(options), entry_start)) as pool:
+        tasks = []
+        for log_file in log_files:
+            parts = [] if log_file.compressed else _parts(log_file)
+            tasks.append([pool.submit(_scan_part, log_file.path, begin, end, log_file.end, list(log_file.columns))
+                          for begin, end in parts])
+
+        for log_file, parts in zip(log_files, tasks):
+            if log_file.compressed and log_file.pending < log_file.end:
+                log_file.apply(log_file.scan_part(log_file.pending, log_file.end, list(log_file.columns)))
+            for part in parts:
+                log_file.apply(part.result())
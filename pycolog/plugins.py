@@ -1,5 +1,18 @@
+"""
+Module for loading plugins and calling their hooks.
+The hooks of all plugins are resolved once by :func:`mount` into flat call lists (`options['hooks']`).
+
+Hooks of a plugin module:
+
+* `mount(options)` is called once after the plugins are loaded
+* `post_construct(entry, options)` is called before an entry is shown the first time
+* `post_construct_batch(entries, options)` is called with all entries of a page that are shown the first time,
+  it replaces `post_construct` of the same plugin when entries are processed together
+"""
 import importlib
 
+from pycolog.stats import PLUGIN
+
 
 def load(plugins):
     for plugin in plugins:
@@ -10,9 +23,69 @@ def mount(options):
     for plugin in options.get('plugins', []):
         if hasattr(plugin, 'mount'):
             plugin.mount(options)
+    options['hooks'] = resolve(options.get('plugins', []), options.get('stats'))
+
+
+def resolve(plugins, stats=None):
+    """
+    Resolves the construction hooks of the plugins, every plugin is called by both kinds of hooks.
+
+    :param plugins: The loaded plugin modules
+    :type plugins: list
+    :param stats: Stats to measure the time of every hook in, see :mod:`pycolog.stats`
+    :type stats: pycolog.stats.Stats
+    :returns: The hooks of a single entry (`post_construct`) and of multiple entries (`post_construct_batch`)
+    :rtype: dict
+    """
+    hooks = {'post_construct': [], 'post_construct_batch': []}
+    for plugin in plugins:
+        single = getattr(plugin, 'post_construct', None)
+        batch = getattr(plugin, 'post_construct_batch', None)
+        if single is None and batch is None:
+            continue
+        single, batch = single or _single(batch), batch or _batch(single)
+        if stats is not None:
+            single = stats.timed(PLUGIN, f'{plugin.__name__}.post_construct', single)
+            batch = stats.timed(PLUGIN, f'{plugin.__name__}.post_construct_batch', batch)
+        hooks['post_construct'].append(single)
+        hooks['post_construct_batch'].append(batch)
+    return hooks
+
+
+def _single(batch):
+    return lambda entry, options: batch([entry], options)
+
+
+def _batch(single):
+    def call(entries, options):
+        for entry in entries:
+            single(entry, options)
+    return call
+
+
+def _hooks(options):
+    hooks = options.get('hooks')
+    return hooks if hooks is not None else resolve(options.get('plugins', []), options.get('stats'))
 
 
 def post_construct(entry, options):
-    for plugin in options.get('plugins', []):
-        if hasattr(plugin, 'post_construct'):
-            plugin.post_construct(entry, options)
+    for hook in _hooks(options)['post_construct']:
+        hook(entry, options)
+
+
+def post_construct_batch(entries, options):
+    """
+    Calls the construction hooks of all given entries that have not been constructed yet.
+
+    :param entries: The entries that are about to be shown
+    :type entries: list[pycolog.log_entry.LogEntry]
+    :param options: Options of the log
+    :type options: dict
+    """
+    pending = [entry for entry in entries if not entry.constructed]
+    if not pending:
+        return
+    for entry in pending:
+        entry.constructed = True
+    for hook in _hooks(options)['post_construct_batch']:
+        hook(pending, options)
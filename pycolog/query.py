@@ -0,0 +1,495 @@
+"""
+Module for the filter query language, e.g. `level in (ERROR, WARN) and thread ~ /worker-\\d+/ and time >= 12:00`.
+
+A query is parsed once and compiled into functions: conditions on fields stored in a column
+(see :mod:`pycolog.columns`) run over the whole column, all other conditions are combined into
+a single function that is called once per entry.
+
+Conditions:
+
+* `field == value`, `!=`, `<`, `<=`, `>`, `>=` compare the field, the value is converted to the type of the field
+  (timestamps accept the formats of :func:`pycolog.timestamp.parse_time`, a time of the day only compares the time)
+  and entries without the field only match the negated conditions (`!=`, `not in`, `!~`)
+* `field in (value, ...)` and `field not in (value, ...)`
+* `field ~ /regex/` and `field !~ /regex/` search the regular expression in the field
+* `#tag` matches entries with the tag, `/regex/` searches the regular expression in the raw message
+* `and`, `or`, `not` and parentheses combine the conditions
+
+Values containing spaces or special characters are quoted by `"` or `'`.
+The field `time` refers to the time field of the layout.
+
+For the SQLite store (see :mod:`pycolog.database`) a query is translated into an SQL condition by
+:meth:`Query.sql`, the parts the store cannot express are evaluated on the raw message by a function.
+"""
+from datetime import datetime, timedelta
+from functools import reduce
+import operator
+import re
+
+from pycolog.columns import MISSING, CategoryColumn, TimeColumn, epoch_of, to_epoch
+from pycolog.filters import Predicate, to_bitmap, to_indices
+from pycolog.log_entry import parse_field
+from pycolog.log_file import TIME_FIELD
+from pycolog.timestamp import parse_time
+
+_TOKENS = re.compile(r'''
+    \s*(?:
+        (?P<regex>/(?:[^/\\]|\\.)*/)
+      | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+      | (?P<tag>\#[^\s()]+)
+      | (?P<symbol>==|!=|<=|>=|!~|[=<>~(),])
+      | (?P<word>[^\s()<>=!~,"']+)
+    )''', re.VERBOSE)
+
+_KEYWORDS = {'and', 'or', 'not', 'in'}
+
+_COMPARISONS = {
+    '==': operator.eq,
+    '=': operator.eq,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+
+_TIME_OF_DAY = re.compile(r'\d{1,2}:\d\d(:\d\d(\.\d+)?)?')
+_DAY = 86400 * 1000000
+_MICROSECOND = timedelta(microseconds=1)
+_ANY = re.compile('^.*$')
+
+
+def _tokenize(text):
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = _TOKENS.match(text, pos)
+        if not match or match.end() == pos:
+            raise ValueError(f'Unexpected character {text[pos:].strip()[:1]!r} in query')
+        pos = match.end()
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == 'word' and value.lower() in _KEYWORDS:
+            kind, value = 'keyword', value.lower()
+        elif kind == 'string':
+            value = re.sub(r'\\(.)', r'\1', value[1:-1])
+        yield kind, value
+
+
+class _Literal:
+    """Value of a condition, converted to the type of the compared field on demand."""
+    def __init__(self, text):
+        self.text = text
+        self._converted = {}
+
+    def as_time(self):
+        """Gets the value as microseconds since the epoch or of the day and whether it is a time of the day."""
+        if 'time' not in self._converted:
+            of_day = bool(_TIME_OF_DAY.fullmatch(self.text))
+            try:
+                moment = parse_time(self.text, datetime(1970, 1, 1))
+            except ValueError:
+                self._converted['time'] = None
+            else:
+                self._converted['time'] = to_epoch(moment) % _DAY if of_day else to_epoch(moment), of_day
+        return self._converted['time']
+
+    def as_number(self):
+        """Gets the value as number or `None` if it is not a number."""
+        if 'number' not in self._converted:
+            try:
+                self._converted['number'] = float(self.text)
+            except ValueError:
+                self._converted['number'] = None
+        return self._converted['number']
+
+
+def _time_of_day(value):
+    return (value.hour * 3600 + value.minute * 60 + value.second) * 1000000 + value.microsecond
+
+
+class _Condition:
+    """
+    Condition on a single field, with a test function per type of the field values.
+
+    :param field: Name of the field
+    :param test: Function testing the converted value of the field against the converted literals
+    :param literals: The literals of the condition
+    :param negate: Whether the result is inverted
+    :param symbol: Operator of the condition without negation, i.e. `~`, `in` or a comparison
+    """
+    def __init__(self, field, test, literals, negate=False, symbol=None):
+        self.field = field
+        self.test = test
+        self.literals = literals
+        self.negate = negate
+        self.symbol = symbol
+
+    def matches(self, value, is_time):
+        """Tests a value of the field, entries without the field do not match (unless negated)."""
+        return self._matches(value, is_time) != self.negate
+
+    def _matches(self, value, is_time):
+        if value is None:
+            return False
+        if not self.literals:
+            return self.test(str(value), [])
+        if isinstance(value, datetime) or (is_time and isinstance(value, int)):
+            return self.matches_time(epoch_of(value), _time_of_day(value) if isinstance(value, datetime) else None)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            numbers = [literal.as_number() for literal in self.literals]
+            return None not in numbers and self.test(value, numbers)
+        return self.test(str(value), [literal.text for literal in self.literals])
+
+    def matches_time(self, epoch, of_day=None):
+        """Tests a timestamp (without negation), given as microseconds since the epoch and of the day."""
+        bounds = []
+        for literal in self.literals:
+            time = literal.as_time()
+            if time is None:
+                return False
+            bound, is_of_day = time
+            bounds.append(bound)
+            if is_of_day:
+                epoch = of_day if of_day is not None else epoch % _DAY
+        return self.test(epoch, bounds)
+
+
+class _Row:
+    """
+    Entry as seen by the compiled row functions, only the fields and tags used by the query are parsed.
+
+    :param raw: The raw message
+    :param options: Options of the log
+    """
+    def __init__(self, raw, options):
+        self.raw = raw
+        self._options = options
+        self._groups = None
+        self._values = {}
+
+    @property
+    def tag_mask(self):
+        return self._options['tag_matcher'].mask(self.raw)
+
+    def __getitem__(self, field):
+        if field not in self._values:
+            if self._groups is None:
+                match = self._options.get('line_format', _ANY).match(self.raw)
+                self._groups = match.groupdict() if match else {}
+            value = self._groups.get(field)
+            if value is not None:
+                value = parse_field(self._options.get('fields', {}).get(field), value)
+            self._values[field] = value
+        return self._values[field]
+
+
+class _Node:
+    """
+    Compiled part of a query, a function of an entry (`row`), if the part runs over columns,
+    a function of the file and the first entry returning a bitmap (`columns`) and, if the part
+    may be expressed in SQL, a function of a translator returning the condition or `None` (`sql`).
+    """
+    def __init__(self, options, row=None, columns=None, sql=None):
+        self.options = options
+        self.row = row
+        self.columns = columns
+        self.sql = sql
+
+    def raw(self):
+        """Gets the row function as function of the raw message, see :meth:`Query.matches`."""
+        row, options = self.row, self.options
+        return lambda raw: bool(row(_Row(raw, options)))
+
+    def translate(self, translator):
+        """Gets the SQL condition and its parameters, or `None` if the part cannot be expressed in SQL."""
+        return self.sql(translator) if self.sql else None
+
+    def bitmap(self, log_file, first, candidates=None):
+        """
+        Gets the bitmap of the entries of the file starting at the given index.
+        If the bitmap of candidates is given, the row function is only called for these entries.
+        """
+        if self.columns:
+            return self.columns(log_file, first)
+        row, raw, options = self.row, log_file.raw, self.options
+        if candidates is None:
+            return to_bitmap(row(_Row(raw(idx), options)) for idx in range(first, len(log_file)))
+
+        bitmap = 0
+        for idx in to_indices(candidates, len(log_file) - first):
+            if row(_Row(raw(first + idx), options)):
+                bitmap |= 1 << idx
+        return bitmap
+
+
+def _mask(log_file, first):
+    return (1 << max(len(log_file) - first, 0)) - 1
+
+
+def _all(left, right):
+    return lambda entry: left(entry) and right(entry)
+
+
+def _any(left, right):
+    return lambda entry: left(entry) or right(entry)
+
+
+def _combine_sql(nodes, conjunction):
+    """
+    Combines the SQL conditions of the nodes, the nodes without condition are combined into one
+    row function if all conditions have to match, otherwise the whole combination is not translated.
+    """
+    def sql(translator):
+        parts, rows = [], []
+        for node in nodes:
+            part = node.translate(translator)
+            if part is None:
+                rows.append(node)
+            else:
+                parts.append(part)
+        if rows and not conjunction:
+            return None
+        if rows:
+            row = reduce(_all, (node.row for node in rows))
+            parts.append(translator.row(_Node(nodes[0].options, row=row).raw()))
+        joiner = ' AND ' if conjunction else ' OR '
+        return joiner.join(f'({condition})' for condition, _ in parts), [p for _, params in parts for p in params]
+    return sql
+
+
+def _combine(nodes, conjunction):
+    """
+    Combines all row functions into one function and the remaining bitmaps by bitwise operations.
+    The row function is only called for entries whose result is not yet decided by the bitmaps.
+    """
+    rows = [node.row for node in nodes if node.columns is None]
+    columns = [node for node in nodes if node.columns is not None]
+    row = reduce(_all if conjunction else _any, rows) if rows else None
+    options = nodes[0].options
+    sql = _combine_sql(nodes, conjunction)
+    if not columns:
+        return _Node(options, row=row, sql=sql)
+    whole_row = reduce(_all if conjunction else _any, (node.row for node in nodes))
+
+    def bitmap(log_file, first):
+        if conjunction:
+            result = reduce(operator.and_, (node.bitmap(log_file, first) for node in columns), _mask(log_file, first))
+            candidates = result
+        else:
+            result = reduce(operator.or_, (node.bitmap(log_file, first) for node in columns), 0)
+            candidates = ~result & _mask(log_file, first)
+        if row is None or not candidates:
+            return result
+        rows_bitmap = _Node(options, row=row).bitmap(log_file, first, candidates)
+        return result & rows_bitmap if conjunction else result | rows_bitmap
+    return _Node(options, row=whole_row, columns=bitmap, sql=sql)
+
+
+class _Compiler:
+    """Recursive descent parser of a query, compiling every parsed part into a :class:`_Node`."""
+    def __init__(self, text, options):
+        self._tokens = list(_tokenize(text))
+        self._pos = 0
+        self._options = options
+        self._time_field = options.get('time_field', TIME_FIELD)
+        self._columns = options.get('columns', {})
+
+    def compile(self):
+        if not self._tokens:
+            raise ValueError('Empty query')
+        node = self._or()
+        if self._pos < len(self._tokens):
+            raise ValueError(f'Unexpected {self._tokens[self._pos][1]!r} in query')
+        return node
+
+    def _peek(self):
+        return self._tokens[self._pos] if self._pos < len(self._tokens) else (None, None)
+
+    def _take(self, kind=None, value=None):
+        token = self._peek()
+        if token[0] is None or (kind and token[0] != kind) or (value and token[1] != value):
+            raise ValueError(f'Expected {value or kind} in query, got {token[1] or "end of query"!r}')
+        self._pos += 1
+        return token[1]
+
+    def _accept(self, kind, value):
+        if self._peek() == (kind, value):
+            self._pos += 1
+            return True
+        return False
+
+    def _or(self):
+        nodes = [self._and()]
+        while self._accept('keyword', 'or'):
+            nodes.append(self._and())
+        return nodes[0] if len(nodes) == 1 else _combine(nodes, conjunction=False)
+
+    def _and(self):
+        nodes = [self._not()]
+        while self._accept('keyword', 'and'):
+            nodes.append(self._not())
+        return nodes[0] if len(nodes) == 1 else _combine(nodes, conjunction=True)
+
+    def _not(self):
+        if self._accept('keyword', 'not'):
+            node = self._not()
+            row = node.row
+
+            def sql(translator):
+                part = node.translate(translator)
+                return part and (f'NOT ({part[0]})', part[1])
+            if node.columns is None:
+                return _Node(self._options, row=lambda entry: not row(entry), sql=sql)
+            return _Node(self._options, row=lambda entry: not row(entry), sql=sql,
+                         columns=lambda log_file, first: ~node.bitmap(log_file, first) & _mask(log_file, first))
+        if self._accept('symbol', '('):
+            node = self._or()
+            self._take('symbol', ')')
+            return node
+        return self._condition()
+
+    def _condition(self):
+        kind, value = self._peek()
+        if kind == 'tag':
+            self._pos += 1
+            return self._tag(value[1:])
+        if kind == 'regex':
+            self._pos += 1
+            pattern = self._regex(value)
+            search = pattern.search
+            return _Node(self._options, row=lambda entry: search(entry.raw),
+                         sql=lambda translator: translator.search(pattern))
+
+        field = self._take('word')
+        field = self._time_field if field == 'time' else field
+        if self._accept('symbol', '~') or self._peek() == ('symbol', '!~'):
+            negate = self._accept('symbol', '!~')
+            pattern = self._regex(self._take('regex'))
+            condition = _Condition(field, lambda value, _: bool(pattern.search(value)), [], negate, '~')
+        elif self._accept('keyword', 'in') or self._peek() == ('keyword', 'not'):
+            negate = self._accept('keyword', 'not')
+            if negate:
+                self._take('keyword', 'in')
+            condition = _Condition(field, lambda value, literals: value in literals, self._list(), negate, 'in')
+        else:
+            symbol = self._take('symbol')
+            negate = symbol == '!='
+            if symbol not in _COMPARISONS and not negate:
+                raise ValueError(f'Unknown operator {symbol!r} in query')
+            compare = operator.eq if negate else _COMPARISONS[symbol]
+            literals = [self._literal()]
+            condition = _Condition(field, lambda value, literals: compare(value, literals[0]), literals, negate,
+                                   '==' if negate else symbol)
+        return self._field(condition)
+
+    def _literal(self):
+        kind, value = self._peek()
+        if kind not in ('word', 'string'):
+            raise ValueError(f'Expected a value in query, got {value or "end of query"!r}')
+        self._pos += 1
+        return _Literal(value)
+
+    def _list(self):
+        self._take('symbol', '(')
+        literals = [self._literal()]
+        while self._accept('symbol', ','):
+            literals.append(self._literal())
+        self._take('symbol', ')')
+        return literals
+
+    @staticmethod
+    def _regex(value):
+        try:
+            return re.compile(value[1:-1])
+        except re.error as error:
+            raise ValueError(f'Invalid regular expression {value}: {error}') from error
+
+    def _tag(self, name):
+        bit = self._options['tag_matcher'].mask_of([name])
+
+        def bitmap(log_file, first):
+            return to_bitmap(mask & bit for mask in log_file.column('tags').data[first:])
+        return _Node(self._options, row=lambda entry: entry.tag_mask & bit, columns=bitmap,
+                     sql=lambda translator: translator.tag(name))
+
+    def _field(self, condition):
+        field = condition.field
+        is_time = field == self._time_field
+        matches = condition.matches
+
+        def row(entry):
+            return matches(entry[field], is_time)
+
+        def sql(translator):
+            return translator.condition(condition, is_time)
+        if field not in self._columns:
+            return _Node(self._options, row=row, sql=sql)
+
+        def bitmap(log_file, first):
+            column = log_file.column(field)
+            data = column.data[first:]
+            if isinstance(column, CategoryColumn):
+                codes = {code for code, value in enumerate(column.values) if condition.matches(value, is_time)}
+                return to_bitmap(code in codes for code in data)
+            if isinstance(column, TimeColumn) and condition.literals:
+                return _time_bitmap(condition, column, data)
+            return to_bitmap(condition.matches(column.decode(value), is_time) for value in data)
+        return _Node(self._options, row=row, columns=bitmap, sql=sql)
+
+
+def _time_bitmap(condition, column, data):
+    matches_time = condition.matches_time
+    negate = condition.negate
+    offset = column.tzinfo.utcoffset(None) if column.tzinfo is not None else timedelta(0)
+    if offset is None:
+        # the offset of a time zone with daylight saving time depends on the date
+        decode = column.decode
+        return to_bitmap((value != MISSING and matches_time(value, _time_of_day(decode(value)))) != negate
+                         for value in data)
+    offset //= _MICROSECOND
+    return to_bitmap((value != MISSING and matches_time(value, (value + offset) % _DAY)) != negate for value in data)
+
+
+class Query(Predicate):
+    """
+    Filter predicate of a compiled query.
+
+    :param text: The query
+    :type text: str
+    :param options: Options of the log, the `columns` section decides which conditions run over whole columns
+    :type options: dict
+    :raises ValueError: If the query is invalid
+    """
+    def __init__(self, text, options):
+        super().__init__(' '.join(text.split()))
+        self._options = options
+        self._node = _Compiler(text, options).compile()
+
+    def evaluate(self, filters, first):
+        bitmap = 0
+        for offset, log_file, local in filters.log.files_from(first):
+            bitmap |= self._node.bitmap(log_file, local) << (offset + local)
+        return bitmap
+
+    def matches(self, raw):
+        """
+        Evaluates the query on a single entry, without columns.
+
+        :param raw: The raw message of the entry
+        :type raw: str
+        :rtype: bool
+        """
+        return bool(self._node.row(_Row(raw, self._options)))
+
+    def sql(self, translator):
+        """
+        Translates the query into an SQL condition. The translator provides the conditions of the parts:
+        `condition(condition, is_time)` of a field, `tag(name)`, `search(pattern)` of the raw message and
+        `row(function)` calling a function of the raw message. The first three return `None` if the part
+        cannot be expressed in SQL, such parts are evaluated by `row`.
+
+        :param translator: The translator of the store, see :mod:`pycolog.database`
+        :returns: Tuple of the condition and its parameters
+        :rtype: tuple
+        """
+        return self._node.translate(translator) or translator.row(self._node.raw())
@@ -0,0 +1,115 @@
+"""
+Module containing the entry boundary scanner.
+The scanner runs the `line_start` pattern over large buffers instead of matching line by line.
+The pattern is matched against the undecoded bytes if possible, see :mod:`pycolog.encoding`.
+"""
+from collections import namedtuple
+import re
+
+from pycolog.encoding import Codec
+
+CHUNK_SIZE = 8 * 1024 * 1024
+"""Number of bytes that are decoded and scanned at once."""
+
+SEEK_CHUNK_SIZE = 64 * 1024
+"""Number of bytes that are decoded at once while searching a single entry start."""
+
+
+TextStart = namedtuple('TextStart', 'pattern encoding')
+"""Line start pattern that is matched against the decoded text, with the encoding of the files."""
+
+
+def compile_entry_start(pattern, codec=None):
+    """
+    Turns the `line_start` pattern into a multiline pattern which is anchored at the start of each line.
+
+    :param pattern: Compiled regular expression containing the line start pattern.
+    :type pattern: re.Pattern
+    :param codec: Encoding of the files, defaults to UTF-8
+    :type codec: pycolog.encoding.Codec
+    :returns: A pattern to be used with :func:`entry_starts`, compiled as bytes if possible
+    :rtype: re.Pattern | TextStart
+    """
+    codec = codec or Codec()
+    text = re.compile(f'^(?:{pattern.pattern})', pattern.flags | re.MULTILINE)
+    data = codec.to_bytes(text)
+    return data if data is not None else TextStart(text, codec.encoding)
+
+
+def entry_starts(buffer, pattern, begin=0, end=None, chunk_size=CHUNK_SIZE):
+    """
+    Yields the byte offsets of all lines in `buffer` that start a new entry.
+    Patterns compiled as bytes run over the buffer directly, otherwise the buffer is processed in chunks of
+    complete lines, so that only one chunk is decoded at a time.
+
+    :param buffer: Bytes like object (e.g. a memory map) to scan
+    :param pattern: Pattern as returned by :func:`compile_entry_start`
+    :type pattern: re.Pattern | TextStart
+    :param begin: Offset to start scanning at, this has to be the start of a line
+    :type begin: int
+    :param end: Offset to stop scanning at
+    :type end: int
+    :param chunk_size: Approximate number of bytes to decode at once
+    :type chunk_size: int
+    """
+    end = len(buffer) if end is None else end
+    if not isinstance(pattern, TextStart):
+        yield from (match.start() for match in pattern.finditer(buffer, begin, end) if match.start() < end)
+        return
+
+    pos = begin
+    while pos < end:
+        stop = _chunk_end(buffer, pos, end, chunk_size)
+        chunk = buffer[pos:stop]
+        yield from _chunk_starts(chunk, pattern, pos)
+        pos = stop
+
+
+def _chunk_end(buffer, pos, end, chunk_size):
+    if pos + chunk_size >= end:
+        return end
+
+    cut = buffer.rfind(b'\n', pos, pos + chunk_size)
+    if cut < 0:
+        cut = buffer.find(b'\n', pos + chunk_size, end)
+    return end if cut < 0 else cut + 1
+
+
+def _chunk_starts(chunk, pattern, base):
+    text = chunk.decode(pattern.encoding, 'surrogateescape')
+    starts = [match.start() for match in pattern.pattern.finditer(text)]
+    if starts and starts[-1] == len(text):
+        starts.pop()
+
+    if len(text) == len(chunk):
+        return [base + start for start in starts]
+
+    offsets = []
+    last = 0
+    for start in starts:
+        base += len(text[last:start].encode(pattern.encoding, 'surrogateescape'))
+        last = start
+        offsets.append(base)
+    return offsets
+
+
+def find_entry_start(buffer, pattern, pos, end=None):
+    """
+    Finds the first entry start at or after the given position.
+    If `pos` is not at the start of a line, the search starts at the following line.
+
+    :param buffer: Bytes like object (e.g. a memory map) to scan
+    :param pattern: Pattern as returned by :func:`compile_entry_start`
+    :type pattern: re.Pattern | TextStart
+    :param pos: Offset to start searching at
+    :type pos: int
+    :param end: Offset to stop searching at
+    :type end: int
+    :returns: The offset of the entry start or `end` if there is none
+    :rtype: int
+    """
+    end = len(buffer) if end is None else end
+    if 0 < pos < end and buffer[pos - 1:pos] != b'\n':
+        newline = buffer.find(b'\n', pos, end)
+        pos = end if newline < 0 else newline + 1
+    return next(entry_starts(buffer, pattern, pos, end, SEEK_CHUNK_SIZE), end)
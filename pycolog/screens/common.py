@@ -7,3 +7,30 @@ def warn(screen, msg):
     """
     screen.addstr(curses.LINES - 2, 0, msg)
     screen.clrtoeol()
+
+
+def prompt(screen, label):
+    """
+    Helper to read a line of text on the last line.
+
+    :param screen: The curses screen
+    :param label: Text in front of the input
+    :type label: str
+    :returns: The entered text or `None` if the input was cancelled by escape
+    :rtype: str
+    """
+    text = ''
+    while True:
+        screen.move(curses.LINES - 1, 0)
+        screen.addstr(f'{label}{text}')
+        screen.clrtoeol()
+
+        key = screen.getkey()
+        if key in ('KEY_ENTER', '\n'):
+            return text
+        if key == '\x1b':
+            return None
+        if key in ('KEY_BACKSPACE', '\b', '\x7f'):
+            text = text[:-1]
+        elif len(key) == 1 and key.isprintable():
+            text += key
@@ -1,4 +1,10 @@
 """Module for the environment holder class"""
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def _line_format(idxlen, msglen):
+    return f'{{:{idxlen}d}}: {{:.{msglen}s}}'
 
 
 class Environment:
@@ -16,7 +22,7 @@ class Environment:
             * 1: message
         :rtype: str
         """
-        return f'{{:{self.idxlen}d}}: {{:.{self.msglen}s}}'
+        return _line_format(self.idxlen, self.msglen)
 
     @property
     def status_format(self):
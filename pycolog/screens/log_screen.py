@@ -2,10 +2,26 @@
 Module for main log screen and it's helper function, containing the console interaction and print loop.
 """
 import curses
+from datetime import datetime
+import os
+import re
 import sys
 
+from pycolog import filters
+from pycolog.highlight import Highlighter
+from pycolog.log_file import TIME_FIELD
+from pycolog.query import Query
+from pycolog.search import Searches
+from pycolog.screens.common import prompt, warn
 from pycolog.screens.details_screen import Details
 from pycolog.screens.environment import Environment
+from pycolog.screens.renderer import Renderer
+from pycolog.screens.stats_screen import Statistics
+from pycolog.stats import RENDER, timer
+from pycolog.timestamp import parse_time
+
+FOLLOW_INTERVAL = 500
+"""Milliseconds to wait for a key before checking the log files for new entries in follow mode."""
 
 
 class LogScreen:
@@ -23,8 +39,17 @@ class LogScreen:
 
         self._slice = slice(0, 0)
         self._s = self._e.screen
+        self._renderer = Renderer(self._s, self._render_row, self._prepare_rows)
+        self._follow = kwargs.get('follow', False)
+        self._searches = Searches(analyzer)
+        self._pending_match = False
+        self._error = None
+        self._source_width = 0
+        if kwargs.get('merge'):
+            self._source_width = max((len(os.path.basename(path)) for path in analyzer.sources), default=0) + 1
 
         self._highlight = kwargs.get('highlight', [])
+        self._highlighter = Highlighter([])
         self._color_codes = dict()
 
         self._actions = {
@@ -38,11 +63,20 @@ class LogScreen:
             'KEY_PPAGE': self._previous_page,
             ' ': self._next_page,
             'KEY_NPAGE': self._next_page,
-            'KEY_RESIZE': lambda: True,
+            'KEY_RESIZE': self._resize,
+            't': self._goto_time,
+            'f': self._add_filter,
+            'F': self._remove_filter,
+            'w': self._add_query,
+            '/': self._search,
+            '?': lambda: self._search(interpreted=True),
+            'n': self._next_match,
+            'N': self._previous_match,
         }
 
         self._screens = {
-            'd': Details
+            'd': Details,
+            's': Statistics,
         }
 
     def __enter__(self):
@@ -58,10 +92,12 @@ class LogScreen:
             if self._e.options.get('color_screen'):
                 self._print_colors()
             self._init_highlights()
+            self._highlighter = Highlighter(self._highlight, self._e.log.tag_matcher)
 
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
+        self._e.log.stop()
         curses.nocbreak()
         self._s.keypad(False)
         curses.echo()
@@ -72,21 +108,72 @@ class LogScreen:
         self._first_page()
 
         self._s.clear()
-        self._print_log()
-        self._print_status()
+        self._draw()
 
         while True:
-            key = self._s.getkey()
+            key = self._get_key()
+            if key is None:
+                self._poll()
+                continue
 
             if key in self._screens:
-                skip_refresh = self._screens[key](self._e).show()
+                self._screens[key](self._e).show()
+                self._redraw()
             else:
-                skip_refresh = self._actions.get(key, lambda: self._unknown_command(key))()
+                self._actions.get(key, lambda: self._unknown_command(key))()
+            self._draw()
+
+    def _get_key(self):
+        if not self._follow and not self._searches.running and not self._e.log.loading:
+            return self._s.getkey()
 
-            if not skip_refresh:
-                self._s.clear()
-                self._print_log()
-                self._print_status()
+        self._s.timeout(FOLLOW_INTERVAL)
+        try:
+            return self._s.getkey()
+        except curses.error:
+            return None
+        finally:
+            self._s.timeout(-1)
+
+    def _poll(self):
+        loading = self._e.log.loading
+        if self._follow or loading:
+            self._refresh()
+        if self._pending_match:
+            self._goto_match(include_current=True)
+        if self._follow or loading or self._searches.current:
+            self._draw()
+
+    def _update_log(self, change, *args):
+        self._searches.stop()
+        try:
+            return change(*args)
+        finally:
+            self._searches.resume()
+
+    def _refresh(self):
+        pinned = self._follow and self._slice.stop >= self._e.log.total
+        try:
+            changed = self._update_log(self._e.log.refresh)
+        except Exception as error:  # pylint: disable=broad-except
+            # the entries loaded before the error are kept, the files are not read again
+            self._error = str(error) or type(error).__name__
+            self._follow = False
+            changed = True
+        if not changed:
+            return
+
+        self._update_widths()
+        if pinned:
+            self._last_page()
+
+    def _update_widths(self):
+        idxlen = len(str(self._e.log.total))
+        if idxlen == self._e.idxlen:
+            return False
+        self._e.idxlen = idxlen
+        self._e.msglen = curses.COLS - 2 - self._e.idxlen
+        return True
 
     def _init_highlights(self):
         for highlight in self._highlight:
@@ -103,17 +190,41 @@ class LogScreen:
             self._color_codes[color] = pos
             highlight['color'] = pos
 
-    def _print_log(self):
-        ppos = 0
-        lpos = self._slice.start
-        for line in self._e.log.get_entries(self._slice):
-            self._print_line(ppos, lpos + ppos + 1, line)
-            ppos += 1
+    def _draw(self):
+        with timer(self._e.options, RENDER, 'draw'):
+            lines_per_page = curses.LINES - 2
+            count = len(range(self._e.log.total)[self._slice])
+            self._renderer.draw(self._slice.start, count, lines_per_page, (self._e.log.generation, self._e.msglen))
+            self._s.move(curses.LINES - 2, 0)
+            self._s.clrtoeol()
+            self._print_status()
+            self._s.noutrefresh()
+            curses.doupdate()
+
+    def _redraw(self):
+        self._renderer.invalidate()
+        self._s.erase()
+
+    def _resize(self):
+        curses.update_lines_cols()
+        self._e.idxlen = 0
+        self._update_widths()
+        self._renderer.clear_cache()
+        self._redraw()
+        self._s.clear()
+
+    def _prepare_rows(self, first, last):
+        with timer(self._e.options, RENDER, 'prepare'):
+            self._e.log.get_entries(slice(first, last + 1))
 
-    def _print_line(self, y_pos, index, line):
-        color = self._get_highlight_color(line)
-        msg = line.interpreted_truncate(self._e.msglen)
-        self._s.addstr(y_pos, 0, self._e.line_format.format(index, msg), curses.color_pair(color))
+    def _render_row(self, position):
+        line = self._e.log.get_entry(position)
+        with timer(self._e.options, RENDER, 'highlight'):
+            color = self._highlighter.color(line)
+        msg = line.interpreted_truncate(self._e.msglen - self._source_width)
+        if self._source_width:
+            msg = f'{os.path.basename(self._e.log.source(position)):{self._source_width}}{msg}'
+        return self._e.line_format.format(position + 1, msg), color
 
     def _print_bg_colors(self, foreground):
         self._s.addstr(0, 0, f'Backgrounds ({foreground}):\n\n')
@@ -154,55 +265,48 @@ class LogScreen:
             self._e.log.total,
             '*' if self._e.log.filtered else ''
         ))
-
-    def _get_highlight_color(self, line):
-        for highlight in self._highlight:
-            match = highlight.get('match')
-            if match == 'field' and line[highlight['field']] == highlight['is']:
-                return highlight.get('color', 0)
-        return 0
+        active = ' '.join(str(predicate) for predicate in self._e.log.filters)
+        if active:
+            self._add_status(f'  {active}')
+
+        search = self._searches.current
+        if search:
+            progress = f' ({100 * search.scanned // max(search.total, 1)}%)' if not search.done else ''
+            self._add_status(f'  /{search.pattern.pattern}/ {search.count} matches{progress}')
+
+        loader = self._e.log.progress
+        if loader:
+            byte_rate, entry_rate = loader.rates()
+            percent = 100 * loader.scanned_bytes // max(loader.total_bytes, 1)
+            self._add_status(f'  loading {percent}% {byte_rate / 1e6:.1f} MB/s {entry_rate:,.0f} entries/s')
+        if self._error:
+            self._add_status(f'  load error: {self._error}')
+
+    def _add_status(self, text):
+        self._s.addstr(text[:max(0, curses.COLS - self._s.getyx()[1] - 1)])
 
     def _unknown_command(self, key):
-        self._s.clear()
+        self._s.erase()
         self._s.addstr(2, 2, f'Unknown command {key!r}')
         self._s.getkey()
+        self._redraw()
 
     def _first_page(self):
         self._slice = slice(0, curses.LINES - 2)
 
     def _next_line(self):
         if self._slice.stop + 1 > self._e.log.total:
-            return True
+            return
         self._slice = slice(self._slice.start + 1, self._slice.stop + 1)
-        self._s.move(0, 0)
-        self._s.deleteln()
-
-        self._s.move(curses.LINES - 3, 0)
-        self._s.insertln()
-        line = self._e.log.get_entry(self._slice.stop - 1)
-        self._print_line(curses.LINES - 3, self._slice.stop, line)
-        self._print_status()
-        return True
 
     def _previous_line(self):
         if self._slice.start <= 0:
-            return True
-
+            return
         self._slice = slice(self._slice.start - 1, self._slice.stop - 1)
-        self._s.move(curses.LINES - 3, 0)
-        self._s.deleteln()
-
-        self._s.move(0, 0)
-        self._s.insertln()
-        entry = self._e.log.get_entry(self._slice.start)
-        self._print_line(0, self._slice.start + 1, entry)
-        self._print_status()
-
-        return True
 
     def _last_page(self):
         lines_per_page = curses.LINES - 2
-        self._slice = slice(self._e.log.total - lines_per_page, self._e.log.total)
+        self._slice = slice(max(0, self._e.log.total - lines_per_page), self._e.log.total)
 
     def _next_page(self):
         lines_per_page = curses.LINES - 2
@@ -211,6 +315,112 @@ class LogScreen:
             return
         self._slice = slice(self._slice.stop, self._slice.stop + lines_per_page)
 
+    def _goto_time(self):
+        text = prompt(self._s, 't: ')
+        if not text:
+            return
+
+        reference = None
+        if self._e.log.total:
+            reference = self._e.log.get_entry(min(self._slice.start, self._e.log.total - 1))
+            reference = reference[self._e.options.get('time_field', TIME_FIELD)]
+        try:
+            moment = parse_time(text, reference if isinstance(reference, datetime) else None)
+        except ValueError as error:
+            warn(self._s, str(error))
+            self._s.getkey()
+            return
+
+        lines_per_page = curses.LINES - 2
+        start = self._e.log.find_time(moment)
+        if start + lines_per_page > self._e.log.total:
+            self._last_page()
+            return
+        self._slice = slice(start, start + lines_per_page)
+
+    def _add_filter(self):
+        text = prompt(self._s, 'f: ')
+        if not text or not text.strip():
+            return
+
+        try:
+            predicate = filters.parse(text)
+        except re.error as error:
+            warn(self._s, f'Invalid filter: {error}')
+            self._s.getkey()
+            return
+
+        self._update_log(self._e.log.add_filter, predicate)
+        self._update_widths()
+        self._first_page()
+
+    def _add_query(self):
+        text = prompt(self._s, 'where: ')
+        if not text or not text.strip():
+            return
+
+        try:
+            predicate = Query(text, self._e.log.options)
+        except ValueError as error:
+            warn(self._s, str(error))
+            self._s.getkey()
+            return
+
+        self._update_log(self._e.log.add_filter, predicate)
+        self._update_widths()
+        self._first_page()
+
+    def _remove_filter(self):
+        active = self._e.log.filters
+        if not active:
+            return
+
+        self._update_log(self._e.log.remove_filter, active[-1])
+        self._update_widths()
+        self._first_page()
+
+    def _search(self, interpreted=False):
+        text = prompt(self._s, '?' if interpreted else '/')
+        if not text:
+            return
+
+        try:
+            pattern = re.compile(text)
+        except re.error as error:
+            warn(self._s, f'Invalid pattern: {error}')
+            self._s.getkey()
+            return
+
+        self._searches.start(pattern, interpreted, self._slice.start)
+        self._pending_match = True
+        self._goto_match(include_current=True)
+
+    def _next_match(self):
+        self._goto_match()
+
+    def _goto_match(self, include_current=False):
+        search = self._searches.current
+        if search:
+            return self._show_match(search.next(self._slice.start - 1 if include_current else self._slice.start))
+        return False
+
+    def _previous_match(self):
+        search = self._searches.current
+        if search:
+            self._show_match(search.previous(self._slice.start))
+
+    def _show_match(self, position):
+        self._pending_match = self._pending_match and position is None and self._searches.running
+        if position is None:
+            return False
+
+        lines_per_page = curses.LINES - 2
+        if position + lines_per_page > self._e.log.total:
+            self._last_page()
+        else:
+            self._slice = slice(position, position + lines_per_page)
+        return True
+
     def _previous_page(self):
         lines_per_page = curses.LINES - 2
         if self._slice.start - lines_per_page <= 0:
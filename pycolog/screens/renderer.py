@@ -0,0 +1,100 @@
+"""
+Module for the damage tracking renderer of the log screen.
+The renderer remembers the text and color of every row on the screen and only writes the rows that changed,
+moving rows that are still shown by scrolling the region of the log instead of writing them again.
+"""
+from collections import OrderedDict
+import curses
+
+CACHE_SIZE = 512
+"""Number of rendered rows kept by the renderer."""
+
+_BLANK = ('', 0)
+
+
+class Renderer:
+    """
+    Draws the rows of the log area (the top `rows` lines of the window).
+
+    :param window: The curses window
+    :param render: Function returning the text and color pair of the row at a position
+    :type render: callable
+    :param prepare: Function called with the first and last position of the rows to render, before they are rendered
+    :type prepare: callable
+    """
+    def __init__(self, window, render, prepare=None):
+        self._window = window
+        self._render = render
+        self._prepare = prepare
+        self._cache = OrderedDict()
+        self._rows = 0
+        self._top = None
+        self._shown = []
+
+    def invalidate(self):
+        """Forgets what is on the screen, e.g. after another screen has been shown; all rows are written again."""
+        self._shown = [None] * self._rows
+        self._top = None
+
+    def clear_cache(self):
+        """Forgets all rendered rows, e.g. after the width or the shown entries have changed."""
+        self._cache.clear()
+
+    def draw(self, top, count, rows, key=None):
+        """
+        Draws the rows of the given positions to the window, without refreshing the terminal.
+
+        :param top: Position of the first row
+        :type top: int
+        :param count: Number of positions to draw, the remaining rows are blank
+        :type count: int
+        :param rows: Number of rows of the log area
+        :type rows: int
+        :param key: Additional key of the rendered rows, cached rows with another key are rendered again
+        """
+        if rows != self._rows:
+            self._rows = rows
+            self.invalidate()
+
+        delta = top - self._top if self._top is not None else 0
+        if 0 < abs(delta) < rows:
+            self._scroll(delta)
+        self._top = top
+
+        missing = [top + y_pos for y_pos in range(count) if (top + y_pos, key) not in self._cache]
+        if missing and self._prepare:
+            self._prepare(missing[0], missing[-1])
+
+        for y_pos in range(rows):
+            line = self._line(top + y_pos, key) if y_pos < count else _BLANK
+            if self._shown[y_pos] == line:
+                continue
+            text, color = line
+            self._window.move(y_pos, 0)
+            self._window.clrtoeol()
+            self._window.addnstr(y_pos, 0, text, max(curses.COLS - 1, 0), curses.color_pair(color))
+            self._shown[y_pos] = line
+        self._window.noutrefresh()
+
+    def _line(self, position, key):
+        cache_key = position, key
+        line = self._cache.get(cache_key)
+        if line is None:
+            line = self._cache[cache_key] = self._render(position)
+            if len(self._cache) > CACHE_SIZE:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(cache_key)
+        return line
+
+    def _scroll(self, delta):
+        self._window.idlok(True)
+        self._window.scrollok(True)
+        self._window.setscrreg(0, self._rows - 1)
+        self._window.scroll(delta)
+        self._window.scrollok(False)
+
+        if delta > 0:
+            self._shown = self._shown[delta:] + [_BLANK] * delta
+        else:
+            self._shown = [_BLANK] * -delta + self._shown[:delta]
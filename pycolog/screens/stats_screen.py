@@ -0,0 +1,33 @@
+"""Module containing the statistics view of the instrumented phases"""
+import curses
+
+
+class Statistics:
+    """
+    Screen that shows the counters and timers measured so far, see :mod:`pycolog.stats`.
+    The measurements are only available if pycolog has been started with `--stats`.
+    """
+    def __init__(self, environment):
+        self._e = environment
+        self._s = self._e.screen
+
+    def show(self):
+        """Entry point of the sub-screen routine"""
+        stats = self._e.options.get('stats')
+        lines = stats.report().splitlines() if stats else ['Statistics are disabled, start pycolog with --stats']
+
+        top = 0
+        rows = curses.LINES - 1
+        while True:
+            self._s.erase()
+            for y_pos, line in enumerate(lines[top:top + rows]):
+                self._s.addnstr(y_pos, 0, line, max(curses.COLS - 1, 0))
+            self._s.addnstr(curses.LINES - 1, 0, 'Press j/k to scroll, any other key to return', curses.COLS - 1)
+
+            key = self._s.getkey()
+            if key in ('j', 'KEY_DOWN'):
+                top = min(top + 1, max(len(lines) - rows, 0))
+            elif key in ('k', 'KEY_UP'):
+                top = max(top - 1, 0)
+            else:
+                return
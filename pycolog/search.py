@@ -0,0 +1,172 @@
+"""
+Module for the background search of the log screen.
+A search scans the shown entries chunk by chunk on a background thread, starting at the current
+position and wrapping around, so that the first matches can be navigated while the scan continues.
+Finished searches are kept per query until the shown entries change.
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+import threading
+
+CHUNK_SIZE = 4096
+"""Number of entries scanned before the found matches are published."""
+
+
+class Search:
+    """
+    Search of a regular expression in the shown entries of a log.
+
+    :param log: The log to search
+    :type log: pycolog.log.Log
+    :param pattern: The regular expression
+    :type pattern: re.Pattern
+    :param interpreted: Whether to search the text interpreted by the plugins instead of the raw text
+    :type interpreted: bool
+    :param origin: Index of the shown entry to start the search at
+    :type origin: int
+    """
+    def __init__(self, log, pattern, interpreted=False, origin=0):
+        self.pattern = pattern
+        self.interpreted = interpreted
+        self.generation = log.generation
+        self.total = log.total
+        self.scanned = 0
+        self.origin = min(max(origin, 0), self.total)
+
+        self._log = log
+        self._before = array('q')
+        self._after = array('q')
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+        self.resume()
+
+    @property
+    def done(self):
+        """Gets whether all entries have been scanned."""
+        return self.scanned >= self.total
+
+    @property
+    def running(self):
+        """Gets whether the background thread is still scanning."""
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def count(self):
+        """Gets the number of matches found so far."""
+        return len(self._before) + len(self._after)
+
+    def stop(self):
+        """Stops the scan, the matches found so far are kept."""
+        self._stopped.set()
+        if self._thread:
+            self._thread.join()
+
+    def resume(self):
+        """Continues a stopped scan, the log must not have changed since the search was started."""
+        if self.done or self.running:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name='pycolog-search', daemon=True)
+        self._thread.start()
+
+    def next(self, position):
+        """
+        Gets the first match after the given position, wrapping around at the end.
+
+        :param position: Index of a shown entry
+        :type position: int
+        :returns: Index of the match or `None` if nothing was found so far
+        :rtype: int
+        """
+        with self._lock:
+            for matches in (self._before, self._after):
+                idx = bisect_right(matches, position)
+                if idx < len(matches):
+                    return matches[idx]
+            return self._before[0] if self._before else (self._after[0] if self._after else None)
+
+    def previous(self, position):
+        """
+        Gets the last match before the given position, wrapping around at the beginning.
+
+        :param position: Index of a shown entry
+        :type position: int
+        :returns: Index of the match or `None` if nothing was found so far
+        :rtype: int
+        """
+        with self._lock:
+            for matches in (self._after, self._before):
+                idx = bisect_left(matches, position)
+                if idx:
+                    return matches[idx - 1]
+            return self._after[-1] if self._after else (self._before[-1] if self._before else None)
+
+    def _run(self):
+        while not self.done and not self._stopped.is_set():
+            begin = self.origin + self.scanned
+            if begin < self.total:
+                end, matches = self.total, self._after
+            else:
+                begin, end, matches = begin - self.total, self.origin, self._before
+            end = min(begin + CHUNK_SIZE, end)
+
+            found = self._scan(begin, end)
+            with self._lock:
+                matches.extend(found)
+                self.scanned += end - begin
+
+    def _scan(self, begin, end):
+        return self._log.search(self.pattern, begin, end, self.interpreted)
+
+
+class Searches:
+    """
+    Searches of a log, the last search is running or finished, the finished ones are cached per query.
+
+    :param log: The log to search
+    :type log: pycolog.log.Log
+    """
+    def __init__(self, log):
+        self.current = None
+        self._log = log
+        self._cache = {}
+
+    def start(self, pattern, interpreted=False, origin=0):
+        """
+        Starts a search, a cached search of the same query is reused.
+
+        :returns: The search
+        :rtype: Search
+        """
+        self.stop()
+        if any(search.generation != self._log.generation for search in self._cache.values()):
+            self._cache.clear()
+
+        key = pattern.pattern, pattern.flags, interpreted
+        search = self._cache.get(key)
+        if search is None:
+            search = self._cache[key] = Search(self._log, pattern, interpreted, origin)
+        search.resume()
+        self.current = search
+        return search
+
+    def stop(self):
+        """Stops the running search, this is required before the log changes."""
+        if self.current and self.current.running:
+            self.current.stop()
+
+    def resume(self):
+        """Continues the current search after :meth:`stop`, it is started again if the log has changed."""
+        current = self.current
+        if current is None:
+            return
+        if current.generation != self._log.generation:
+            self.start(current.pattern, current.interpreted, current.origin)
+        else:
+            current.resume()
+
+    @property
+    def running(self):
+        """Gets whether the current search is still scanning."""
+        return bool(self.current) and self.current.running
@@ -0,0 +1,143 @@
+"""
+Module for the instrumentation of pycolog.
+If the options of the log contain a :class:`Stats` (`options['stats']`, see `--stats`), the phases of
+loading and rendering are counted and timed, broken down per field callback, per tag and per plugin hook.
+Without it, the instrumented code only checks for its absence.
+
+Timers are nested: e.g. a field callback called while computing a column is part of both timers.
+"""
+from time import perf_counter
+
+LOAD = 'load'
+"""Category of the phases of opening, scanning and filtering the files."""
+
+ENTRY = 'entry'
+"""Category of the parsing of single entries, e.g. matching the `line_format`."""
+
+FIELD = 'field'
+"""Category of the field callbacks, per field."""
+
+TAG = 'tag'
+"""Category of the tag patterns, per tag."""
+
+PLUGIN = 'plugin'
+"""Category of the plugin hooks, per plugin and hook."""
+
+RENDER = 'render'
+"""Category of the phases of drawing the log screen."""
+
+
+class Stats:
+    """Counters and timers of the instrumented phases, keyed by category and name."""
+    def __init__(self):
+        self._values = {}
+
+    def add(self, category, name, seconds, count=1):
+        """
+        Adds a measurement.
+
+        :param category: Category of the measurement, e.g. :data:`FIELD`
+        :type category: str
+        :param name: Name within the category, e.g. the name of the field
+        :type name: str
+        :param seconds: Measured time
+        :type seconds: float
+        :param count: Number of calls or processed items
+        :type count: int
+        """
+        values = self._values.get((category, name))
+        if values is None:
+            self._values[(category, name)] = [count, seconds]
+        else:
+            values[0] += count
+            values[1] += seconds
+
+    def timer(self, category, name):
+        """
+        Gets a context manager measuring the time of its block.
+
+        :rtype: Timer
+        """
+        return Timer(self, category, name)
+
+    def timed(self, category, name, function):
+        """
+        Wraps a function to measure every call.
+
+        :param function: The function to measure
+        :type function: callable
+        :rtype: callable
+        """
+        def call(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.add(category, name, perf_counter() - start)
+        return call
+
+    def get(self, category, name):
+        """
+        Gets the count and total time of a measurement.
+
+        :returns: Tuple of the count and seconds, zero if nothing was measured
+        :rtype: tuple
+        """
+        return tuple(self._values.get((category, name), (0, 0.0)))
+
+    def rows(self):
+        """
+        Gets all measurements, ordered by category and decreasing time.
+
+        :returns: Tuples of the category, name, count and seconds
+        :rtype: list[tuple]
+        """
+        rows = [(category, name, count, seconds) for (category, name), (count, seconds) in self._values.items()]
+        return sorted(rows, key=lambda row: (row[0], -row[3]))
+
+    def report(self):
+        """
+        Formats all measurements as table.
+
+        :rtype: str
+        """
+        lines = [f'{"category":8} {"name":32} {"count":>10} {"seconds":>10} {"us/call":>10}']
+        for category, name, count, seconds in self.rows():
+            per_call = 1e6 * seconds / max(count, 1)
+            lines.append(f'{category:8} {name[:32]:32} {count:10d} {seconds:10.3f} {per_call:10.1f}')
+        return '\n'.join(lines)
+
+
+class Timer:
+    """
+    Context manager adding the time of its block to the stats, see :meth:`Stats.timer`.
+    Without stats it measures nothing.
+
+    :param stats: The stats to add the measurement to
+    :type stats: Stats
+    """
+    def __init__(self, stats, category, name):
+        self._stats = stats
+        self._category = category
+        self._name = name
+        self._start = None
+
+    def __enter__(self):
+        if self._stats is not None:
+            self._start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._stats is not None:
+            self._stats.add(self._category, self._name, perf_counter() - self._start)
+
+
+def timer(options, category, name):
+    """
+    Gets a context manager measuring its block, if the options contain stats.
+
+    :param options: Options of the log
+    :type options: dict
+    :rtype: Timer
+    """
+    return Timer(options.get('stats'), category, name)
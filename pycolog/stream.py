@@ -0,0 +1,180 @@
+"""
+Module for the headless mode (`--print`), writing the shown entries to a stream instead of the log screen.
+The files are read window by window: only the offsets and columns of the entries within the current
+window are kept, so the memory does not grow with the size of the files.
+Every window is filtered by the same predicates as the log screen (see :mod:`pycolog.filters`) and
+the matching entries are processed by the plugins in batches before they are written.
+"""
+from datetime import date, datetime, time
+import heapq
+import json
+import os
+import re
+
+from pycolog import plugins
+from pycolog.columns import MISSING, time_of
+from pycolog.encoding import codec_of
+from pycolog.filters import Filters
+from pycolog.log import input_files, layout_filters
+from pycolog.log_file import TIME_FIELD, LogFile
+from pycolog.scanner import compile_entry_start, find_entry_start
+from pycolog.tags import TagMatcher
+
+WINDOW_SIZE = 4 * 1024 * 1024
+"""Number of bytes of a file that are scanned and filtered at once."""
+
+BATCH_SIZE = 1024
+"""Number of entries processed by the plugins at once."""
+
+
+class _Window:
+    """
+    The entries of a file within the current window, in the role of a log for the filters.
+
+    :param log_file: The file, containing only the entries of the window
+    :type log_file: pycolog.log_file.LogFile
+    :param options: Options of the log
+    :type options: dict
+    """
+    def __init__(self, log_file, options):
+        self.log_file = log_file
+        self.options = options
+
+    @property
+    def count(self):
+        return len(self.log_file)
+
+    @property
+    def tag_matcher(self):
+        return self.options['tag_matcher']
+
+    def files_from(self, first):
+        if first < self.count:
+            yield 0, self.log_file, first
+
+
+def windows(log_file, entry_start, begin=None):
+    """
+    Moves the file to one window after the other, only the entries of the current window are kept.
+
+    :param log_file: File created without scanning
+    :type log_file: pycolog.log_file.LogFile
+    :param entry_start: Line start pattern as returned by :func:`pycolog.scanner.compile_entry_start`.
+    :type entry_start: re.Pattern
+    :param begin: Offset of the entry to start at, defaults to :attr:`pycolog.log_file.LogFile.pending`
+    :type begin: int
+    :returns: The file for every window
+    :raises Exception: The error of a compressed file that ended early, after the windows before it,
+        see :attr:`pycolog.log_file.LogFile.error`
+    """
+    begin, end = log_file.pending if begin is None else begin, log_file.end
+    while begin < end:
+        stop = end
+        if begin + WINDOW_SIZE < end:
+            stop = find_entry_start(log_file.buffer, entry_start, begin + WINDOW_SIZE, end)
+        log_file.apply((0, [], [], {}))
+        log_file.apply(log_file.scan_part(begin, stop))
+        yield log_file
+        begin = stop
+    if log_file.error is not None:
+        raise log_file.error
+
+
+def _file_entries(path, entry_start, options, predicates):
+    log_file = LogFile(path, entry_start, options, scan=False)
+    try:
+        for window in windows(log_file, entry_start):
+            filters = Filters(_Window(window, options))
+            filters.active.extend(predicates)
+            shown = filters.visible()
+            indices = range(len(window)) if shown is None else shown
+            for first in range(0, len(indices), BATCH_SIZE):
+                batch = [window.entry(idx) for idx in indices[first:first + BATCH_SIZE]]
+                plugins.post_construct_batch(batch, options)
+                yield from batch
+    finally:
+        log_file.close()
+
+
+def _timed_entries(file_idx, path, entry_start, options, predicates):
+    field = options.get('time_field', TIME_FIELD)
+    last = MISSING
+    for sequence, entry in enumerate(_file_entries(path, entry_start, options, predicates)):
+        moment = time_of(entry[field], field)
+        if moment != MISSING:
+            last = moment
+        yield last, file_idx, sequence, path, entry
+
+
+def entries(options):
+    """
+    Yields the shown entries of the input files, in the order of the log screen.
+    The values of the columns are taken from the current window, so an entry has to be used
+    before the next one is requested.
+
+    :param options: Options of the log, see :class:`pycolog.log.Log`
+    :type options: dict
+    :returns: Tuples of the path of the file and the entry
+    """
+    options.setdefault('tag_matcher', TagMatcher(options.get('tags', {}), options.get('stats'), codec_of(options)))
+    entry_start = compile_entry_start(options.get('line_start', re.compile(r'^')), codec_of(options))
+    predicates = layout_filters(options)
+    paths = input_files(options.get('files'))
+
+    if options.get('merge'):
+        streams = [_timed_entries(idx, path, entry_start, options, predicates) for idx, path in enumerate(paths)]
+        for _, _, _, path, entry in heapq.merge(*streams):
+            yield path, entry
+        return
+
+    for path in paths:
+        for entry in _file_entries(path, entry_start, options, predicates):
+            yield path, entry
+
+
+def _json_value(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return str(value)
+
+
+def format_text(path, entry):  # pylint: disable=unused-argument
+    """Formats an entry as its interpreted text, or the raw text if the plugins do not interpret it."""
+    return entry.interpreted or entry.raw
+
+
+def format_json(path, entry):
+    """Formats an entry as JSON object with the source, the raw and interpreted text, the tags and the fields."""
+    return json.dumps({
+        'source': path,
+        'raw': entry.raw,
+        'interpreted': entry.interpreted,
+        'tags': sorted(entry.tags),
+        'fields': entry.attributes,
+    }, default=_json_value)
+
+
+FORMATS = {
+    'text': format_text,
+    'json': format_json,
+}
+"""Output formats of the headless mode, by name."""
+
+
+def write(output, options):
+    """
+    Writes the shown entries to the output, one entry (text) or one JSON object (json) per line.
+
+    :param output: The stream to write to, e.g. `sys.stdout`
+    :param options: Options of the log, `format` selects the output format
+    :type options: dict
+    :returns: Number of written entries
+    :rtype: int
+    """
+    formatter = FORMATS[options.get('format') or 'text']
+    count = 0
+    for path, entry in entries(options):
+        output.write(formatter(os.fspath(path), entry))
+        output.write('\n')
+        count += 1
+    return count
@@ -0,0 +1,165 @@
+"""
+Module for the tag matching engine.
+All tags of a layout are compiled into one :class:`TagMatcher`, which matches them
+against a message and returns the matching tags as bitmask.
+"""
+import re
+from time import perf_counter
+
+from pycolog.encoding import Codec
+from pycolog.stats import TAG
+
+try:
+    from re import _parser as sre_parse  # pylint: disable=no-name-in-module
+except ImportError:  # Python < 3.11
+    import sre_parse  # pylint: disable=deprecated-module
+
+
+def _literals(parsed):
+    run = ''
+    for operator, argument in parsed:
+        if operator is sre_parse.LITERAL:
+            run += chr(argument)
+            continue
+        if run:
+            yield run
+        run = ''
+        if operator is sre_parse.SUBPATTERN and not argument[1] & re.IGNORECASE:
+            yield from _literals(argument[-1])
+    if run:
+        yield run
+
+
+def required_literal(pattern):
+    """
+    Finds the longest literal text that is part of every match of the given pattern.
+
+    :param pattern: Compiled regular expression
+    :type pattern: re.Pattern
+    :returns: The literal or `None` if there is no such literal
+    :rtype: str
+    """
+    if not isinstance(pattern.pattern, str) or pattern.flags & re.IGNORECASE:
+        return None
+    try:
+        parsed = sre_parse.parse(pattern.pattern, pattern.flags)
+    except re.error:
+        return None
+    return max(_literals(parsed), key=len, default=None)
+
+
+class TagMatcher:
+    """
+    Matches all tags of a layout against a message.
+    Every tag is prefiltered by a literal that a match requires, entries without any of
+    these literals are rejected by a single search of a combined pattern.
+    The remaining tags are verified by their own pattern and `where` constraints.
+    Undecoded messages are matched as bytes if all patterns can be, see :mod:`pycolog.encoding`.
+
+    :param tags: The `tags` section of the layout
+    :type tags: dict
+    :param stats: Stats to measure the time of every tag in, see :mod:`pycolog.stats`
+    :type stats: pycolog.stats.Stats
+    :param codec: Encoding of the log files, defaults to UTF-8
+    :type codec: pycolog.encoding.Codec
+    """
+    def __init__(self, tags, stats=None, codec=None):
+        self.names = list(tags)
+        self._stats = stats
+        self._codec = codec or Codec()
+        self._bits = {name: 1 << bit for bit, name in enumerate(self.names)}
+        self._rules = []
+        for name, config in tags.items():
+            pattern = config.get('pattern')
+            where = {capture: where.get('in', []) for capture, where in config.get('where', {}).items()}
+            self._rules.append((self._bits[name], required_literal(pattern), pattern, where))
+        self._prefilter = self._compile_prefilter(self._rules)
+
+        self._byte_rules = self._to_bytes(self._rules)
+        self._byte_prefilter = self._compile_prefilter(self._byte_rules) if self._byte_rules is not None else None
+
+    def __len__(self):
+        return len(self.names)
+
+    def mask(self, raw):
+        """
+        Matches all tags against the message.
+
+        :param raw: The raw message, or its undecoded data
+        :type raw: str | bytes
+        :returns: Bitmask of the matching tags, bit `n` is set for the `n`-th tag of the layout
+        :rtype: int
+        """
+        rules, prefilter = self._rules, self._prefilter
+        if isinstance(raw, bytes):
+            if self._byte_rules is None:
+                raw = self._codec.decode(raw)
+            else:
+                rules, prefilter = self._byte_rules, self._byte_prefilter
+
+        if self._stats is not None:
+            return self._measured_mask(raw, rules, prefilter)
+        if prefilter and not prefilter.search(raw):
+            return 0
+
+        mask = 0
+        for bit, literal, pattern, where in rules:
+            if literal and literal not in raw:
+                continue
+            match = pattern.search(raw)
+            if match and self._accepts(match, where):
+                mask |= bit
+        return mask
+
+    def _measured_mask(self, raw, rules, prefilter):
+        start = perf_counter()
+        rejected = prefilter and not prefilter.search(raw)
+        self._stats.add(TAG, '(prefilter)', perf_counter() - start)
+        if rejected:
+            return 0
+
+        mask = 0
+        for name, (bit, literal, pattern, where) in zip(self.names, rules):
+            if literal and literal not in raw:
+                continue
+            start = perf_counter()
+            match = pattern.search(raw)
+            if match and self._accepts(match, where):
+                mask |= bit
+            self._stats.add(TAG, name, perf_counter() - start)
+        return mask
+
+    def names_of(self, mask):
+        """Gets the names of the tags in the given bitmask."""
+        return {name for name, bit in self._bits.items() if mask & bit}
+
+    def mask_of(self, names):
+        """Gets the bitmask of the given tag names, unknown names are ignored."""
+        return sum(self._bits.get(name, 0) for name in set(names))
+
+    def _accepts(self, match, where):
+        if not where:
+            return True
+        captures = match.groupdict()
+        if isinstance(match.string, bytes):
+            captures = {k: self._codec.decode(v) if v is not None else None for k, v in captures.items()}
+        return all(captures.get(capture, None) in values for capture, values in where.items())
+
+    def _to_bytes(self, rules):
+        byte_rules = []
+        for bit, literal, pattern, where in rules:
+            byte_pattern = self._codec.to_bytes(pattern)
+            if byte_pattern is None:
+                return None
+            byte_literal = literal.encode(self._codec.encoding) if literal else literal
+            byte_rules.append((bit, byte_literal, byte_pattern, where))
+        return byte_rules
+
+    @staticmethod
+    def _compile_prefilter(rules):
+        literals = {rule[1] for rule in rules}
+        if not literals or not all(literals):
+            return None
+        literals = sorted(literals, key=len, reverse=True)
+        separator = b'|' if isinstance(literals[0], bytes) else '|'
+        return re.compile(separator.join(re.escape(literal) for literal in literals))
@@ -0,0 +1,232 @@
+"""
+Module for the cached timestamp parser.
+A :func:`datetime.strptime` format is compiled once into a regular expression with the same
+directive patterns, the parsed dates are cached since most entries share the same minute.
+Formats with directives that are not supported fall back to :func:`datetime.strptime`.
+"""
+import calendar
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from operator import itemgetter
+import re
+
+from pycolog.columns import to_epoch
+
+PREFIX_CACHE_SIZE = 4096
+"""Maximum number of parsed prefixes (everything up to the minute) kept by a parser."""
+
+_DIRECTIVES = {
+    'Y': r'\d\d\d\d',
+    'y': r'\d\d',
+    'm': r'1[0-2]|0[1-9]|[1-9]',
+    'd': r'3[01]|[12]\d|0[1-9]|[1-9]| [1-9]',
+    'H': r'2[0-3]|[0-1]\d|\d',
+    'M': r'[0-5]\d|\d',
+    'S': r'6[0-1]|[0-5]\d|\d',
+    'f': r'[0-9]{1,6}',
+    'z': r'[+-]\d\d:?[0-5]\d|(?-i:Z)',
+}
+
+_MONTHS = {name.lower(): month for month, name in enumerate(calendar.month_name) if name}
+_MONTHS.update({name.lower(): month for month, name in enumerate(calendar.month_abbr) if name})
+
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _month_pattern(names):
+    return '|'.join(sorted((re.escape(name) for name in names if name), key=len, reverse=True))
+
+
+class TimestampParser:
+    """
+    Parser for a single :func:`datetime.strptime` format.
+    Everything but the seconds, fractions and time zone is taken as prefix, which is
+    parsed once and cached, as most entries of a log share the same minute.
+
+    :param format: Format of the input strings
+    :type format: str
+    """
+    def __init__(self, format):  # pylint: disable=redefined-builtin
+        self.format = format
+        self._pattern, names = self._compile(format)
+        self._second, self._fraction, self._zone = (names.index(n) if n in names else None for n in 'Sfz')
+
+        prefix = [idx for idx, name in enumerate(names) if name not in 'Sfz']
+        self._prefix_names = [names[idx] for idx in prefix]
+        self._prefix_key = itemgetter(*prefix) if prefix else (lambda groups: ())
+        self._prefixes = {}
+
+    @property
+    def supported(self):
+        """Gets whether the format is parsed without :func:`datetime.strptime`."""
+        return self._pattern is not None
+
+    def parse(self, date_string):
+        """
+        Parses the given string, equal to :func:`datetime.strptime`.
+
+        :param date_string: Input date to parse
+        :type date_string: str
+        :rtype: datetime
+        """
+        values = self._match(date_string)
+        if values is None:
+            return datetime.strptime(date_string, self.format)
+
+        (_, fields), second, microsecond, zone = values
+        return datetime(*fields, second, microsecond, tzinfo=zone)
+
+    def epoch(self, date_string):
+        """
+        Parses the given string to microseconds since the epoch, see :func:`pycolog.columns.to_epoch`.
+
+        :param date_string: Input date to parse
+        :type date_string: str
+        :rtype: int
+        """
+        values = self._match(date_string)
+        if values is None:
+            return to_epoch(datetime.strptime(date_string, self.format))
+
+        (base, _), second, microsecond, zone = values
+        result = base + second * 1000000 + microsecond
+        if zone is not None:
+            result -= zone.utcoffset(None) // _MICROSECOND
+        return result
+
+    def _match(self, date_string):
+        match = self._pattern.fullmatch(date_string) if self._pattern else None
+        if not match:
+            return None
+
+        groups = match.groups()
+        key = self._prefix_key(groups)
+        prefix = self._prefixes.get(key)
+        if prefix is None:
+            prefix = self._parse_prefix(key)
+            if prefix is None:
+                return None
+            if len(self._prefixes) >= PREFIX_CACHE_SIZE:
+                self._prefixes.clear()
+            self._prefixes[key] = prefix
+
+        second = int(groups[self._second]) if self._second is not None else 0
+        if second > 59:
+            return None
+        fraction = groups[self._fraction] if self._fraction is not None else None
+        microsecond = int(fraction.ljust(6, '0')) if fraction else 0
+        zone = _zone(groups[self._zone]) if self._zone is not None else None
+        return prefix, second, microsecond, zone
+
+    def _parse_prefix(self, key):
+        found = dict(zip(self._prefix_names, key if len(self._prefix_names) > 1 else [key]))
+        if 'Y' in found:
+            year = int(found['Y'])
+        elif 'y' in found:
+            year = int(found['y'])
+            year += 2000 if year <= 68 else 1900
+        else:
+            year = 1900
+
+        month = found.get('m') or found.get('b') or found.get('B')
+        month = _MONTHS[month.lower()] if month and not month.isdigit() else int(month or 1)
+
+        fields = (year, month, int(found.get('d') or 1), int(found.get('H') or 0), int(found.get('M') or 0))
+        try:
+            return to_epoch(datetime(*fields)), fields
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _compile(format):  # pylint: disable=redefined-builtin
+        directives = dict(_DIRECTIVES, b=_month_pattern(calendar.month_abbr), B=_month_pattern(calendar.month_name))
+        pattern = ''
+        names = []
+        pos = 0
+        while pos < len(format):
+            char = format[pos]
+            if char != '%':
+                pattern += r'\s+' if char.isspace() else re.escape(char)
+                pos += 1
+                continue
+
+            directive = format[pos + 1:pos + 2]
+            if directive == '%':
+                pattern += '%'
+            elif directive in directives and directive not in names:
+                pattern += f'({directives[directive]})'
+                names.append(directive)
+            else:
+                return None, []
+            pos += 2
+        return re.compile(pattern, re.IGNORECASE), names
+
+
+@lru_cache(maxsize=None)
+def _zone(value):
+    if value == 'Z':
+        return timezone.utc
+    value = value.replace(':', '')
+    offset = timedelta(hours=int(value[1:3]), minutes=int(value[3:5]))
+    return timezone(-offset if value[0] == '-' else offset)
+
+
+_DATE_FORMATS = ['%Y-%m-%d', '%Y-%m-%dT%H:%M', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%dT%H:%M:%S.%f']
+_TIME_FORMATS = ['%H:%M', '%H:%M:%S', '%H:%M:%S.%f']
+
+
+def parse_time(text, reference=None):
+    """
+    Parses a time entered by the user, either a date with optional time (e.g. `2020-07-02 12:00`)
+    or only a time of the day (e.g. `12:00:30`) on the date of the reference.
+
+    :param text: The entered time
+    :type text: str
+    :param reference: Timestamp to take the date from, if only a time of the day is given
+    :type reference: datetime
+    :rtype: datetime
+    """
+    text = text.strip().replace(' ', 'T', 1)
+    for format in _DATE_FORMATS:  # pylint: disable=redefined-builtin
+        try:
+            return datetime.strptime(text, format)
+        except ValueError:
+            pass
+
+    for format in _TIME_FORMATS:  # pylint: disable=redefined-builtin
+        try:
+            clock = datetime.strptime(text, format)
+        except ValueError:
+            continue
+        date = reference or datetime.now()
+        return datetime.combine(date.date(), clock.time())
+    raise ValueError(f'Unknown time format {text!r}')
+
+
+@lru_cache(maxsize=None)
+def parser(format):  # pylint: disable=redefined-builtin
+    """
+    Gets the (shared) parser of the given format.
+
+    :param format: Format of the input strings
+    :type format: str
+    :rtype: TimestampParser
+    """
+    return TimestampParser(format)
+
+
+def timestamp(date_string, format, epoch=False):  # pylint: disable=redefined-builtin
+    """
+    Fast replacement of :func:`pycolog.yaml_loader.strptime`, using a cached parser of the format.
+
+    :param date_string: Input date to parse
+    :type date_string: str
+    :param format: Format of the input string, see :func:`datetime.strptime`
+    :type format: str
+    :param epoch: Whether to return microseconds since the epoch instead of a :class:`datetime.datetime`
+    :type epoch: bool
+    :rtype: datetime or int
+    """
+    if epoch:
+        return parser(format).epoch(date_string)
+    return parser(format).parse(date_string)
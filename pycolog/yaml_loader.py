@@ -7,6 +7,8 @@ from datetime import datetime
 
 import yaml
 
+from pycolog.timestamp import timestamp
+
 
 def strptime(date_string, format):  # pylint: disable=redefined-builtin
     """
@@ -30,3 +32,4 @@ def register():
     """
     yaml.SafeLoader.add_constructor(u'tag:yaml.org,2002:python/regexp', lambda l, n: re.compile(l.construct_scalar(n)))
     yaml.SafeLoader.add_constructor(u'tag:yaml.org,2002:python/strptime', lambda l, n: strptime)
+    yaml.SafeLoader.add_constructor(u'tag:yaml.org,2002:python/timestamp', lambda l, n: timestamp)
@@ -0,0 +1,42 @@
+"""Layout, log files and helpers shared by the tests."""
+import re
+
+import pytest
+
+from pycolog.timestamp import timestamp
+
+
+def timestamp_field(format_='%H:%M:%S'):
+    """Creates the settings of a `timestamp` field parsed by :func:`pycolog.timestamp.timestamp`."""
+    return {'callback': timestamp, 'argument': 'date_string', 'kwargs': {'format': format_}}
+
+
+def layout(line_format, **kwargs):
+    """
+    Creates the layout of entries starting with a `%H:%M:%S` timestamp.
+
+    :param line_format: Pattern of the entries, has to contain the `timestamp` group
+    :type line_format: str
+    :param kwargs: Further sections of the layout, e.g. `tags`
+    :rtype: dict
+    """
+    return dict({
+        'line_start': re.compile(r'\d\d:'),
+        'line_format': re.compile(line_format),
+        'fields': {'timestamp': timestamp_field()},
+    }, **kwargs)
+
+
+def messages(log):
+    """Gets the `message` field of all entries of the log."""
+    return [e['message'] for e in log.get_entries(slice(None))]
+
+
+@pytest.fixture
+def files(tmp_path, request):
+    """Writes the contents of the `FILES` list of the test module to `a.log`, `b.log`, ... and returns the paths."""
+    paths = []
+    for idx, content in enumerate(request.module.FILES):
+        paths.append(tmp_path / f'{chr(ord("a") + idx)}.log')
+        paths[-1].write_text(content)
+    return paths
@@ -0,0 +1,25 @@
+from benchmarks.__main__ import run
+from benchmarks.generator import Settings, generate
+from benchmarks.layouts import LAYOUTS
+from benchmarks.suite import BENCHMARKS
+
+SETTINGS = Settings(entries=300, files=2, multiline_ratio=0.2, tag_density=0.5, seed=7)
+
+
+def test_generate_reproducible(tmp_path):
+    first = generate(tmp_path / 'first', SETTINGS)
+    second = generate(tmp_path / 'second', SETTINGS)
+    assert len(first) == 2
+    assert [path.read_bytes() for path in first] == [path.read_bytes() for path in second]
+
+    other = generate(tmp_path / 'other', Settings(entries=300, files=2, seed=8))
+    assert [path.read_bytes() for path in first] != [path.read_bytes() for path in other]
+
+
+def test_suite(tmp_path):
+    results = run(SETTINGS, LAYOUTS, list(BENCHMARKS), 1, tmp_path)
+    assert results['settings'] == SETTINGS.to_dict()
+    assert set(results['results']) == set(LAYOUTS)
+    for layout_results in results['results'].values():
+        assert layout_results['load']['entries'] == 300
+        assert all(result['seconds'] >= 0 for result in layout_results.values())
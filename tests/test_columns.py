@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta, timezone
+import pickle
+import re
+
+import pytest
+
+from pycolog.columns import CategoryColumn, TimeColumn, from_epoch, to_epoch
+from pycolog.log import Log
+from pycolog.yaml_loader import strptime
+
+
+@pytest.mark.parametrize('value', [
+    datetime(2020, 7, 2, 12, 30, 15, 123456),
+    datetime(1960, 1, 1),
+    None,
+])
+def test_epoch(value):
+    assert from_epoch(to_epoch(value)) == value
+
+
+def test_time_column_aware():
+    column = TimeColumn('time')
+    column.append({'time': datetime(2020, 7, 2, 14, tzinfo=timezone(timedelta(hours=2)))})
+    assert column[0] == datetime(2020, 7, 2, 12, tzinfo=timezone.utc)
+
+
+def test_category_column():
+    column = CategoryColumn('level')
+    for level in ['INFO', 'ERROR', 'INFO', None]:
+        column.append({'level': level})
+    assert list(column.data) == [1, 2, 1, 0]
+    assert column.code('ERROR') == 2
+
+    other = pickle.loads(pickle.dumps(column))
+    other.append({'level': 'WARN'})
+    column.truncate(1)
+    column.merge(CategoryColumn('level'))
+    column.merge(other)
+    assert [column[i] for i in range(len(column))] == ['INFO', 'INFO', 'ERROR', 'INFO', None, 'WARN']
+
+
+def test_log_columns(tmp_path):
+    f = tmp_path / 'input.log'
+    f.write_text('2020-07-02 INFO started\n2020-07-03 ERROR failed\nbroken\n')
+
+    calls = []
+
+    def parse(value):
+        calls.append(value)
+        return strptime(value, '%Y-%m-%d')
+
+    log = Log(files=[f],
+              line_format=re.compile(r'^(?P<time>\S+) (?P<level>\w+)'),
+              fields={'time': {'callback': parse, 'argument': 'value'}},
+              columns={'time': 'time', 'level': 'category'})
+    assert len(calls) == 2
+
+    entry = log.get_entry(1)
+    assert entry.time == datetime(2020, 7, 3)
+    assert entry['level'] == 'ERROR'
+    assert log.get_entry(2).level is None
+    assert entry.attributes == {'time': datetime(2020, 7, 3), 'level': 'ERROR'}
+    assert len(calls) == 2
@@ -0,0 +1,124 @@
+import bz2
+import gzip
+import io
+import lzma
+import os
+
+import pytest
+import re
+
+from pycolog import stream
+from pycolog.compressed import BZIP2, GZIP, XZ, Decompressed, SeekPoints, compression_of
+from pycolog.log import Log
+
+LINE_START = re.compile(r'\d+ ')
+CONTENT = ''.join(f'{idx} line {idx}\n' + (' trace\n' if idx % 7 == 0 else '') for idx in range(500))
+ENTRIES = [entry.strip() for entry in re.split(r'(?m)^(?=\d+ )', CONTENT) if entry]
+
+
+def _members(compress, *parts):
+    return b''.join(compress(part.encode()) for part in parts)
+
+
+COMPRESSED = {
+    GZIP: lambda: _members(gzip.compress, CONTENT[:3000], CONTENT[3000:]),
+    BZIP2: lambda: _members(bz2.compress, CONTENT),
+    XZ: lambda: _members(lzma.compress, CONTENT[:100], CONTENT[100:]),
+    'xz padded': lambda: lzma.compress(CONTENT[:100].encode()) + bytes(8) + lzma.compress(CONTENT[100:].encode()),
+}
+
+
+@pytest.mark.parametrize('compression', list(COMPRESSED))
+def test_compression_of(tmp_path, compression):
+    f = tmp_path / 'input.log.gz'
+    f.write_bytes(COMPRESSED[compression]())
+    assert compression_of(f) == compression.split()[0]
+
+    f.write_text(CONTENT)
+    assert compression_of(f) is None
+
+
+@pytest.mark.parametrize('compression', list(COMPRESSED))
+@pytest.mark.parametrize('options', [{}, {'jobs': 2}, {'index_dir': 'index'}, {'background': True}])
+def test_entries(tmp_path, compression, options):
+    f = tmp_path / 'input.log.1'
+    f.write_bytes(COMPRESSED[compression]())
+    if 'index_dir' in options:
+        options = dict(options, index_dir=tmp_path / 'index')
+        Log(files=[f], line_start=LINE_START, **options)
+
+    log = Log(files=[f], line_start=LINE_START, **options)
+    while log.loading:
+        log.refresh()
+    assert [str(e) for e in log.get_entries(slice(None))] == ENTRIES
+
+
+def test_seek_points(tmp_path):
+    f = tmp_path / 'input.log.gz'
+    f.write_bytes(COMPRESSED[GZIP]())
+    complete = Decompressed(f, GZIP)
+    middle = complete.seek_points.points[1][1]
+    assert complete.seek_points.points == [(0, 0), (complete.seek_points.points[1][0], len(CONTENT[:3000]))]
+    assert complete.map[:] == CONTENT.encode()
+
+    lazy = Decompressed(f, GZIP, SeekPoints(complete.seek_points.points, complete.seek_points.size))
+    lazy.fill(middle + 10, middle + 20)
+    assert lazy.map[middle:middle + 20] == CONTENT[3000:3020].encode()
+    assert lazy.map[:10] == bytes(10)
+    assert not lazy.complete
+
+    lazy.fill()
+    assert lazy.complete
+    assert lazy.map[:] == CONTENT.encode()
+    complete.close()
+    lazy.close()
+
+
+def test_reopen(tmp_path):
+    f = tmp_path / 'input.log.gz'
+    f.write_bytes(COMPRESSED[GZIP]())
+    Log(files=[f], line_start=LINE_START, index_dir=tmp_path)
+
+    log = Log(files=[f], line_start=LINE_START, index_dir=tmp_path)
+    log_file = log._files[0]
+    assert log_file.compressed and not log_file._source.complete
+    assert str(log.get_entry(log.total - 1)) == ENTRIES[-1]
+    assert log_file._source.map[:10] == bytes(10)
+
+
+def test_refresh_replaced(tmp_path):
+    f = tmp_path / 'input.log.gz'
+    f.write_bytes(gzip.compress(b'1 first\n'))
+    log = Log(files=[f], line_start=LINE_START)
+
+    f.write_bytes(gzip.compress(b'1 first\n2 second\n'))
+    os.utime(f, ns=(1, 1))
+    log.refresh()
+    assert [str(e) for e in log.get_entries(slice(None))] == ['1 first', '2 second']
+
+
+@pytest.mark.parametrize('background', [False, True])
+def test_truncated(tmp_path, background):
+    f = tmp_path / 'input.log.gz'
+    data = gzip.compress(CONTENT.encode())
+    f.write_bytes(data[:len(data) // 2])
+    with pytest.raises(EOFError, match='ended before the end of the data'):
+        log = Log(files=[f], line_start=LINE_START, background=background, index_dir=tmp_path / 'index')
+        while log.loading:
+            log.refresh()
+    assert not list((tmp_path / 'index').glob('*.seek'))
+
+    f.write_bytes(data)
+    log = Log(files=[f], line_start=LINE_START, index_dir=tmp_path / 'index')
+    assert [str(e) for e in log.get_entries(slice(None))] == ENTRIES
+    assert list((tmp_path / 'index').glob('*.seek'))
+
+
+def test_truncated_stream(tmp_path):
+    f = tmp_path / 'input.log.gz'
+    data = gzip.compress(CONTENT.encode())
+    f.write_bytes(data[:len(data) // 2])
+    output = io.StringIO()
+    with pytest.raises(EOFError):
+        stream.write(output, {'files': [f], 'line_start': LINE_START})
+    assert output.getvalue().startswith(ENTRIES[0])
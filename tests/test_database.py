@@ -0,0 +1,150 @@
+from datetime import datetime
+import re
+import sqlite3
+import time
+
+import pytest
+
+from pycolog import database
+from pycolog.database import DatabaseLog
+from pycolog.filters import Not, Pattern, Tag
+from pycolog.log import Log
+from pycolog.query import Query
+from pycolog.search import Search
+from tests.conftest import layout
+
+LAYOUT = layout(r'(?P<timestamp>\S+) (?P<level>\S+) (?P<message>.*)',
+                tags={'db': {'pattern': re.compile('sql')}, 'net': {'pattern': re.compile('tcp')}})
+
+
+def _line(idx, name):
+    level = ['INFO', 'WARN', 'ERROR'][idx % 3]
+    tag = ['sql', 'tcp', ''][idx % 4 % 3]
+    return f'10:{idx // 60:02d}:{idx % 60:02d} {level} {name}{idx} {tag}\n'
+
+
+FILES = [''.join(_line(idx, 'a') for idx in range(0, 300, 2)) + 'continued\n',
+         ''.join(_line(idx, 'b') for idx in range(1, 300, 2))]
+
+
+def _open(files, tmp_path, **options):
+    return DatabaseLog(files=files, db=tmp_path / 'log.db', **LAYOUT, **options)
+
+
+def _raw(log, slice_=slice(None)):
+    return [entry.raw for entry in log.get_entries(slice_)]
+
+
+@pytest.mark.parametrize('options', [{}, {'merge': True}, {'where': 'level == ERROR and not #net'},
+                                     {'filter': {'tags': {'contain': ['db']}}, 'merge': True}])
+def test_entries(files, tmp_path, options):
+    log = _open(files, tmp_path, **options)
+    expected = Log(files=files, **LAYOUT, **options)
+    assert (log.total, log.count, log.filtered) == (expected.total, expected.count, expected.filtered)
+    assert _raw(log) == _raw(expected)
+    assert log.sources == expected.sources
+    positions = range(0, log.total, 7)
+    assert [log.source(idx) for idx in positions] == [expected.source(idx) for idx in positions]
+
+
+@pytest.mark.parametrize('anchors', [4, 64, 4096])
+@pytest.mark.parametrize('options', [{'merge': True}, {}, {'where': 'level != ERROR'}])
+def test_paging(files, tmp_path, monkeypatch, anchors, options):
+    monkeypatch.setattr(database, 'ANCHORS', anchors)
+    log = _open(files, tmp_path, **options)
+    assert (log._seeks is not None) == (not options)
+    expected = _raw(Log(files=files, **LAYOUT, **options))
+    for first in [0, 10, 9, 8, 250, 290, 280, 120, 0, 295]:
+        assert _raw(log, slice(first, first + 10)) == expected[first:first + 10]
+    assert log.get_entry(-1).raw == expected[-1]
+    assert log.text(150) == expected[150]
+    with pytest.raises(IndexError):
+        log.get_entry(300)
+
+
+def test_filters(files, tmp_path):
+    log = _open(files, tmp_path, merge=True)
+    expected = Log(files=files, merge=True, **LAYOUT)
+    for predicate in [Tag('db'), Not(Tag('net')), Pattern(re.compile(r'a1\d ')), Pattern(re.compile(r'ERR.R')),
+                      Query('level in (WARN, ERROR) and time < 10:02', LAYOUT)]:
+        log.add_filter(predicate)
+        expected.add_filter(predicate)
+        assert _raw(log) == _raw(expected)
+        assert log.find_time(datetime(1900, 1, 1, 10, 1)) == expected.find_time(datetime(1900, 1, 1, 10, 1))
+    log.remove_filter(log.filters[0])
+    expected.remove_filter(expected.filters[0])
+    assert _raw(log) == _raw(expected)
+
+
+@pytest.mark.parametrize('query', [
+    'level == ERROR', 'level != ERROR', 'level in (WARN, ERROR)', 'not level not in (INFO)', 'level < J',
+    'message ~ /a1\\d/ or level = WARN', 'message !~ /[05]$/', 'missing == x', 'missing != x',
+    'time >= "1900-01-01 10:02" and time < "1900-01-01 10:03"', 'time in ("1900-01-01 10:00:07", 10)',
+])
+def test_query_sql(files, tmp_path, query):
+    log = _open(files, tmp_path, merge=True, where=query)
+    assert 'pycolog_filter(?, raw)' not in log._sql(Query(query, log.options))[0]
+    assert _raw(log) == _raw(Log(files=files, merge=True, where=query, **LAYOUT))
+
+
+@pytest.mark.parametrize('query', ['level == ERROR and time < 10:02 and #db', 'level == ERROR or /a1\\d/'])
+def test_query_mixed(files, tmp_path, query):
+    log = _open(files, tmp_path, merge=True, where=query)
+    assert _raw(log) == _raw(Log(files=files, merge=True, where=query, **LAYOUT))
+
+
+def test_reopen(files, tmp_path):
+    first = _open(files, tmp_path)
+    generation = first.generation
+    assert not first.refresh()
+    assert first.generation == generation
+
+    with files[1].open('a') as handle:
+        handle.write('11:00:00 INFO appended sql\nmore\n')
+    assert first.refresh()
+    assert _raw(first, slice(-1, None)) == ['11:00:00 INFO appended sql\nmore']
+
+    second = _open(files, tmp_path)
+    assert second.count == first.count == 301
+    files[0].write_text('09:00:00 INFO rotated\n')
+    assert second.refresh()
+    assert _raw(second, slice(0, 2)) == ['09:00:00 INFO rotated', '10:00:01 WARN b1 tcp']
+
+    other = DatabaseLog(files=files[:1], db=tmp_path / 'log.db', **LAYOUT)
+    assert other.count == 1
+
+
+def test_tag_ids(files, tmp_path):
+    _open(files, tmp_path)
+    connection = sqlite3.connect(str(tmp_path / 'log.db'))
+    with connection:
+        connection.execute('UPDATE tags SET id = 5 - id')
+        connection.execute('UPDATE entry_tags SET tag = 5 - tag')
+    connection.close()
+
+    log = _open(files, tmp_path)
+    expected = Log(files=files, **LAYOUT)
+    for predicate in [Tag('db'), Not(Tag('net'))]:
+        log.add_filter(predicate)
+        expected.add_filter(predicate)
+        assert _raw(log) == _raw(expected)
+    with files[1].open('a') as handle:
+        handle.write('11:00:00 INFO appended sql\n')
+    assert log.refresh()
+    assert _raw(log, slice(-1, None)) == ['11:00:00 INFO appended sql']
+
+
+def _search(log, pattern):
+    search = Search(log, re.compile(pattern))
+    while search.running:
+        time.sleep(0.001)
+    return [search.next(idx) for idx in range(-1, log.total - 1)]
+
+
+@pytest.mark.parametrize('pattern', [r'[ab]2\d ', r'a12\d ', r'(?i)B15\d', 'sql$', 'missing'])
+@pytest.mark.parametrize('options', [{'where': '#db'}, {'merge': True}])
+def test_search(files, tmp_path, pattern, options):
+    log = _open(files, tmp_path, **options)
+    assert _search(log, pattern) == _search(Log(files=files, **LAYOUT, **options), pattern)
+    assert log.search(re.compile(pattern), 100, 120) == Log(files=files, **LAYOUT, **options).search(
+        re.compile(pattern), 100, 120)
@@ -0,0 +1,107 @@
+import pytest
+import re
+
+from pycolog.encoding import Codec, codec_of
+from pycolog.log import Log
+from pycolog.scanner import compile_entry_start, entry_starts
+from pycolog.tags import TagMatcher
+
+LINE_FORMAT = re.compile(r'^(?P<level>\w+) (?P<message>.*)')
+
+
+@pytest.mark.parametrize('encoding,pattern,converted', [
+    ('utf-8', r'^[0-9]+ [A-Z]+ (?:x|y)', True),
+    ('utf-8', r'^\d+ [A-Z]+', False),
+    ('utf-8', r'(?P<user>\w+)', False),
+    ('utf-8', r'Zo. failed', False),
+    ('utf-8', r'[^ ]+', False),
+    ('utf-8', r'(?i:error)', False),
+    ('utf-8', r'\berror', False),
+    ('utf-8', '^[\xe4\xf6]', False),
+    ('latin-1', '^[\xe4\xf6]', True),
+    ('utf-8', r'^ä', False),
+    ('utf-8', r'caf\xe9', False),
+    ('latin-1', r'caf\xe9', True),
+    ('cp1252', r'caf\xe9', True),
+    ('cp1252', r'caf\x80', False),
+    ('utf-8', r'[\x80-\xff]+', False),
+    ('latin-1', r'[\x80-\xff]+', True),
+    ('latin-1', r'[\x80-\u0100]+', False),
+    ('utf-8', r'[a\xe9]', False),
+])
+def test_to_bytes(encoding, pattern, converted):
+    compiled = Codec(encoding).to_bytes(re.compile(pattern))
+    assert (compiled is not None) == converted
+
+
+@pytest.mark.parametrize('pattern', [r'caf\xe9', r'[\x80-\xff]+'])
+def test_escaped_characters(pattern):
+    matcher = TagMatcher({'cafe': {'pattern': re.compile(pattern)}}, codec=Codec('utf-8'))
+    assert matcher.mask('caf\xe9') == matcher.mask('caf\xe9'.encode('utf-8')) == 1
+    assert matcher.mask(b'caf\xe9') == matcher.mask(b'caf\xe9'.decode('utf-8', 'replace')) == 0
+
+
+def test_unicode_classes(tmp_path):
+    f = tmp_path / 'input.log'
+    f.write_text('INFO J\xfcrgen logged in\nWARN Zo\xeb failed\n', encoding='utf-8')
+    log = Log(files=[f], line_format=re.compile(r'(?P<level>\w+) (?P<user>\w+) (?P<msg>.*)'),
+              columns={'user': 'category'}, tags={'zoe': {'pattern': re.compile('Zo. failed')}},
+              filter={'tags': {'not_contain': ['zoe']}})
+    assert log.total == 1
+    entries = log.get_entries(slice(None))
+    assert [e.user for e in entries] == ['Zo\xeb']
+    assert entries[0].attributes == {'level': 'WARN', 'user': 'Zo\xeb', 'msg': 'failed'}
+    assert log.get_entry(0).tags == {'zoe'}
+
+
+@pytest.mark.parametrize('encoding', ['utf-8', 'latin-1'])
+def test_entry_starts_text(encoding):
+    buffer = '\xe4 1\n x\n\xf6 2\n'.encode(encoding)
+    pattern = compile_entry_start(re.compile(r'\w \d'), Codec(encoding))
+    assert list(entry_starts(buffer, pattern, chunk_size=4)) == [0, len(buffer) - len('\xf6 2\n'.encode(encoding))]
+
+
+def test_not_ascii_compatible():
+    with pytest.raises(ValueError):
+        Codec('utf-16')
+
+
+def test_codec_of():
+    codec = codec_of({'encoding': 'Latin1', 'errors': 'ignore'})
+    assert (codec.encoding, codec.errors) == ('iso8859-1', 'ignore')
+    assert codec.decode(b'\xe4') == '\xe4'
+
+
+@pytest.mark.parametrize('pattern', ['A', '[A\xe4]'])
+def test_entry_starts_invalid_bytes(pattern):
+    buffer = b'A \xff\xfe\n x\nA 2\n'
+    assert list(entry_starts(buffer, compile_entry_start(re.compile(pattern)))) == [0, 8]
+
+
+def test_invalid_bytes(tmp_path):
+    f = tmp_path / 'input.log'
+    f.write_bytes(b'ERROR broken \xff\xfe\nINFO fine\n')
+    log = Log(files=[f], line_format=LINE_FORMAT, columns={'level': 'category'},
+              tags={'broken': {'pattern': re.compile('broken')}})
+    entries = log.get_entries(slice(None))
+    assert [str(e) for e in entries] == ['ERROR broken ��', 'INFO fine']
+    assert [e.level for e in entries] == ['ERROR', 'INFO']
+    assert entries[0].tags == {'broken'}
+
+
+def test_strict(tmp_path):
+    f = tmp_path / 'input.log'
+    f.write_bytes(b'ERROR broken \xff\n')
+    log = Log(files=[f], errors='strict')
+    with pytest.raises(UnicodeDecodeError):
+        str(log.get_entry(0))
+
+
+def test_latin1(tmp_path):
+    f = tmp_path / 'input.log'
+    f.write_bytes('\xc4RGER m\xfcde\nINFO ok\n'.encode('latin-1'))
+    log = Log(files=[f], line_format=re.compile(r'^(?P<level>[A-Z\xc4]+) (?P<message>.*)'), encoding='latin-1',
+              tags={'tired': {'pattern': re.compile('m\xfcde')}}, filter={'tags': {'not_contain': ['tired']}})
+    entry = log.get_entry(0)
+    assert log.total == 1
+    assert (entry.level, entry.message) == ('\xc4RGER', 'm\xfcde')
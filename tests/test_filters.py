@@ -0,0 +1,81 @@
+import re
+
+import pytest
+
+from pycolog import filters
+from pycolog.log import Log
+
+
+@pytest.mark.parametrize('flags', [[], [True], [False, True, True], [1, 0, 0, 1, 0]])
+def test_bitmap_roundtrip(flags):
+    bitmap = filters.to_bitmap(flags)
+    assert list(filters.to_indices(bitmap, len(flags))) == [idx for idx, flag in enumerate(flags) if flag]
+
+
+@pytest.mark.parametrize('text,expected', [
+    ('#error', '#error'),
+    ('!#error', '!#error'),
+    ('/ERR.R/', '/ERR.R/'),
+    ('a.b', '/a\\.b/'),
+])
+def test_parse(text, expected):
+    assert str(filters.parse(text)) == expected
+
+
+@pytest.fixture
+def log(tmp_path):
+    f = tmp_path / 'input.log'
+    f.write_text('ERROR a\nINFO b\nERROR c\nWARN d\n')
+    tags = {'error': {'pattern': re.compile('ERROR')}, 'warn': {'pattern': re.compile('WARN')}}
+    return Log(files=[f], tags=tags)
+
+
+def test_add_remove(log):
+    error = filters.parse('#error')
+    log.add_filter(error)
+    assert [str(e) for e in log.get_entries(slice(None))] == ['ERROR a', 'ERROR c']
+    assert log.filtered == 2
+
+    log.add_filter(filters.parse('/c$/'))
+    assert [str(e) for e in log.get_entries(slice(None))] == ['ERROR c']
+
+    log.remove_filter(error)
+    assert [str(e) for e in log.get_entries(slice(None))] == ['ERROR c']
+    log.remove_filter(log.filters[0])
+    assert log.total == 4
+    assert log.filtered == 0
+
+
+def test_any_not(log):
+    log.add_filter(filters.Not(filters.Any([filters.Tag('error'), filters.Tag('warn')])))
+    assert [str(e) for e in log.get_entries(slice(None))] == ['INFO b']
+
+
+def test_cached_bitmap(log, monkeypatch):
+    predicate = filters.parse('/b/')
+    log.add_filter(predicate)
+    log.remove_filter(predicate)
+
+    monkeypatch.setattr(filters.Pattern, 'flags', lambda *args: pytest.fail('evaluated again'))
+    log.add_filter(predicate)
+    assert log.total == 1
+
+
+def test_refresh_evaluates_appended(tmp_path, monkeypatch):
+    f = tmp_path / 'input.log'
+    f.write_text('ERROR a\nINFO b\n')
+    log = Log(files=[f])
+    log.add_filter(filters.parse('ERROR'))
+    evaluated = []
+    original = filters.Pattern.flags
+
+    def flags(self, log_, log_file, first):
+        evaluated.append(first)
+        return original(self, log_, log_file, first)
+
+    monkeypatch.setattr(filters.Pattern, 'flags', flags)
+    with open(f, 'a') as file_handle:
+        file_handle.write('ERROR c\n')
+    assert log.refresh()
+    assert [str(e) for e in log.get_entries(slice(None))] == ['ERROR a', 'ERROR c']
+    assert evaluated == [1]
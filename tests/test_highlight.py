@@ -0,0 +1,48 @@
+import re
+
+import pytest
+
+from pycolog.highlight import Highlighter
+from pycolog.log_entry import LogEntry
+from pycolog.tags import TagMatcher
+
+MATCHER = TagMatcher({'db': {'pattern': re.compile('sql')}, 'net': {'pattern': re.compile('tcp')}})
+OPTIONS = {'line_format': re.compile(r'(?P<level>\w+) (?P<message>.*)'), 'tag_matcher': MATCHER}
+
+RULES = [
+    {'match': 'field', 'field': 'level', 'is': 'ERROR', 'color': 1},
+    {'match': 'pattern', 'pattern': re.compile(r'timeout \d+'), 'color': 2},
+    {'match': 'tag', 'tag': 'db', 'color': 3},
+    {'match': 'pattern', 'pattern': re.compile('retry'), 'color': 4},
+    {'match': 'field', 'field': 'level', 'is': 'WARN', 'color': 5},
+    {'match': 'pattern', 'pattern': re.compile(r'(a)\1'), 'color': 6},
+]
+
+
+@pytest.mark.parametrize('raw,expected', [
+    ('INFO nothing', 0),
+    ('ERROR timeout 5 sql', 1),
+    ('WARN timeout 5', 2),
+    ('WARN retry sql', 3),
+    ('WARN retry', 4),
+    ('WARN retry timeout 3', 2),
+    ('WARN other', 5),
+    ('INFO aa', 6),
+])
+@pytest.mark.parametrize('rules', [RULES, RULES[:-1] + [{'match': 'pattern', 'pattern': re.compile('aa'), 'color': 6}]],
+                         ids=['separate', 'combined'])
+def test_color(raw, expected, rules):
+    assert Highlighter(rules, MATCHER).color(LogEntry(raw, **OPTIONS)) == expected
+
+
+def test_empty():
+    highlighter = Highlighter([])
+    assert not highlighter
+    assert highlighter.color(LogEntry('ERROR x', **OPTIONS)) == 0
+
+
+def test_tag_memo():
+    highlighter = Highlighter([{'match': 'tag', 'tag': 'net', 'color': 7}], MATCHER)
+    assert highlighter.color(LogEntry('INFO tcp', **OPTIONS)) == 7
+    assert highlighter.color(LogEntry('INFO udp', **OPTIONS)) == 0
+    assert highlighter._tag_ranks == {2: 0, 0: 1}
@@ -0,0 +1,90 @@
+import gzip
+import pickle
+import re
+
+import pytest
+
+from pycolog.index import Index, layout_hash
+from pycolog.log import Log
+
+
+def _options(tmp_path, f, **kwargs):
+    kwargs.update(files=[f], index_dir=tmp_path / 'index',
+                  tags={'error': {'pattern': re.compile('ERROR')}},
+                  filter={'tags': {'contain': ['error']}})
+    return kwargs
+
+
+def test_layout_hash():
+    assert layout_hash({'line_start': re.compile('A')}) == layout_hash({'line_start': re.compile('A')})
+    assert layout_hash({'line_start': re.compile('A')}) != layout_hash({'line_start': re.compile('B')})
+
+
+def test_tag_order(tmp_path):
+    f = tmp_path / 'input.log'
+    f.write_text('INFO a\nERROR b\nWARN c\n')
+    tags = {'error': {'pattern': re.compile('ERROR')}, 'warn': {'pattern': re.compile('WARN')}}
+    swapped = dict(reversed(list(tags.items())))
+    assert layout_hash({'tags': tags}) != layout_hash({'tags': swapped})
+
+    options = {'files': [f], 'index_dir': tmp_path / 'index', 'filter': {'tags': {'contain': ['error']}}}
+    assert [str(e) for e in Log(tags=tags, **options).get_entries(slice(None))] == ['INFO a', 'WARN c']
+    assert [str(e) for e in Log(tags=swapped, **options).get_entries(slice(None))] == ['INFO a', 'WARN c']
+
+
+def test_reuse(tmp_path):
+    f = tmp_path / 'input.log'
+    f.write_text('INFO a\nERROR b\nINFO c\n')
+    assert Log(**_options(tmp_path, f)).total == 2
+    assert len(list((tmp_path / 'index').iterdir())) == 1
+
+    log = Log(**_options(tmp_path, f))
+    assert not log._files[0].modified
+    assert log.total == 2
+    assert [str(e) for e in log.get_entries(slice(None))] == ['INFO a', 'INFO c']
+
+
+def test_appended(tmp_path):
+    f = tmp_path / 'input.log'
+    f.write_text('INFO a\nERROR b\nINFO c')
+    Log(**_options(tmp_path, f))
+
+    with open(f, 'a') as file_handle:
+        file_handle.write(' continued\nINFO d\n')
+
+    log = Log(**_options(tmp_path, f))
+    assert [str(e) for e in log.get_entries(slice(None))] == ['INFO a', 'INFO c continued', 'INFO d']
+
+
+def test_replaced(tmp_path):
+    f = tmp_path / 'input.log'
+    f.write_text('INFO a\nERROR b\nINFO c\n')
+    Log(**_options(tmp_path, f))
+
+    f.write_text('ERROR x\nINFO y\n')
+    log = Log(**_options(tmp_path, f))
+    assert [str(e) for e in log.get_entries(slice(None))] == ['INFO y']
+
+
+def test_restore_missing(tmp_path):
+    f = tmp_path / 'input.log'
+    f.write_text('A')
+    options = _options(tmp_path, f)
+    assert Index(tmp_path / 'index', options).restore(Log(files=[f])._files[0]) is None
+
+
+@pytest.mark.parametrize('content', [
+    b'garbage', b'', pickle.dumps([1, 2]), pickle.dumps({'format': 1}), pickle.dumps('text'),
+    b'cmissing_module\nX\n.',
+])
+def test_corrupt(tmp_path, content):
+    f, g = tmp_path / 'input.log', tmp_path / 'input.log.gz'
+    f.write_text('INFO a\nERROR b\nINFO c\n')
+    g.write_bytes(gzip.compress(b'INFO d\n'))
+    options = dict(_options(tmp_path, f), files=[f, g])
+    Log(**options)
+    for path in (tmp_path / 'index').iterdir():
+        path.write_bytes(content)
+
+    log = Log(**options)
+    assert [str(e) for e in log.get_entries(slice(None))] == ['INFO a', 'INFO c', 'INFO d']
@@ -0,0 +1,74 @@
+import re
+import time
+
+import pytest
+
+from pycolog import loader
+from pycolog.log import Log
+from pycolog.log_file import LogFile
+from tests.conftest import layout, messages
+
+LAYOUT = layout(r'(?P<timestamp>\S+) (?P<message>.*)', tags={'even': {'pattern': re.compile(r'[02468]$')}})
+
+FILES = [''.join(f'10:{idx // 60:02d}:{idx % 60:02d} {name}{idx}\n' for idx in range(offset, 200, 2))
+         for offset, name in enumerate('ab')]
+
+
+@pytest.fixture
+def files(files, monkeypatch):
+    monkeypatch.setattr(loader, 'PART_SIZE', 64)
+    return files
+
+
+def _load(log):
+    totals = []
+    while log.loading:
+        if log.refresh():
+            totals.append(log.total)
+        time.sleep(0.001)
+    return totals
+
+
+@pytest.mark.parametrize('options', [{}, {'merge': True}, {'where': '#even'}, {'merge': True, 'where': '#even'}])
+def test_background(files, options):
+    log = Log(files=files, background=True, **LAYOUT, **options)
+    totals = _load(log)
+    assert totals == sorted(totals)
+    assert log.progress is None
+    assert messages(log) == messages(Log(files=files, **LAYOUT, **options))
+
+
+def test_progress(files):
+    log = Log(files=files, background=True, **LAYOUT)
+    progress = log.progress
+    _load(log)
+    assert progress.done
+    assert progress.scanned_bytes == progress.total_bytes == sum(path.stat().st_size for path in files)
+    assert progress.entries == log.count == 200
+    assert all(rate > 0 for rate in progress.rates())
+
+
+def test_stop(files):
+    log = Log(files=files, background=True, **LAYOUT)
+    log.stop()
+    assert not log.loading
+    assert not log.refresh()
+    assert log.total == 0
+
+
+def test_error(files, monkeypatch):
+    scan_part = LogFile.scan_part
+
+    def failing(log_file, begin, end, columns=()):
+        if begin > 0:
+            raise OSError('read failed')
+        return scan_part(log_file, begin, end, columns)
+
+    monkeypatch.setattr(LogFile, 'scan_part', failing)
+    log = Log(files=files[:1], background=True, **LAYOUT)
+    while not log.progress.done:
+        time.sleep(0.001)
+    with pytest.raises(OSError, match='read failed'):
+        log.refresh()
+    assert not log.loading
+    assert 0 < log.count < 100
@@ -1,9 +1,11 @@
+from datetime import datetime
 import itertools
 
 import pytest
 import re
 
 from pycolog.log import Log
+from pycolog.timestamp import timestamp
 
 
 @pytest.mark.parametrize('order', itertools.permutations(range(3)))
@@ -19,10 +21,10 @@ def test_natural_sort(tmp_path, order):
     files[2].write_text('D')
 
     log = Log(files=[files[i] for i in order])
-    assert log._raw_lines == ['A\n', 'B', 'C', 'D']
+    assert [str(e) for e in log.get_entries(slice(None))] == ['A', 'B', 'C', 'D']
 
 
-@pytest.mark.parametrize('content,expected', [('A', 1), ('A\nB', 2), ('A\nB\n', 2)])
+@pytest.mark.parametrize('content,expected', [('', 0), ('A', 1), ('A\nB', 2), ('A\nB\n', 2)])
 def test_total(tmp_path, content, expected):
     f = tmp_path / 'input.log'
     f.write_text(content)
@@ -38,6 +40,22 @@ def test_total_pattern(tmp_path, content, expected):
     assert Log(files=[f], line_start=re.compile('^A')).total == expected
 
 
+def test_lines_before_first_start(tmp_path):
+    f = tmp_path / 'input.log'
+    f.write_text('header\n  more\nA 1\nA 2\n')
+    log = Log(files=[f], line_start=re.compile('^A'))
+    assert [str(e) for e in log.get_entries(slice(None))] == ['header\n  more', 'A 1', 'A 2']
+
+
+@pytest.mark.parametrize('encoding', ['utf-8', 'latin-1'])
+def test_unicode_whitespace(tmp_path, encoding):
+    f = tmp_path / 'input.log'
+    f.write_bytes('\xa0A 1\xa0\n\x85A \xe4\n'.encode(encoding))
+    log = Log(files=[f], encoding=encoding, line_format=re.compile(r'A (?P<id>\S+)'))
+    assert [str(e) for e in log.get_entries(slice(None))] == ['A 1', 'A \xe4']
+    assert [e.attributes['id'] for e in log.get_entries(slice(None))] == ['1', '\xe4']
+
+
 def test_get_entries(tmp_path):
     f = tmp_path / 'input.log'
     f.write_text('''not
@@ -55,3 +73,129 @@ def test_get_entry(tmp_path):
     file''')
 
     assert str(Log(files=[f]).get_entry(2)) == 'log'
+
+
+def test_get_entry_out_of_range(tmp_path):
+    f = tmp_path / 'input.log'
+    f.write_text('A\nB')
+
+    with pytest.raises(IndexError):
+        Log(files=[f]).get_entry(2)
+
+
+def test_filter(tmp_path):
+    f = tmp_path / 'input.log'
+    f.write_text('INFO a\nERROR b\nINFO c\nERROR d')
+
+    log = Log(files=[f],
+              tags={'error': {'pattern': re.compile('ERROR')}},
+              filter={'tags': {'contain': ['error']}})
+    assert log.total == 2
+    assert log.filtered == 2
+    assert [str(e) for e in log.get_entries(slice(0, 2))] == ['INFO a', 'INFO c']
+
+
+def test_entry_cache(tmp_path):
+    f = tmp_path / 'input.log'
+    f.write_text('A\nB\nC')
+
+    log = Log(files=[f], cache_size=2)
+    first = log.get_entry(0)
+    assert log.get_entry(0) is first
+
+    log.get_entries(slice(1, 3))
+    assert log.get_entry(0) is not first
+
+
+def test_refresh_appended(tmp_path):
+    f = tmp_path / 'input.log'
+    f.write_text('A 1\n  trace')
+
+    log = Log(files=[f], line_start=re.compile('A'))
+    assert not log.refresh()
+
+    with open(f, 'a') as file_handle:
+        file_handle.write(' continued\nA 2\n')
+
+    assert log.refresh()
+    assert log.total == 2
+    assert [str(e) for e in log.get_entries(slice(None))] == ['A 1\n  trace continued', 'A 2']
+
+
+def test_refresh_filtered(tmp_path):
+    f = tmp_path / 'input.log'
+    f.write_text('INFO a\nERROR b\n')
+
+    log = Log(files=[f], tags={'error': {'pattern': re.compile('ERROR')}}, filter={'tags': {'contain': ['error']}})
+    with open(f, 'a') as file_handle:
+        file_handle.write('INFO c\nERROR d\n')
+
+    assert log.refresh()
+    assert log.total == 2
+    assert log.filtered == 2
+    assert [str(e) for e in log.get_entries(slice(None))] == ['INFO a', 'INFO c']
+
+
+def test_refresh_rotated(tmp_path):
+    f = tmp_path / 'input.log'
+    f.write_text('A\nB\nC\n')
+    log = Log(files=[f])
+
+    f.unlink()
+    f.write_text('D\n')
+    assert log.refresh()
+    assert [str(e) for e in log.get_entries(slice(None))] == ['D']
+
+
+def _timed_log(tmp_path, **kwargs):
+    f = tmp_path / 'input.log'
+    f.write_text(''.join(f'2020-07-02 12:{minute:02d} entry {minute}\n  trace {minute}\n' for minute in range(60)))
+    kwargs.update(files=[f], line_start=re.compile(r'\d{4}-'),
+                  line_format=re.compile(r'^(?P<timestamp>\S+ \S+)'),
+                  fields={'timestamp': {'callback': timestamp, 'argument': 'date_string',
+                                        'kwargs': {'format': '%Y-%m-%d %H:%M'}}})
+    return Log(**kwargs)
+
+
+@pytest.mark.parametrize('columns', [{}, {'timestamp': 'time'}])
+def test_since_until(tmp_path, columns):
+    log = _timed_log(tmp_path, columns=columns,
+                     since=datetime(2020, 7, 2, 12, 10, 30), until=datetime(2020, 7, 2, 12, 20))
+    assert log.total == 10
+    assert str(log.get_entry(0)) == '2020-07-02 12:11 entry 11\n  trace 11'
+    assert str(log.get_entry(-1)) == '2020-07-02 12:20 entry 20\n  trace 20'
+
+
+def test_since_after_end(tmp_path):
+    assert _timed_log(tmp_path, since=datetime(2020, 7, 3)).total == 0
+
+
+def test_until_refresh(tmp_path):
+    f = tmp_path / 'input.log'
+    f.write_text(''.join(f'2020-07-02 12:{minute:02d} entry {minute}\n' for minute in range(10)))
+    log = Log(files=[f], line_start=re.compile(r'\d{4}-'), line_format=re.compile(r'^(?P<timestamp>\S+ \S+)'),
+              fields={'timestamp': {'callback': timestamp, 'argument': 'date_string',
+                                    'kwargs': {'format': '%Y-%m-%d %H:%M'}}},
+              until=datetime(2020, 7, 2, 12, 20))
+    assert log.total == 10
+    with f.open('a') as handle:
+        handle.write(''.join(f'2020-07-02 12:{minute:02d} entry {minute}\n' for minute in range(10, 30)))
+    assert log.refresh()
+    assert log.total == 21
+    assert str(log.get_entry(-1)) == '2020-07-02 12:20 entry 20'
+
+
+@pytest.mark.parametrize('bounds', [{'since': datetime(2020, 7, 2, 12, 10)}, {'until': datetime(2020, 7, 2, 12, 20)}])
+def test_since_without_callback(tmp_path, bounds):
+    f = tmp_path / 'input.log'
+    f.write_text('2020-07-02 12:00 entry\n2020-07-02 12:30 entry\n')
+    with pytest.raises(ValueError, match='time field timestamp .* needs a timestamp callback'):
+        Log(files=[f], line_format=re.compile(r'^(?P<timestamp>\S+ \S+)'), **bounds)
+
+
+def test_find_time(tmp_path):
+    log = _timed_log(tmp_path)
+    assert log.find_time(datetime(2020, 7, 2, 12, 30)) == 30
+    assert log.find_time(datetime(2020, 7, 2, 12, 30, 1)) == 31
+    assert log.find_time(datetime(2020, 7, 2, 11)) == 0
+    assert log.find_time(datetime(2020, 7, 2, 13)) == 60
@@ -1,7 +1,8 @@
 import pytest
 import re
 
-from pycolog.log_entry import LogEntry
+from pycolog import log_entry
+from pycolog.log_entry import EntryLayout, LogEntry
 
 
 @pytest.mark.parametrize('chars,expected', [
@@ -54,3 +55,56 @@ def test_formatted_field_additional_args():
         }
     )
     assert subject.a == 'eaa'
+
+
+def test_lazy_fields():
+    calls = []
+    subject = LogEntry(
+        'Space separated log line',
+        line_format=re.compile(r'^(?P<a>\w+)'),
+        fields={'a': {'callback': lambda s: calls.append(s) or s, 'argument': 's'}}
+    )
+    assert not calls
+
+    assert subject.a == 'Space'
+    assert subject.a == 'Space'
+    assert calls == ['Space']
+
+
+def test_lazy_tags():
+    subject = LogEntry('An ERROR line', tags={'error': {'pattern': re.compile('ERROR')}})
+    assert subject._tag_mask is None
+    assert subject.tags == {'error'}
+
+
+def test_unknown_field():
+    assert LogEntry('ShortLine').unknown is None
+
+
+def test_shared_layout():
+    layout = EntryLayout({'line_format': re.compile(r'^(?P<level>\w+) (?P<message>.*)')})
+    first = LogEntry('ERROR first', entry_layout=layout)
+    second = LogEntry(' '.join(['ERROR', 'second']), entry_layout=layout)
+    assert first.level is second.level
+    assert first.message == 'first'
+
+
+def test_plugin_attributes():
+    entry = LogEntry('ERROR first', line_format=re.compile(r'^(?P<level>\w+) (?P<message>.*)'))
+    assert entry.color is None
+    entry.color = 'red'
+    assert entry.color == 'red'
+    assert entry.level == 'ERROR'
+    assert entry['color'] is None
+
+
+def test_intern_limit(monkeypatch):
+    monkeypatch.setattr(log_entry, 'INTERN_LIMIT', 2)
+    layout = EntryLayout({})
+    values = [''.join(['value', str(idx)]) for idx in range(3)]
+    assert [layout.intern('a', value) for value in values[:2]] == values[:2]
+    assert layout.intern('a', ''.join(['value', '0'])) is values[0]
+
+    assert layout.intern('a', values[2]) is values[2]
+    assert layout.intern('a', ''.join(['value', '0'])) is not values[0]
+    assert layout.intern('b', 1) == 1
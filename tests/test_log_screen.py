@@ -0,0 +1,34 @@
+import re
+import time
+
+from benchmarks.fake_curses import fake_curses
+from pycolog import loader
+from pycolog.log import Log
+from pycolog.log_file import LogFile
+from pycolog.screens.log_screen import LogScreen
+
+
+def test_load_error(tmp_path, monkeypatch):
+    monkeypatch.setattr(loader, 'PART_SIZE', 16)
+    scan_part = LogFile.scan_part
+
+    def failing(log_file, begin, end, columns=()):
+        if begin > 0:
+            raise OSError('read failed')
+        return scan_part(log_file, begin, end, columns)
+
+    monkeypatch.setattr(LogFile, 'scan_part', failing)
+    f = tmp_path / 'input.log'
+    f.write_text(''.join(f'INFO message {idx}\n' for idx in range(20)))
+    with fake_curses():
+        log = Log(files=[f], background=True, line_start=re.compile('INFO'))
+        screen = LogScreen(log, follow=True)
+        screen._first_page()
+        while not log.progress.done:
+            time.sleep(0.001)
+        screen._poll()
+        assert screen._error == 'read failed'
+        assert not log.loading
+        assert 0 < log.total < 20
+        screen._poll()
+        screen._print_status()
@@ -0,0 +1,91 @@
+from datetime import datetime
+import re
+
+import pytest
+
+from pycolog.log import Log
+from pycolog.merge import MergeIndex
+from pycolog.search import Search
+from tests.conftest import layout, messages
+
+LAYOUT = layout(r'(?P<timestamp>\S+) (?P<message>.*)')
+
+FILES = ['10:00:00 a1\n10:00:02 a2\ncontinued\n10:00:05 a3\n', '10:00:01 b1\n10:00:02 b2\n10:00:09 b3\n', '']
+
+
+def test_merge(files):
+    log = Log(files=files, merge=True, **LAYOUT)
+    assert log.total == 6
+    assert messages(log) == ['a1', 'b1', 'a2', 'b2', 'a3', 'b3']
+    assert [log.source(idx) for idx in range(3)] == [str(files[0]), str(files[1]), str(files[0])]
+
+
+def test_lazy(files):
+    log = Log(files=files, merge=True, **LAYOUT)
+    assert str(log.get_entry(1)) == '10:00:01 b1'
+    assert len(log._merge.order) == 2
+    assert log.find_time(datetime(1900, 1, 1, 10, 0, 2)) == 2
+    assert len(log._merge.order) == 3
+
+
+def test_merge_filtered(files):
+    log = Log(files=files, merge=True, where='message ~ /[23]/', **LAYOUT)
+    assert messages(log) == ['a2', 'b2', 'a3', 'b3']
+
+
+def test_refresh(files):
+    log = Log(files=files, merge=True, **LAYOUT)
+    assert log.total == 6
+    with open(files[0], 'a') as file_handle:
+        file_handle.write('10:00:07 a4\n')
+    with open(files[2], 'a') as file_handle:
+        file_handle.write('10:00:03 c1\n')
+    assert log.refresh()
+    assert messages(log) == ['a1', 'b1', 'a2', 'b2', 'c1', 'a3', 'a4', 'b3']
+
+
+def test_missing_time(tmp_path):
+    a, b = tmp_path / 'a.log', tmp_path / 'b.log'
+    a.write_text('header\n10:00:03 a1\n')
+    b.write_text('10:00:01 b1\n')
+    log = Log(files=[a, b], merge=True, **LAYOUT)
+    assert [str(e) for e in log.get_entries(slice(None))] == ['header', '10:00:01 b1', '10:00:03 a1']
+
+
+@pytest.mark.parametrize('options', [{}, {'background': True}])
+def test_time_without_callback(files, options):
+    without_callback = dict(LAYOUT, fields={})
+    with pytest.raises(ValueError, match='time field timestamp .* needs a timestamp callback'):
+        log = Log(files=files, merge=True, **without_callback, **options)
+        while log.loading:
+            log.refresh()
+
+
+def test_concurrent_search(tmp_path):
+    paths = [tmp_path / f'{name}.log' for name in 'ab']
+    for offset, path in enumerate(paths):
+        path.write_text(''.join(f'10:{idx // 60 % 60:02d}:{idx % 60:02d} {path.stem}{idx}\n'
+                                for idx in range(offset, 6000, 2)))
+    expected = Log(files=paths, merge=True, **LAYOUT).search(re.compile('a1'), 0, 6000)
+    for _ in range(5):
+        log = Log(files=paths, merge=True, **LAYOUT)
+        search = Search(log, re.compile('a1'))
+        position = 0
+        while search.running:
+            log.get_entries(slice(position, position + 50))
+            position = (position + 97) % 6000
+        assert search.count == len(expected)
+
+
+def test_merge_index_slice():
+    class File:
+        def __init__(self, times):
+            self.times = times
+
+        def time(self, idx):
+            return self.times[idx]
+
+    index = MergeIndex([File([1, 4, 5]), File([2, 3, 6])], [range(3), range(3)])
+    assert index[1:4] == [(1, 0), (1, 1), (0, 1)]
+    assert index[-1] == (1, 2)
+    assert index.find(4) == 3
@@ -0,0 +1,33 @@
+import re
+
+from pycolog import parallel
+from pycolog.log import Log
+
+
+def _write(path, count):
+    with open(path, 'w') as file_handle:
+        for i in range(count):
+            file_handle.write(f'{"ERROR" if i % 3 else "INFO"} entry {i}\n  continued {i}\n')
+
+
+def _options(files, **kwargs):
+    kwargs.update(files=files, line_start=re.compile(r'[A-Z]+ '),
+                  line_format=re.compile(r'^(?P<level>[A-Z]+) '), columns={'level': 'category'},
+                  tags={'error': {'pattern': re.compile('ERROR')}},
+                  filter={'tags': {'contain': ['error']}})
+    return kwargs
+
+
+def test_parallel_scan(tmp_path, monkeypatch):
+    monkeypatch.setattr(parallel, 'PART_SIZE', 100)
+    files = [tmp_path / f'file_{i}.log' for i in range(3)]
+    for count, path in enumerate(files, start=20):
+        _write(path, count)
+
+    expected = Log(**_options(files))
+    log = Log(**_options(files, jobs=2))
+    assert log.total == expected.total
+    assert [f.starts for f in log._files] == [f.starts for f in expected._files]
+    assert [f.columns['tags'].data for f in log._files] == [f.columns['tags'].data for f in expected._files]
+    assert [str(e) for e in log.get_entries(slice(None))] == [str(e) for e in expected.get_entries(slice(None))]
+    assert [e.level for e in log.get_entries(slice(None))] == [e.level for e in expected.get_entries(slice(None))]
@@ -0,0 +1,61 @@
+import types
+
+from pycolog import plugins
+from pycolog.log import Log
+from pycolog.log_entry import LogEntry
+
+
+def _plugin(**hooks):
+    return types.SimpleNamespace(__name__='plugin', **hooks)
+
+
+def test_resolve():
+    calls = []
+    single = _plugin(post_construct=lambda entry, options: calls.append(('single', str(entry))))
+    batch = _plugin(post_construct_batch=lambda entries, options: calls.append(('batch', [str(e) for e in entries])))
+    options = {'plugins': [single, batch, _plugin()]}
+    plugins.mount(options)
+    assert len(options['hooks']['post_construct']) == 2
+
+    plugins.post_construct_batch([LogEntry('A', **options), LogEntry('B', **options)], options)
+    assert calls == [('single', 'A'), ('single', 'B'), ('batch', ['A', 'B'])]
+
+    calls.clear()
+    plugins.post_construct(LogEntry('C', **options), options)
+    assert calls == [('single', 'C'), ('batch', ['C'])]
+
+
+def _interpreter():
+    batches = []
+
+    def post_construct_batch(entries, options):
+        batches.append(len(entries))
+        for entry in entries:
+            entry.interpreted = str(entry).lower()
+    return _plugin(post_construct_batch=post_construct_batch), batches
+
+
+def test_batch_once():
+    plugin, batches = _interpreter()
+    options = {'plugins': [plugin]}
+    plugins.mount(options)
+    entries = [LogEntry('A', **options), LogEntry('B', **options)]
+    plugins.post_construct_batch(entries, options)
+    plugins.post_construct_batch(entries, options)
+    assert batches == [2]
+    assert [e.interpreted for e in entries] == ['a', 'b']
+
+
+def test_log_batches_shown_entries(tmp_path):
+    f = tmp_path / 'input.log'
+    f.write_text('A\nB\nC\nD\n')
+    plugin, batches = _interpreter()
+    options = {'plugins': [plugin]}
+    plugins.mount(options)
+    log = Log(files=[f], **options)
+    assert batches == []
+
+    assert [e.interpreted for e in log.get_entries(slice(1, 3))] == ['b', 'c']
+    assert batches == [2]
+    assert log.get_entry(3).interpreted == 'd'
+    assert batches == [2, 1]
@@ -0,0 +1,108 @@
+from datetime import datetime
+import re
+
+import pytest
+
+from pycolog.log import Log
+from pycolog.log_file import LogFile
+from pycolog.query import Query
+from tests.conftest import timestamp_field
+
+CONTENT = '''2020-07-02 11:59:58 ERROR worker-1 failed
+2020-07-02 12:00:00 INFO main started
+2020-07-02 12:00:01 WARN worker-2 slow
+2020-07-02 12:30:00 DEBUG worker-3 size=12
+2020-07-02 13:00:00 ERROR main stopped
+'''
+
+LAYOUT = {
+    'line_format': re.compile(r'(?P<timestamp>\S+ \S+) (?P<level>\S+) (?P<thread>\S+) (?P<message>.*)'),
+    'fields': {
+        'timestamp': timestamp_field('%Y-%m-%d %H:%M:%S'),
+    },
+    'tags': {'main': {'pattern': re.compile('main')}},
+}
+
+
+@pytest.fixture(params=[{}, {'level': 'category', 'timestamp': 'time'}], ids=['rows', 'columns'])
+def log_file(tmp_path, request):
+    f = tmp_path / 'input.log'
+    f.write_text(CONTENT)
+    return lambda where: Log(files=[f], where=where, columns=request.param, **LAYOUT)
+
+
+@pytest.mark.parametrize('where,expected', [
+    ('level == ERROR', [0, 4]),
+    ('level != ERROR', [1, 2, 3]),
+    ('level in (ERROR, WARN)', [0, 2, 4]),
+    ('level not in (ERROR, WARN)', [1, 3]),
+    ('thread ~ /worker-\\d+/ and level in (ERROR,WARN)', [0, 2]),
+    ('thread !~ /worker/', [1, 4]),
+    ('time >= 12:00', [1, 2, 3, 4]),
+    ('time >= 12:00 and time < "2020-07-02 12:30"', [1, 2]),
+    ('not (level = INFO or #main)', [0, 2, 3]),
+    ('#main and level = ERROR', [4]),
+    ('/size=\\d+/', [3]),
+    ('unknown == value', []),
+    ('unknown != value', [0, 1, 2, 3, 4]),
+])
+def test_query(log_file, where, expected):
+    log = log_file(where)
+    assert [str(e) for e in log.get_entries(slice(None))] == [CONTENT.splitlines()[idx] for idx in expected]
+
+
+@pytest.mark.parametrize('where', ['', 'level ==', 'level in (A', 'level ? 1', '(level = A', 'level ~ /(/', 'a = b c'])
+def test_invalid(where):
+    with pytest.raises(ValueError):
+        Query(where, {})
+
+
+def _number(text):
+    return int(text) if text.isdigit() else text
+
+
+def test_numbers(tmp_path):
+    f = tmp_path / 'input.log'
+    f.write_text('size=9\nsize=10\n')
+    log = Log(files=[f], where='size > 9', line_format=re.compile(r'size=(?P<size>\S+)'),
+              fields={'size': {'callback': _number, 'argument': 'text'}})
+    assert [str(e) for e in log.get_entries(slice(None))] == ['size=10']
+
+
+def _berlin(text):
+    zoneinfo = pytest.importorskip('zoneinfo')
+    return datetime.strptime(text, '%Y-%m-%d %H:%M').replace(tzinfo=zoneinfo.ZoneInfo('Europe/Berlin'))
+
+
+@pytest.mark.parametrize('columns', [{}, {'timestamp': 'time'}])
+def test_time_of_day_zone(tmp_path, columns):
+    f = tmp_path / 'input.log'
+    f.write_text('2020-01-02 12:00 winter\n2020-07-02 12:00 summer\n2020-07-02 13:00 later\n')
+    log = Log(files=[f], where='time <= 12:00', columns=columns, line_format=re.compile(r'(?P<timestamp>\S+ \S+)'),
+              fields={'timestamp': {'callback': _berlin, 'argument': 'text'}})
+    assert [str(e) for e in log.get_entries(slice(None))] == ['2020-01-02 12:00 winter', '2020-07-02 12:00 summer']
+
+
+def test_columns_without_entries(tmp_path, monkeypatch):
+    f = tmp_path / 'input.log'
+    f.write_text(CONTENT)
+    log = Log(files=[f], columns={'level': 'category'}, **LAYOUT)
+
+    monkeypatch.setattr(LogFile, 'entry', lambda *args: pytest.fail('entry created'))
+    log.add_filter(Query('level in (WARN, DEBUG) or #main', log.options))
+    assert log.total == 4
+
+
+@pytest.mark.parametrize('columns', [{}, {'level': 'category', 'timestamp': 'time'}])
+@pytest.mark.parametrize('where', [
+    'level in (ERROR, WARN) and not #main',
+    'not (level = INFO or #main)',
+    '/size/ or #main',
+])
+def test_matches(tmp_path, columns, where):
+    f = tmp_path / 'input.log'
+    f.write_text(CONTENT)
+    log = Log(files=[f], where=where, columns=columns, **LAYOUT)
+    query = Query(where, log.options)
+    assert [line for line in CONTENT.splitlines() if query.matches(line)] == \
+        [str(e) for e in log.get_entries(slice(None))]
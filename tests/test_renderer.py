@@ -0,0 +1,100 @@
+import curses
+
+import pytest
+
+from pycolog.screens.renderer import Renderer
+
+
+class Window:
+    def __init__(self, rows):
+        self.lines = [''] * rows
+        self.writes = []
+        self.scrolled = []
+        self._y = 0
+
+    def move(self, y_pos, _):
+        self._y = y_pos
+
+    def clrtoeol(self):
+        self.lines[self._y] = ''
+
+    def addnstr(self, y_pos, _, text, length, color):
+        self.lines[y_pos] = text[:length]
+        self.writes.append(y_pos)
+
+    def scroll(self, delta):
+        self.scrolled.append(delta)
+        if delta > 0:
+            self.lines = self.lines[delta:] + [''] * delta
+        else:
+            self.lines = [''] * -delta + self.lines[:delta]
+
+    def noutrefresh(self):
+        pass
+
+    def idlok(self, flag):
+        pass
+
+    def scrollok(self, flag):
+        pass
+
+    def setscrreg(self, top, bottom):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def terminal(monkeypatch):
+    monkeypatch.setattr(curses, 'COLS', 80, raising=False)
+    monkeypatch.setattr(curses, 'color_pair', lambda color: color)
+
+
+@pytest.fixture
+def rendered():
+    return []
+
+
+@pytest.fixture
+def renderer(rendered):
+    def render(position):
+        rendered.append(position)
+        return f'line {position}', 0
+    return Renderer(Window(5), render)
+
+
+def test_draw_once(renderer, rendered):
+    renderer.draw(0, 5, 5)
+    renderer._window.writes.clear()
+    renderer.draw(0, 5, 5)
+    assert renderer._window.writes == []
+    assert rendered == [0, 1, 2, 3, 4]
+
+
+@pytest.mark.parametrize('top', [1, 3, -2])
+def test_scroll(renderer, rendered, top):
+    renderer.draw(2, 5, 5)
+    renderer._window.writes.clear()
+    renderer.draw(2 + top, 5, 5)
+    assert renderer._window.scrolled == [top]
+    assert len(renderer._window.writes) == abs(top)
+    assert renderer._window.lines == [f'line {position}' for position in range(2 + top, 7 + top)]
+
+
+def test_page(renderer):
+    renderer.draw(0, 5, 5)
+    renderer.draw(5, 3, 5)
+    assert renderer._window.scrolled == []
+    assert renderer._window.lines == ['line 5', 'line 6', 'line 7', '', '']
+
+
+def test_key(renderer, rendered):
+    renderer.draw(0, 2, 5, key=1)
+    renderer.draw(0, 2, 5, key=2)
+    assert rendered == [0, 1, 0, 1]
+
+
+def test_invalidate(renderer):
+    renderer.draw(0, 5, 5)
+    renderer.invalidate()
+    renderer._window.writes.clear()
+    renderer.draw(0, 5, 5)
+    assert renderer._window.writes == [0, 1, 2, 3, 4]
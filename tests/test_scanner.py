@@ -0,0 +1,28 @@
+import pytest
+import re
+
+from pycolog.scanner import compile_entry_start, entry_starts
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 7, 1024])
+def test_entry_starts(chunk_size):
+    buffer = b'A 1\n  trace\nA 2\nB\nA 3\n'
+    pattern = compile_entry_start(re.compile('A'))
+    assert list(entry_starts(buffer, pattern, chunk_size=chunk_size)) == [0, 12, 18]
+
+
+@pytest.mark.parametrize('chunk_size', [2, 1024])
+def test_entry_starts_multibyte(chunk_size):
+    buffer = 'A \xe4\xf6\xfc\n€\nA x'.encode()
+    pattern = compile_entry_start(re.compile('A'))
+    assert list(entry_starts(buffer, pattern, chunk_size=chunk_size)) == [0, len(buffer) - 3]
+
+
+def test_entry_starts_every_line():
+    pattern = compile_entry_start(re.compile('^'))
+    assert list(entry_starts(b'A\nB\n', pattern)) == [0, 2]
+
+
+def test_entry_starts_range():
+    pattern = compile_entry_start(re.compile('^'))
+    assert list(entry_starts(b'A\nB\nC\nD\n', pattern, begin=2, end=6)) == [2, 4]
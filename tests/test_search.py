@@ -0,0 +1,71 @@
+import re
+
+import pytest
+
+from pycolog import search as search_module
+from pycolog.filters import parse
+from pycolog.log import Log
+from pycolog.search import Search, Searches
+
+
+@pytest.fixture
+def log(tmp_path):
+    f = tmp_path / 'input.log'
+    f.write_text(''.join(f'{"ERROR" if idx % 10 == 3 else "INFO"} message {idx}\n' for idx in range(100)))
+    return Log(files=[f])
+
+
+def _finish(search):
+    search.stop()
+    search.resume()
+    search._thread.join()
+    return search
+
+
+@pytest.mark.parametrize('origin', [0, 50, 100])
+def test_matches(log, origin):
+    search = _finish(Search(log, re.compile('ERROR'), origin=origin))
+    assert search.done
+    assert search.count == 10
+    assert search.next(0) == 3
+    assert search.next(3) == 13
+    assert search.next(93) == 3
+    assert search.previous(13) == 3
+    assert search.previous(3) == 93
+
+
+def test_no_match(log):
+    search = _finish(Search(log, re.compile('FATAL')))
+    assert search.count == 0
+    assert search.next(0) is None
+    assert search.previous(0) is None
+
+
+def test_stop_resume(log, monkeypatch):
+    monkeypatch.setattr(search_module, 'CHUNK_SIZE', 7)
+    search = Search(log, re.compile('ERROR'), origin=20)
+    search.stop()
+    assert search.scanned <= 100
+    search.resume()
+    search._thread.join()
+    assert search.done
+    assert search.next(93) == 3
+
+
+def test_interpreted(log, monkeypatch):
+    monkeypatch.setattr(log, 'text', lambda idx, interpreted: f'{idx}{"!" if interpreted else ""}')
+    assert _finish(Search(log, re.compile('!'))).count == 0
+    assert _finish(Search(log, re.compile('!'), interpreted=True)).count == 100
+
+
+def test_cache(log):
+    searches = Searches(log)
+    first = _finish(searches.start(re.compile('ERROR')))
+    assert searches.start(re.compile('ERROR')) is first
+
+    log.add_filter(parse('ERROR'))
+    searches.resume()
+    second = _finish(searches.current)
+    assert second is not first
+    assert second.count == 10
+    assert second.next(0) == 1
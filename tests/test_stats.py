@@ -0,0 +1,66 @@
+import re
+import types
+
+from pycolog import plugins
+from pycolog.log import Log
+from pycolog.stats import ENTRY, FIELD, LOAD, PLUGIN, TAG, Stats, timer
+
+
+def _number(value):
+    return int(value)
+
+
+def test_stats():
+    stats = Stats()
+    stats.add(LOAD, 'open', 0.5)
+    stats.add(LOAD, 'open', 0.25, count=2)
+    with stats.timer(LOAD, 'scan'):
+        pass
+    assert stats.get(LOAD, 'open') == (3, 0.75)
+    assert stats.get(LOAD, 'scan')[0] == 1
+    assert stats.get(LOAD, 'missing') == (0, 0.0)
+    assert [row[1] for row in stats.rows()] == ['open', 'scan']
+
+    timed = stats.timed(FIELD, 'double', lambda value: 2 * value)
+    assert timed(3) == 6
+    assert stats.get(FIELD, 'double')[0] == 1
+
+    report = stats.report().splitlines()
+    assert len(report) == 4
+    assert report[1].split()[:3] == ['field', 'double', '1']
+
+
+def test_timer_without_stats():
+    with timer({}, LOAD, 'open'):
+        pass
+
+
+def test_log(tmp_path):
+    path = tmp_path / 'input.log'
+    path.write_text('1 sql select\n2 tcp connect\n3 sql insert\n')
+
+    calls = []
+    plugin = types.SimpleNamespace(__name__='counter', post_construct=lambda entry, options: calls.append(entry))
+    stats = Stats()
+    options = {
+        'files': [path],
+        'stats': stats,
+        'line_format': re.compile(r'(?P<number>\d+) (?P<message>.*)'),
+        'fields': {'number': {'callback': _number, 'argument': 'value'}},
+        'tags': {'db': {'pattern': re.compile('sql')}, 'net': {'pattern': re.compile('tcp')}},
+        'filter': {'tags': {'contain': ['net']}},
+        'plugins': [plugin],
+    }
+    plugins.mount(options)
+    log = Log(**options)
+    assert [entry['number'] for entry in log.get_entries(slice(None))] == [1, 3]
+
+    assert stats.get(LOAD, 'total')[0] == 1
+    assert stats.get(LOAD, 'find entries')[0] == 1
+    assert stats.get(TAG, '(prefilter)')[0] == 3
+    assert stats.get(TAG, 'db')[0] == 2
+    assert stats.get(TAG, 'net')[0] == 1
+    assert stats.get(ENTRY, 'line_format')[0] == 2
+    assert stats.get(FIELD, 'number')[0] == 2
+    assert stats.get(PLUGIN, 'counter.post_construct_batch')[0] == 1
+    assert len(calls) == 2
@@ -0,0 +1,73 @@
+import io
+import json
+import re
+
+import pytest
+
+from pycolog import stream
+from tests.conftest import layout
+
+LAYOUT = layout(r'(?P<timestamp>\S+) (?P<level>\S+) (?P<message>.*)', tags={'db': {'pattern': re.compile('sql')}})
+
+FILES = ['10:00:00 INFO a1\n10:00:02 ERROR a2 sql\ncontinued\n10:00:05 INFO a3\n',
+         '10:00:01 ERROR b1\n10:00:03 INFO b2 sql\n']
+
+
+def _write(**options):
+    output = io.StringIO()
+    stream.write(output, dict(LAYOUT, **options))
+    return output.getvalue().splitlines()
+
+
+def test_text(files):
+    assert stream.write(io.StringIO(), dict(LAYOUT, files=files)) == 5
+    assert _write(files=files) == [
+        '10:00:00 INFO a1', '10:00:02 ERROR a2 sql', 'continued', '10:00:05 INFO a3',
+        '10:00:01 ERROR b1', '10:00:03 INFO b2 sql',
+    ]
+
+
+def test_filters(files):
+    assert _write(files=files, where='level == ERROR') == ['10:00:02 ERROR a2 sql', 'continued', '10:00:01 ERROR b1']
+    assert _write(files=files, filter={'tags': {'not_contain': ['db']}}, where='level == INFO') == [
+        '10:00:03 INFO b2 sql',
+    ]
+
+
+def test_merge(files):
+    lines = _write(files=files, merge=True, where='not #db')
+    assert lines == ['10:00:00 INFO a1', '10:00:01 ERROR b1', '10:00:05 INFO a3']
+
+    with pytest.raises(ValueError, match='needs a timestamp callback'):
+        _write(files=files, merge=True, fields={})
+
+
+def test_json(files):
+    objects = [json.loads(line) for line in _write(files=files[:1], format='json')]
+    assert [obj['fields']['message'] for obj in objects] == ['a1', 'a2 sql', 'a3']
+    assert objects[1]['tags'] == ['db']
+    assert objects[1]['raw'] == '10:00:02 ERROR a2 sql\ncontinued'
+    assert objects[0]['fields']['timestamp'] == '1900-01-01T10:00:00'
+    assert objects[0]['source'] == str(files[0])
+
+
+def test_windows(files, monkeypatch):
+    monkeypatch.setattr(stream, 'WINDOW_SIZE', 8)
+    monkeypatch.setattr(stream, 'BATCH_SIZE', 1)
+    expected = ['10:00:00 INFO a1', '10:00:05 INFO a3', '10:00:03 INFO b2 sql']
+    assert _write(files=files, where='level == INFO') == expected
+
+
+def test_plugins(files):
+    class Plugin:
+        __name__ = 'upper'
+        batches = []
+
+        @classmethod
+        def post_construct_batch(cls, entries, options):
+            cls.batches.append(len(entries))
+            for entry in entries:
+                entry.interpreted = entry.raw.upper()
+
+    assert _write(files=files[1:], plugins=[Plugin]) == ['10:00:01 ERROR B1', '10:00:03 INFO B2 SQL']
+    assert Plugin.batches == [2]
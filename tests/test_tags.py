@@ -0,0 +1,47 @@
+import pytest
+import re
+
+from pycolog.tags import TagMatcher, required_literal
+
+
+@pytest.mark.parametrize('pattern,expected', [
+    ('ERROR', 'ERROR'),
+    (r'Exception: (?P<type>\w+)', 'Exception: '),
+    (r'\[(?P<level>WARN)\]', 'WARN'),
+    ('(?:foo)?bar', 'bar'),
+    ('ERROR|WARN', None),
+    ('(?i)error', None),
+])
+def test_required_literal(pattern, expected):
+    assert required_literal(re.compile(pattern)) == expected
+
+
+@pytest.fixture
+def matcher():
+    return TagMatcher({
+        'error': {'pattern': re.compile('ERROR')},
+        'warning': {'pattern': re.compile('WARN|WARNING')},
+        'db': {'pattern': re.compile(r'component=(?P<name>\w+)'), 'where': {'name': {'in': ['db', 'sql']}}},
+    })
+
+
+@pytest.mark.parametrize('raw,expected', [
+    ('INFO all good', set()),
+    ('ERROR failed', {'error'}),
+    ('WARN slow', {'warning'}),
+    ('ERROR component=sql', {'error', 'db'}),
+    ('ERROR component=web', {'error'}),
+])
+def test_mask(matcher, raw, expected):
+    assert matcher.names_of(matcher.mask(raw)) == expected
+
+
+def test_mask_bits(matcher):
+    assert matcher.mask('WARN component=db') == 0b110
+    assert matcher.mask_of(['db', 'unknown']) == 0b100
+
+
+def test_without_literal():
+    matcher = TagMatcher({'db': {'pattern': re.compile('sql')}, 'even': {'pattern': re.compile(r'[02468]$')}})
+    assert matcher.names_of(matcher.mask('sql 2')) == {'db', 'even'}
+    assert matcher.names_of(matcher.mask('tcp 2')) == {'even'}
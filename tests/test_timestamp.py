@@ -0,0 +1,54 @@
+from datetime import datetime
+
+import pytest
+
+from pycolog.columns import to_epoch
+from pycolog.timestamp import parse_time, parser, timestamp
+
+
+@pytest.mark.parametrize('value,format', [
+    ('2020-07-02 12:30:15,123', '%Y-%m-%d %H:%M:%S,%f'),
+    ('2 July, 2020', '%d %B, %Y'),
+    ('Jul  2 12:00:01', '%b %d %H:%M:%S'),
+    ('02/Jul/2020:12:00:01 +0200', '%d/%b/%Y:%H:%M:%S %z'),
+    ('2020-07-02T12:00:00-05:30', '%Y-%m-%dT%H:%M:%S%z'),
+    ('2020-07-02T12:00:00Z', '%Y-%m-%dT%H:%M:%S%z'),
+    ('690702', '%y%m%d'),
+    ('3 PM', '%I %p'),
+])
+def test_equal_to_strptime(value, format):
+    expected = datetime.strptime(value, format)
+    parsed = timestamp(value, format)
+    assert parsed == expected
+    assert parsed.utcoffset() == expected.utcoffset()
+    assert timestamp(value, format, epoch=True) == to_epoch(expected)
+
+
+@pytest.mark.parametrize('value,format', [
+    ('2020-02-30', '%Y-%m-%d'),
+    ('12:00:61', '%H:%M:%S'),
+    ('2020-07-02 trailing', '%Y-%m-%d'),
+])
+def test_invalid(value, format):
+    with pytest.raises(ValueError):
+        timestamp(value, format)
+
+
+def test_supported():
+    assert parser('%Y-%m-%d %H:%M:%S').supported
+    assert not parser('%I:%M %p').supported
+
+
+@pytest.mark.parametrize('text,expected', [
+    ('2020-07-02', datetime(2020, 7, 2)),
+    ('2020-07-02 12:30', datetime(2020, 7, 2, 12, 30)),
+    ('2020-07-02T12:30:15.5', datetime(2020, 7, 2, 12, 30, 15, 500000)),
+    ('13:45:10', datetime(2020, 7, 2, 13, 45, 10)),
+])
+def test_parse_time(text, expected):
+    assert parse_time(text, datetime(2020, 7, 2, 8)) == expected
+
+
+def test_parse_time_invalid():
+    with pytest.raises(ValueError):
+        parse_time('yesterday')